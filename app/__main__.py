@@ -1,7 +1,8 @@
 import sys
 import os
+import asyncio
 import argparse
-from app.collector import Collector
+from datetime import date
 from app.logger import get_logger
 
 RETURN_SUCCESS = 0
@@ -22,6 +23,16 @@ def main():
     parser = argparse.ArgumentParser(description="ホロジュールのHTMLをSelenium + BeautifulSoup4 + Youtube API で解析して MongoDB へ登録")
     # コマンドライン引数を設定する（説明を指定できる）
     parser.add_argument("--csvpath", nargs="?", help="出力するCSVファイルのパス")
+    parser.add_argument("--daemon", action="store_true", help="常駐して一定間隔でホロジュールの取得・登録を繰り返す")
+    parser.add_argument("--interval", type=int, default=600, help="常駐する場合の実行間隔（秒）")
+    parser.add_argument("--pipeline", action="store_true", help="取得・動画情報の付与・登録をパイプラインで並行して行う")
+    parser.add_argument("--export", metavar="PATH", help="取得せずに MongoDB に登録済みのスケジュールを出力するファイルのパス")
+    parser.add_argument("--format", choices=["csv", "jsonl", "jsonl.gz"], default="csv", help="出力形式（--export の場合）")
+    parser.add_argument("--since", type=date.fromisoformat, help="出力する配信日の開始（YYYY-MM-DD、この日を含む）")
+    parser.add_argument("--until", type=date.fromisoformat, help="出力する配信日の終了（YYYY-MM-DD、この日を含む）")
+    parser.add_argument("--code", nargs="+", default=[], help="出力する配信者コード（複数指定可）")
+    parser.add_argument("--group", nargs="+", default=[], help="出力するグループ（複数指定可、例 : hololive）")
+    parser.add_argument("--affiliation", nargs="+", default=[], help="出力する所属（複数指定可、例 : gen0）")
     # コマンドライン引数を解析する
     args = parser.parse_args()
 
@@ -37,24 +48,72 @@ def main():
             return RETURN_FAILURE
         is_output = True
 
+    if args.interval <= 0:
+        logger.error("実行間隔は1秒以上を指定してください。 : %s", args.interval)
+        return RETURN_FAILURE
+
+    if args.export is not None:
+        # 取得せずに MongoDB からスケジュールを出力する（収集に使うモジュールは読み込まない）
+        from app.exporter import build_export_query, export_schedules, get_export_codes
+        try:
+            codes = get_export_codes(args.code, args.group, args.affiliation)
+            query = build_export_query(args.since, args.until, codes)
+            count = export_schedules(args.export, args.format, query)
+            logger.info("登録済みのスケジュールを出力しました。 : %s件", count)
+            return RETURN_SUCCESS
+        except:
+            logger.error("エラーが発生しました。", exc_info=True)
+            return RETURN_FAILURE
+
+    # 収集に使うモジュールは引数の確認が済んでから読み込む（--help や引数の誤りで読み込みを待たない）
+    from app.collector import Collector
+    from app.daemon import CollectorDaemon
+    from app.pipeline import create_collector_pipeline
+    from app.settings import get_metrics_settings
+
+    if args.daemon == True:
+        try:
+            # ブラウザ・API クライアント・MongoDB の接続を使い回して常駐
+            collector = Collector(keep_browser=True)
+            CollectorDaemon(collector, args.interval, csvpath, args.pipeline).run()
+            return RETURN_SUCCESS
+        except:
+            logger.error("エラーが発生しました。", exc_info=True)
+            return RETURN_FAILURE
+
+    collector = None
+    is_succeeded = False
     try:
         # Collectorオブジェクトの生成
         collector = Collector()
         logger.info("ホロジュールの取得を開始します。")
-        # ホロジュールの取得
-        schedules = collector.get_holodules()
-        logger.info("ホロジュールを取得しました。 : %s件", len(schedules))
-        # ホロジュールの登録
-        collector.save_to_mongodb()
-        logger.info("ホロジュールを登録しました。")
+        if args.pipeline == True:
+            # ホロジュールの取得・登録（パイプラインで並行して行う）
+            schedules = asyncio.run(create_collector_pipeline(collector).run())
+            logger.info("ホロジュールを取得・登録しました。 : %s件", len(schedules))
+        else:
+            # ホロジュールの取得
+            schedules = collector.get_holodules()
+            logger.info("ホロジュールを取得しました。 : %s件", len(schedules))
+            # ホロジュールの登録
+            collector.save_to_mongodb()
+            logger.info("ホロジュールを登録しました。")
         # ホロジュールの出力
         if is_output == True:
-            collector.output_to_csv(csvpath)
+            schedules.output_to_csv(csvpath)
             logger.info("ホロジュールを出力しました。 : %s件", len(schedules))
+        is_succeeded = True
         return RETURN_SUCCESS
     except:
         logger.error("エラーが発生しました。", exc_info=True)
         return RETURN_FAILURE
+    finally:
+        # 実行のメトリクスを出力する（失敗した場合も出力する）
+        if collector is not None:
+            collector.metrics.finish(is_succeeded)
+            collector.metrics.write(get_metrics_settings())
+            # 他のインスタンスが期限を待たずに引き継げるようにリースを解放する
+            collector.close()
 
 if __name__ == "__main__":
     sys.exit(main())
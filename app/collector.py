@@ -1,190 +1,970 @@
+import os
 import re
-from datetime import datetime, timezone, timedelta, date
+import time
+import hashlib
+import threading
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timezone, timedelta
 from logging import getLogger
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
-from app.settings import get_youtube_settings, get_holodule_settings
+from typing import TYPE_CHECKING, NamedTuple
+from urllib.parse import urldefrag, urlsplit
+from app.settings import HoloduleSettings, get_youtube_settings, get_holodule_settings, get_cache_settings, get_mongo_settings, get_event_settings, get_lease_settings
 from app.models.schedule import ScheduleModel
-from app.models.schedules import ScheduleCollection
+from app.models.schedules import ScheduleCollection, RemovalScope
 from app.models.streamers import StreamerCollection
+from app.models.save_result import SaveResult
+from app.models.schedule_change import CHANGE_TYPES
+from app.video_cache import create_video_cache
+from app.parser import LxmlScheduleParser, create_schedule_parser, get_block_fingerprint
+from app.rate_limiter import TokenBucket, QuotaBudget, RetryBackoff, CircuitBreaker
+from app.metrics import RunMetrics, get_process_tree_rss
+from app.youtube_client import YoutubeApiError, RestYoutubeClient, DiscoveryYoutubeClient, create_youtube_client
+from app.schedule_events import create_schedule_event_writer
+from app.mongo_indexes import ensure_indexes_once
+from app.enrich_checkpoint import create_enrich_checkpoint
+from app.leases import create_lease_manager
+
+# selenium・requests は読み込みに時間がかかるため、使う段になってから読み込む
+if TYPE_CHECKING:
+    import requests
+    from selenium import webdriver
 
 logger = getLogger(__name__)
 holodule_settings = get_holodule_settings()
 youtube_settings = get_youtube_settings()
+cache_settings = get_cache_settings()
+mongo_settings = get_mongo_settings()
+
+# videos.list の id に一度に指定できる動画IDの最大数
+VIDEOS_LIST_MAX_RESULTS = 50
+# videos.list を1回呼び出したときに消費するクォータ
+VIDEOS_LIST_QUOTA_COST = 1
+# ホロジュールの取得方法（http : HTTP で取得して必要な場合のみ Selenium、selenium : 常に Selenium）
+FETCH_MODES = ("http", "selenium")
+# Selenium のブラウザの設定（lean : 不要なリソースを読み込まない / full : すべて読み込む）
+BROWSER_MODES = ("lean", "full")
+# lean の場合に CDP で読み込みを止める URL のパターン（フォント・メディア・外部のホストの広告・解析・埋め込み・サムネイル）
+BLOCKED_URL_PATTERNS = (
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3", "*.m4a", "*.ogg",
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*fonts.googleapis.com*", "*fonts.gstatic.com*",
+    "*googletagmanager.com*", "*google-analytics.com*", "*doubleclick.net*", "*googlesyndication.com*", "*adservice.google.*",
+    "*platform.twitter.com*", "*connect.facebook.net*",
+    "*ytimg.com*", "*ggpht.com*", "*googleusercontent.com*",
+)
+# 読み込んだリソースの転送量の合計を求めるスクリプト（外部のホストのものは Timing-Allow-Origin がない場合 0 となる）
+TRANSFER_SIZE_SCRIPT = """
+return performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'))
+    .reduce((total, entry) => total + (entry.transferSize || 0), 0);
+"""
+# タブのリースのキーの接頭辞
+LEASE_KEY_PREFIX = "tab:"
+# <div class="holodule" ...> の有無を確認するためのパターン
+HOLODULE_CONTAINER_PATTERN = re.compile(r"""<div[^>]+class=["'][^"']*\bholodule\b""")
+# タブの名前に使えない文字
+LABEL_INVALID_CHARACTERS = re.compile(r"[^0-9A-Za-z_.-]")
+
+class HoloduleTarget(NamedTuple):
+    """
+    取得対象のホロジュールのタブ
+
+    Args:
+        label (str): タブの名前（ログとメトリクスに使う）
+        page_url (str): タブを含むページの URL
+        tab_id (str | None): タブの id 属性（None の場合は表示中のタブ）
+    """
+    label: str
+    page_url: str
+    tab_id: str | None
+
+class ParsedBlock(NamedTuple):
+    """
+    解析したブロック（日ごとのコンテナ）
+
+    Args:
+        schedules (list[ScheduleModel]): ブロックのホロジュール情報（登録後は動画情報を付与済み）
+        end_date (date | None): ブロックの最後の日付（次のブロックの直前の日付）
+        parsed_at (float): 解析した時刻（time.time()）
+    """
+    schedules: list[ScheduleModel]
+    end_date: date | None
+    parsed_at: float
+
+def get_holodule_targets(settings: HoloduleSettings) -> list[HoloduleTarget]:
+    """
+    設定から取得対象のタブのリストを作る関数
+
+    urls（カンマ区切り）が空の場合は url の表示中のタブのみとする。
+    URL に #タブの id を付けた場合はそのタブを、付けない場合は表示中のタブを対象とする（同じページのタブは1回の取得で解析する）。
+
+    Args:
+        settings (HoloduleSettings): Holodule の設定
+
+    Returns:
+        list[HoloduleTarget]: 取得対象のタブのリスト（重複なし）
+    """
+    urls = [url.strip() for url in settings.urls.split(",") if url.strip() != ""] or [settings.url]
+    targets = []
+    for url in dict.fromkeys(urls):
+        page_url, tab_id = urldefrag(url)
+        if tab_id != "":
+            label = tab_id
+        else:
+            parts = urlsplit(page_url)
+            label = parts.path.rstrip("/").rsplit("/", 1)[-1] or parts.netloc
+        targets.append(HoloduleTarget(LABEL_INVALID_CHARACTERS.sub("_", label), page_url, tab_id or None))
+    return targets
 
 class Collector:
     """
     【ホロライブ】ホロジュールと Youtube の動画情報を取得して MongoDB へ登録するクラス
     """
 
-    def __init__(self):
+    def __init__(self, keep_browser: bool = False):
         """
         Collectorクラスのコンストラク
+
+        Args:
+            keep_browser (bool, optional): 取得後もブラウザを閉じずに使い回すかどうか（常駐する場合に指定）
         """
         # WebDriver 関連
         self.__driver = None
         self.__wait = None
+        self.__keep_browser = keep_browser
+        # HTTP 関連（接続を使い回すためのセッション、ページごとのスレッドで共有する）
+        self.__session = None
+        self.__session_lock = threading.Lock()
+        # 取得対象のタブ（ページの URL ごとにまとめる）
+        self.__targets_by_page: dict[str, list[HoloduleTarget]] = {}
+        for target in get_holodule_targets(holodule_settings):
+            self.__targets_by_page.setdefault(target.page_url, []).append(target)
+        # 複数のインスタンスで取得対象のタブを分担するリースと、今回の実行で担当するタブ（リースを使わない場合はすべて）
+        self.__lease_manager = create_lease_manager(get_lease_settings())
+        self.__active_targets_by_page = self.__targets_by_page
+        # 今回の実行でタブごとに表示された配信者コードと配信日時の範囲（diff の場合に削除を検出する範囲に使う）
+        self.__tab_codes: dict[str, set[str]] = {}
+        self.__tab_windows: dict[str, tuple[datetime, datetime]] = {}
         # Model 関連
         self.__streamers = StreamerCollection()
         self.__schedules = ScheduleCollection()
-        # YouTube Data API v3 を利用するための準備
-        self.__youtube = build(youtube_settings.api_service_name, youtube_settings.api_version, developerKey=youtube_settings.api_key, cache_discovery=False)
+        # 今回の実行で解析したホロジュール情報（前回のブロックを再利用したものを除く、登録と動画情報の付与の対象）
+        self.__parsed_schedules = ScheduleCollection()
+        # 実行ごとのメトリクス
+        self.__metrics = RunMetrics()
+        # ホロジュールの HTML のパーサ
+        self.__parser = create_schedule_parser(holodule_settings.parser, self.__streamers, youtube_settings.url_pattern, self.__metrics)
+        # 前回の登録に成功した実行で解析したブロック（指紋をキーとする）と、タブごとのブロックの指紋の並び
+        # （ブロックに分けて解析できるのは lxml のパーサのみ）
+        self.__use_blocks = holodule_settings.block_max_age > 0 and isinstance(self.__parser, LxmlScheduleParser)
+        self.__blocks: dict[str, ParsedBlock] = {}
+        self.__regions: dict[str, tuple[str, ...]] = {}
+        # タブごとのページソース全体のハッシュ値（前回と同じ場合は HTML を解析せずにブロックを再利用する）
+        self.__page_hashes: dict[str, str] = {}
+        # 今回の実行で解析・再利用したブロック（登録に成功した場合に commit_blocks で前回の分と置き換える）
+        self.__pending_blocks: dict[str, ParsedBlock] = {}
+        self.__pending_regions: dict[str, tuple[str, ...]] = {}
+        self.__pending_page_hashes: dict[str, str] = {}
+        # 今回の実行で解析したブロックの数と、前回からすべてのタブが変わっていないかどうか
+        self.__parsed_block_count = 0
+        self.__is_unchanged = False
+        # YouTube Data API v3 のクライアント（使うときに生成）
+        self.__youtube = None
+        self.__youtube_lock = threading.Lock()
+        # 動画情報を並行して取得するためのスレッドプール（必要になったときに生成）
+        self.__executor = None
+        # API の呼び出し回数と1回の実行で消費できるクォータの制限
+        self.__rate_limiter = TokenBucket(youtube_settings.rate_per_second, youtube_settings.max_workers)
+        self.__quota_budget = QuotaBudget(youtube_settings.quota_budget)
+        # 一時的なエラーで呼び出し直すまでの待ち時間と、クォータを使い切った場合に呼び出しを止める仕組み（実行をまたいで止める）
+        self.__retry_backoff = RetryBackoff(youtube_settings.retry_max_attempts, youtube_settings.retry_base_delay, youtube_settings.retry_max_delay)
+        self.__circuit_breaker = CircuitBreaker(youtube_settings.circuit_cooldown)
+        # 実行中に取得した動画情報のチェックポイント（中断した実行を再開するため）と、中断した実行で取得済みの動画情報
+        self.__checkpoint = create_enrich_checkpoint(youtube_settings)
+        self.__checkpoint_items: dict[str, dict] = {}
+        # 今回の実行で動画情報の取得を見送ったホロジュール情報（次回の実行で取得し直す）
+        self.__deferred_video_ids: set[str] = set()
+        self.__deferred_identities: set[tuple] = set()
+        self.__deferred_lock = threading.Lock()
+        # 動画情報キャッシュ（前回までに取得した videos.list の検索結果）
+        self.__video_cache = create_video_cache(cache_settings)
+        # スケジュールの変更イベントの書き込み先（保存方法が diff の場合に出力）
+        self.__event_writer = create_schedule_event_writer(get_event_settings())
+        # 登録・検索で使うインデックスの作成と確認
+        if mongo_settings.ensure_indexes:
+            ensure_indexes_once()
+
+    @property
+    def metrics(self) -> RunMetrics:
+        """
+        実行ごとのメトリクスを返す
+
+        Returns:
+            RunMetrics: メトリクス
+        """
+        return self.__metrics
+
+    @property
+    def is_unchanged(self) -> bool:
+        """
+        今回の実行ですべてのタブのブロックが前回の登録に成功した実行と同じだったかどうかを返す
+
+        Returns:
+            bool: 前回から変わっていないかどうか（同じ場合は動画情報の付与と登録を省略できる）
+        """
+        return self.__is_unchanged
+
+    @property
+    def is_incomplete(self) -> bool:
+        """
+        今回の実行で動画情報の取得を見送ったホロジュール情報があるかどうかを返す
+
+        Returns:
+            bool: 見送ったものがあるかどうか（ある場合、見送ったものは登録せずに次回の実行で取得し直す）
+        """
+        with self.__deferred_lock:
+            return len(self.__deferred_video_ids) > 0
+
+    @property
+    def is_standby(self) -> bool:
+        """
+        今回の実行で担当するタブがない（すべて他のインスタンスが担当している）かどうかを返す
+
+        Returns:
+            bool: 担当するタブがないかどうか（ない場合は取得・登録を行わない）
+        """
+        return len(self.__active_targets_by_page) == 0
+
+    def get_removal_scopes(self) -> list[RemovalScope] | None:
+        """
+        diff の場合に削除を検出する範囲を返す関数（ホロジュール情報を取得した後に呼び出す）
+
+        タブごとに、そのタブの配信日時の範囲を対象とする。
+        リースで一部のタブのみを担当する場合は、他のインスタンスが担当するタブのスケジュールを削除しないように、
+        そのタブに今回または前回の登録で表示されていた配信者のみを対象とする。
+
+        Returns:
+            list[RemovalScope] | None: 削除を検出する範囲（動画情報の取得を見送ったものがある場合は None = 検出しない）
+        """
+        if self.is_incomplete:
+            return None
+        if self.__active_targets_by_page == self.__targets_by_page:
+            return [RemovalScope(start, end, None) for start, end in self.__tab_windows.values()]
+        previous_codes = ScheduleCollection.load_tab_codes(list(self.__tab_windows))
+        return [
+            RemovalScope(start, end, frozenset(self.__tab_codes[label] | previous_codes.get(label, set())))
+            for label, (start, end) in self.__tab_windows.items()
+        ]
+
+    def is_deferred(self, schedule: ScheduleModel) -> bool:
+        """
+        今回の実行で動画情報の取得を見送ったホロジュール情報かどうかを返す関数
+
+        Args:
+            schedule (ScheduleModel): ホロジュール情報
+
+        Returns:
+            bool: 見送ったかどうか
+        """
+        with self.__deferred_lock:
+            return schedule.video_id is None and ScheduleCollection.get_identity(schedule) in self.__deferred_identities
+
+    def start_run(self) -> None:
+        """
+        実行の開始時にクォータ・メトリクス・配信者の名前の解決状況を数え直す関数（get_holodules は自身で呼び出す）
+
+        中断した実行のチェックポイントがあれば読み込み、リースを使う場合は今回の実行で担当するタブのリースを取得する。
+        """
+        self.__quota_budget.reset()
+        self.__metrics.reset()
+        self.__streamers.reset_name_resolution()
+        self.__pending_blocks = {}
+        self.__pending_regions = {}
+        self.__pending_page_hashes = {}
+        self.__parsed_block_count = 0
+        self.__is_unchanged = False
+        self.__tab_codes = {}
+        self.__tab_windows = {}
+        with self.__deferred_lock:
+            self.__deferred_video_ids = set()
+            self.__deferred_identities = set()
+        self.__checkpoint_items = self.__checkpoint.load() if self.__checkpoint is not None else {}
+        if self.__lease_manager is not None:
+            self.__acquire_leases()
+
+    def __acquire_leases(self) -> None:
+        """
+        取得対象のタブのリースを取得して、今回の実行で担当するタブを決める関数
+        """
+        labels = [target.label for targets in self.__targets_by_page.values() for target in targets]
+        held = set(self.__lease_manager.acquire([LEASE_KEY_PREFIX + label for label in labels]))
+        self.__active_targets_by_page = {}
+        for page_url, targets in self.__targets_by_page.items():
+            active_targets = [target for target in targets if LEASE_KEY_PREFIX + target.label in held]
+            if len(active_targets) > 0:
+                self.__active_targets_by_page[page_url] = active_targets
+        active_labels = [target.label for targets in self.__active_targets_by_page.values() for target in targets]
+        self.__metrics.set_gauge("leases_held", len(active_labels))
+        if len(active_labels) == 0:
+            logger.info("すべてのタブを他のインスタンスが担当しているため取得しません。 : %s", self.__lease_manager.owner)
+        else:
+            logger.info("担当するタブ : %s（%s/%s）", ", ".join(active_labels), len(active_labels), len(labels))
+
+    def renew_leases(self) -> bool:
+        """
+        担当するタブのリースを延長する関数（登録の前に呼び出す）
+
+        Returns:
+            bool: すべてのリースを保持できているかどうか（リースを使わない場合は常に True）
+        """
+        if self.__lease_manager is None or self.__lease_manager.renew():
+            return True
+        logger.warning("リースの期限が切れて他のインスタンスが引き継いだため登録しません。")
+        self.__metrics.increment("leases_lost")
+        return False
 
-    def __setup_options(self) -> webdriver.ChromeOptions:
+    def __get_youtube(self) -> RestYoutubeClient | DiscoveryYoutubeClient:
+        """
+        YouTube Data API v3 のクライアントを取得する関数（最初に呼び出したときに生成する）
+
+        Returns:
+            RestYoutubeClient | DiscoveryYoutubeClient: YouTube Data API v3 のクライアント
+        """
+        with self.__youtube_lock:
+            if self.__youtube is None:
+                self.__youtube = create_youtube_client(youtube_settings)
+            return self.__youtube
+
+    def __setup_options(self) -> "webdriver.ChromeOptions":
         """
         Selenium オプションをセットアップする関数
         
         Returns:
             webdriver.ChromeOptions: オプション
+
+        Raises:
+            ValueError: ブラウザの設定の指定が不正な場合
         """
+        from selenium import webdriver
+        browser_mode = holodule_settings.browser_mode
+        if browser_mode not in BROWSER_MODES:
+            raise ValueError(f"ブラウザの設定の指定が不正です。 : {browser_mode}")
         options = webdriver.ChromeOptions()
         # ヘッドレスモードとする
         options.add_argument('--headless=new')
+        if browser_mode == "lean":
+            # 画像・サブリソースの読み込みを待たず、DOM の構築が終わった時点で操作を返す（ホロジュールの要素は待機で確認する）
+            options.page_load_strategy = "eager"
+            # 画像は URL に拡張子がないものもあるため、コンテンツの設定でも読み込まない
+            options.add_argument('--blink-settings=imagesEnabled=false')
+            options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+            options.add_argument('--mute-audio')
+            options.add_argument('--disable-extensions')
+            options.add_argument('--disable-background-networking')
+            options.add_argument('--no-first-run')
+            options.add_argument('--no-default-browser-check')
+        if holodule_settings.browser_profile_dir != "":
+            # プロファイルを使い回して、スクリプト・スタイルシートのディスクキャッシュを次回以降の実行でも使う
+            # （同じプロファイルは同時に1つのブラウザしか使えないため、複数のプロセスで実行する場合は別のディレクトリを指定する）
+            profile_dir = os.path.abspath(holodule_settings.browser_profile_dir)
+            os.makedirs(profile_dir, exist_ok=True)
+            options.add_argument(f'--user-data-dir={profile_dir}')
         return options
 
+    def __block_requests(self) -> None:
+        """
+        表示中のタブで不要なリソースの読み込みを CDP で止める関数（lean の場合のみ、タブごとに呼び出す）
+        """
+        if holodule_settings.browser_mode != "lean":
+            return
+        self.__driver.execute_cdp_cmd("Network.enable", {})
+        self.__driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(BLOCKED_URL_PATTERNS)})
+
+    def __record_browser_usage(self) -> None:
+        """
+        表示中のタブで読み込んだリソースの転送量と、ブラウザのプロセスのメモリ使用量をメトリクスに記録する関数
+        """
+        try:
+            self.__metrics.increment("browser_bytes", int(self.__driver.execute_script(TRANSFER_SIZE_SCRIPT) or 0))
+        except Exception:
+            logger.debug("転送量を取得できませんでした。", exc_info=True)
+        process = getattr(self.__driver.service, "process", None)
+        rss = None if process is None else get_process_tree_rss(process.pid)
+        if rss is not None:
+            self.__metrics.set_gauge("browser_rss_bytes", rss)
+
+    def __get_html_by_http(self, url: str) -> str | None:
+        """
+        ホロジュールの HTML をブラウザを使わずに HTTP で取得する関数（複数のスレッドから呼び出せる）
+
+        Args:
+            url (str): ページの URL
+
+        Returns:
+            str | None: ページソース（ホロジュールのコンテナが含まれていない場合は None）
+
+        Raises:
+            requests.RequestException: HTTP の通信でエラーが発生した場合
+        """
+        with self.__session_lock:
+            if self.__session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                self.__session = requests.Session()
+                self.__session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+                self.__session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+            session = self.__session
+        with self.__metrics.measure("http_fetch"):
+            response = session.get(url, timeout=holodule_settings.timeout)
+        response.raise_for_status()
+        # 文字コードの指定がない場合は ISO-8859-1 とみなされるため UTF-8 とする
+        if "charset" not in response.headers.get("Content-Type", "").lower():
+            response.encoding = "utf-8"
+        html = response.text
+        if HOLODULE_CONTAINER_PATTERN.search(html) is None:
+            return None
+        return html
+
+    def __get_htmls_by_selenium(self, urls: list[str]) -> Iterator[tuple[str, str, float]]:
+        """
+        ホロジュールの HTML を Selenium（ヘッドレス Chrome）で取得する関数
+
+        2つ目以降のページは同じブラウザの別のタブで開いておき、最初のページの読み込みと並行して読み込ませる。
+
+        Args:
+            urls (list[str]): ページの URL のリスト
+
+        Yields:
+            tuple[str, str, float]: ページの URL, ページソース, 読み込みを始めてから取得するまでの時間（秒）
+        """
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        if self.__driver is None:
+            from selenium import webdriver
+            from selenium.webdriver.support.ui import WebDriverWait
+            # オプションのセットアップ
+            options = self.__setup_options()
+            # ドライバの初期化（オプション（ヘッドレスモード）とプロファイルを指定）
+            with self.__metrics.measure("browser_startup"):
+                self.__driver = webdriver.Chrome(options=options)
+                self.__block_requests()
+            # 指定したドライバに対して最大で指定秒数待つように設定する
+            self.__wait = WebDriverWait(self.__driver, holodule_settings.timeout)
+        started_at = time.perf_counter()
+        main_handle = self.__driver.current_window_handle
+        # 2つ目以降のページは新しいタブで開く（CDP の設定はタブごとのため、空のタブで設定してから遷移させる）
+        # （location の変更は読み込みの完了を待たない）
+        pages = [(urls[0], main_handle)]
+        for url in urls[1:]:
+            handles = set(self.__driver.window_handles)
+            self.__driver.execute_script("window.open('about:blank', '_blank');")
+            handle = (set(self.__driver.window_handles) - handles).pop()
+            self.__driver.switch_to.window(handle)
+            self.__block_requests()
+            self.__driver.execute_script("window.location.href = arguments[0];", url)
+            pages.append((url, handle))
+        try:
+            for index, (url, handle) in enumerate(pages):
+                with self.__metrics.measure("page_load"):
+                    self.__driver.switch_to.window(handle)
+                    if index == 0:
+                        # 取得対象の URL に遷移
+                        self.__driver.get(url)
+                    # <div class="holodule" style="margin-top:10px;">が表示されるまで待機する
+                    self.__wait.until(EC.presence_of_element_located((By.CLASS_NAME, "holodule")))
+                self.__record_browser_usage()
+                # ページソースの取得
+                yield url, self.__driver.page_source, time.perf_counter() - started_at
+        finally:
+            # 開いたタブを閉じて最初のタブに戻す
+            for _, handle in pages[1:]:
+                if handle in self.__driver.window_handles:
+                    self.__driver.switch_to.window(handle)
+                    self.__driver.close()
+            self.__driver.switch_to.window(main_handle)
+
+    def __fetch_by_http(self, url: str) -> tuple[str | None, float]:
+        """
+        ページを HTTP で取得して、取得にかかった時間とあわせて返す関数（スレッドプールで実行する）
+
+        Args:
+            url (str): ページの URL
+
+        Returns:
+            tuple[str | None, float]: ページソース（ホロジュールが含まれていない場合は None）, 取得にかかった時間（秒）
+        """
+        started_at = time.perf_counter()
+        html = self.__get_html_by_http(url)
+        return html, time.perf_counter() - started_at
+
+    def __iter_pages(self) -> Iterator[tuple[str, str, float]]:
+        """
+        設定した取得方法で、取得対象のページの HTML を取得できた順に返す関数
+
+        HTTP の場合はページごとに並行して取得し、ホロジュールが含まれていないページのみ Selenium で取得し直す。
+
+        Yields:
+            tuple[str, str, float]: ページの URL, ページソース, 取得にかかった時間（秒）
+
+        Raises:
+            ValueError: 取得方法の指定が不正な場合
+        """
+        fetch_mode = holodule_settings.fetch_mode
+        if fetch_mode not in FETCH_MODES:
+            raise ValueError(f"ホロジュールの取得方法が不正です。 : {fetch_mode}")
+        page_urls = list(self.__active_targets_by_page)
+        if len(page_urls) == 0:
+            return
+        selenium_urls = page_urls if fetch_mode == "selenium" else []
+        if fetch_mode == "http":
+            with ThreadPoolExecutor(max_workers=len(page_urls), thread_name_prefix="holodule") as executor:
+                futures = {executor.submit(self.__fetch_by_http, url): url for url in page_urls}
+                for future in as_completed(futures):
+                    url = futures[future]
+                    html, seconds = future.result()
+                    if html is None:
+                        logger.warning("HTTP で取得したページにホロジュールが含まれていないため Selenium で取得します。 : %s", url)
+                        self.__metrics.increment("selenium_fallbacks")
+                        selenium_urls.append(url)
+                        continue
+                    logger.info("ホロジュールを HTTP で取得しました。 : %s（%s文字）", url, len(html))
+                    self.__metrics.increment("html_bytes", len(html.encode("utf-8")))
+                    yield url, html, seconds
+        if len(selenium_urls) > 0:
+            for url, html, seconds in self.__get_htmls_by_selenium(selenium_urls):
+                logger.info("ホロジュールを Selenium で取得しました。 : %s（%s文字）", url, len(html))
+                self.__metrics.increment("html_bytes", len(html.encode("utf-8")))
+                yield url, html, seconds
+
+    def __iter_tabs(self) -> Iterator[tuple[HoloduleTarget, str]]:
+        """
+        取得対象のタブと、そのタブを含むページの HTML を返す関数（ページの取得の時間をタブごとに記録する）
+
+        ページを取得できた順に返すため、呼び出し元での解析と残りのページの取得が並行する。
+
+        Yields:
+            tuple[HoloduleTarget, str]: 取得対象のタブ, ページソース
+        """
+        started_at = time.perf_counter()
+        for page_url, html, seconds in self.__iter_pages():
+            for target in self.__active_targets_by_page[page_url]:
+                self.__metrics.add_timing(f"fetch[{target.label}]", seconds)
+                yield target, html
+        # 最後のページを取得し終えるまでの時間
+        self.__metrics.add_timing("fetch", time.perf_counter() - started_at)
+
+    def __add_parse_timing(self, target: HoloduleTarget, seconds: float) -> None:
+        """
+        解析にかかった時間を全体とタブごとに記録する関数
+
+        Args:
+            target (HoloduleTarget): 解析したタブ
+            seconds (float): 解析にかかった時間（秒）
+        """
+        self.__metrics.add_timing("parse", seconds)
+        self.__metrics.add_timing(f"parse[{target.label}]", seconds)
+
+    def __iter_blocks(self, target: HoloduleTarget, html: str) -> Iterator[tuple[ScheduleModel, bool]]:
+        """
+        タブをブロック（日ごとのコンテナ）に分けて、前回と同じ指紋のブロックは解析せずに前回のホロジュール情報を返す関数
+
+        再利用したホロジュール情報は前回の実行で動画情報を付与して登録済みのため、付与と登録は不要となる。
+        再利用できる期間を過ぎたブロックは解析し直す（動画のタイトルなどの変更を取り込むため）。
+
+        Args:
+            target (HoloduleTarget): 解析するタブ
+            html (str): タブを含むページのページソース
+
+        Yields:
+            tuple[ScheduleModel, bool]: ホロジュール情報, 前回のブロックを再利用したかどうか
+        """
+        today = date.today()
+        now = time.time()
+        page_hash = hashlib.sha1(html.encode("utf-8")).hexdigest()
+        self.__pending_page_hashes[target.label] = page_hash
+        # ページソース全体が前回と同じ場合は、HTML を解析せずに前回のブロックを順に返す
+        fingerprints = self.__regions.get(target.label) if self.__page_hashes.get(target.label) == page_hash else None
+        if fingerprints is not None and all(
+            fingerprint in self.__blocks and now - self.__blocks[fingerprint].parsed_at < holodule_settings.block_max_age
+            for fingerprint in fingerprints
+        ):
+            for fingerprint in fingerprints:
+                parsed = self.__blocks[fingerprint]
+                self.__pending_blocks[fingerprint] = parsed
+                self.__metrics.increment("blocks_reused")
+                self.__metrics.increment("entries_reused", len(parsed.schedules))
+                for schedule in parsed.schedules:
+                    yield schedule, True
+            self.__pending_regions[target.label] = fingerprints
+            return
+        current_date = None
+        fingerprints = []
+        for block in self.__parser.iter_blocks(html, target.tab_id):
+            fingerprint = get_block_fingerprint(block, current_date, today)
+            fingerprints.append(fingerprint)
+            parsed = self.__blocks.get(fingerprint)
+            is_reused = parsed is not None and now - parsed.parsed_at < holodule_settings.block_max_age
+            if is_reused:
+                self.__metrics.increment("blocks_reused")
+                self.__metrics.increment("entries_reused", len(parsed.schedules))
+            else:
+                schedules, end_date = self.__parser.parse_block(block, current_date, today)
+                parsed = ParsedBlock(schedules, end_date, now)
+                self.__parsed_block_count += 1
+                self.__metrics.increment("blocks_parsed")
+            self.__pending_blocks[fingerprint] = parsed
+            current_date = parsed.end_date
+            for schedule in parsed.schedules:
+                yield schedule, is_reused
+        self.__pending_regions[target.label] = tuple(fingerprints)
+
+    def __iter_parsed(self) -> Iterator[tuple[ScheduleModel, bool]]:
+        """
+        取得対象のすべてのタブを取得・解析して、重複を除いたホロジュール情報を1件ずつ返す関数
+
+        複数のタブに同じスケジュールがある場合は最初のもののみ返す。
+        すべてのタブのブロックが前回と同じ場合は、返し終えた後に is_unchanged が True となる。
+
+        Yields:
+            tuple[ScheduleModel, bool]: ホロジュール情報, 前回のブロックを再利用したかどうか
+        """
+        identities = set()
+        for target, html in self.__iter_tabs():
+            # ホロジュール情報の取得（呼び出し元で待っている時間は解析の時間に含めない）
+            if self.__use_blocks:
+                items = self.__iter_blocks(target, html)
+            else:
+                items = ((schedule, False) for schedule in self.__parser.iter_parse(html, target.tab_id))
+            found_count = reused_count = duplicated_count = 0
+            tab_codes = self.__tab_codes.setdefault(target.label, set())
+            while True:
+                started_at = time.perf_counter()
+                item = next(items, None)
+                self.__add_parse_timing(target, time.perf_counter() - started_at)
+                if item is None:
+                    break
+                schedule, is_reused = item
+                self.__metrics.increment("entries_found")
+                found_count += 1
+                reused_count += 1 if is_reused else 0
+                # 他のタブと重複するものも、このタブに表示された範囲に含める
+                tab_codes.add(schedule.code)
+                window = self.__tab_windows.get(target.label)
+                self.__tab_windows[target.label] = (
+                    (min(window[0], schedule.streaming_at), max(window[1], schedule.streaming_at)) if window is not None
+                    else (schedule.streaming_at, schedule.streaming_at)
+                )
+                identity = ScheduleCollection.get_identity(schedule)
+                if identity in identities:
+                    duplicated_count += 1
+                    continue
+                identities.add(identity)
+                yield schedule, is_reused
+            logger.info("ホロジュールを解析しました。 : %s（%s件 / 重複 %s件 / 再利用 %s件）", target.label, found_count, duplicated_count, reused_count)
+        self.__report_name_resolution()
+        self.__is_unchanged = (
+            self.__use_blocks
+            and len(self.__regions) > 0
+            and self.__pending_regions == self.__regions
+            and self.__parsed_block_count == 0
+        )
+        if self.__is_unchanged:
+            self.__metrics.increment("runs_unchanged")
+            logger.info("ホロジュールは前回から変わっていません。")
+
     def __get_schedules(self) -> ScheduleCollection:
         """
-        ホロジュール情報を取得する関数
-        
+        取得対象のすべてのタブからホロジュール情報を取得して、重複を除いた1つのコレクションにまとめる関数
+
+        今回の実行で解析したもの（前回のブロックを再利用したものを除く）は __parsed_schedules にもまとめる。
+
         Returns:
             ScheduleCollection: ホロジュール情報のコレクション
         """
-        # 取得対象の URL に遷移
-        self.__driver.get(holodule_settings.url)
-        # <div class="holodule" style="margin-top:10px;">が表示されるまで待機する
-        self.__wait.until(EC.presence_of_element_located((By.CLASS_NAME, "holodule")))
-        # ページソースの取得
-        html = self.__driver.page_source.encode("utf-8")
-        # ページソースの解析（パーサとして lxml を指定）
-        soup = BeautifulSoup(html, "lxml")
-        # タイトルの取得（確認用）
-        head = soup.find("head")
-        title = head.find("title").text
-        logger.info('TITLE : %s', title)
-
-        # TODO : ここからはページの構成に合わせて決め打ち = ページの構成が変わったら動かない
-        # スケジュールの取得
         schedules = ScheduleCollection()
-        date_string = ""
-        today = date.today()
-        tab_pane = soup.find("div", class_="tab-pane show active")
-        containers = tab_pane.find_all("div", class_="container")
-
-        for container in containers:
-            # 日付のみ取得
-            div_date = container.find("div", class_="holodule navbar-text")
-            if div_date is not None:
-                date_text = div_date.text.strip()
-                match_date = re.search(r"[0-9]{1,2}/[0-9]{1,2}", date_text)
-                dates = match_date.group(0).split("/")
-                month = int(dates[0])
-                day = int(dates[1])
-                year = today.year
-                if month == 12 and today.month == 1:
-                    year = year - 1
-                elif month == 1 and today.month == 12:
-                    year = year + 1
-                date_string = f"{year}/{month}/{day}"
-
-            # 配信者毎のスケジュール
-            thumbnails = container.find_all("a", class_="thumbnail")
-            if thumbnails is not None:
-                for thumbnail in thumbnails:
-                    # Youtube URL
-                    stream_url = thumbnail.get("href")
-                    if stream_url is None or re.match(youtube_settings.url_pattern, stream_url) is None:
-                        continue
-                    # 時刻（先に取得しておいた日付と合体）
-                    div_time = thumbnail.find("div", class_="col-4 col-sm-4 col-md-4 text-left datetime")
-                    if div_time is None:
-                        continue
-                    time_text = div_time.text.strip()
-                    match_time = re.search(r"[0-9]{1,2}:[0-9]{1,2}", time_text)
-                    times = match_time.group(0).split(":")
-                    hour = int(times[0])
-                    minute = int(times[1])
-                    datetime_string = f"{date_string} {hour}:{minute}"
-                    stream_datetime = datetime.strptime(datetime_string, "%Y/%m/%d %H:%M")
-                    # 配信者の名前
-                    div_name = thumbnail.find("div", class_="col text-right name")
-                    if div_name is None:
-                        continue
-                    stream_name = div_name.text.strip()
-                    # リストに追加
-                    streamer = self.__streamers.get_streamer_by_name(stream_name)
-                    if streamer is None:
-                        continue
-                    schedule = ScheduleModel(code=streamer.code, url=stream_url, streaming_at=stream_datetime, name=streamer.name)
-                    schedules.append(schedule)
+        self.__parsed_schedules = ScheduleCollection()
+        for schedule, is_reused in self.__iter_parsed():
+            schedules.append(schedule)
+            if not is_reused:
+                self.__parsed_schedules.append(schedule)
         return schedules
 
-    def __get_youtube_video_info(self, youtube_url: str) -> tuple:
+    def commit_blocks(self) -> None:
         """
-        Youtube 動画情報を取得する関数
-        
+        今回の実行で解析・再利用したブロックを、次回の実行で再利用できるようにする関数（登録に成功した後に呼び出す）
+
+        動画情報を付与できなかったホロジュール情報を含むブロックは、次回も解析して付与し直す。
+        """
+        if not self.__use_blocks:
+            return
+        self.__blocks = {
+            fingerprint: parsed
+            for fingerprint, parsed in self.__pending_blocks.items()
+            if all(schedule.video_id is not None for schedule in parsed.schedules)
+        }
+        self.__regions = self.__pending_regions
+        self.__page_hashes = self.__pending_page_hashes
+        self.__pending_blocks = {}
+        self.__pending_regions = {}
+        self.__pending_page_hashes = {}
+
+    def __report_name_resolution(self) -> None:
+        """
+        表記ゆれとして解決した配信者の名前と、解決できなかった名前をログとメトリクスに出力する関数
+        """
+        fallback_names = self.__streamers.get_fallback_names()
+        unresolved_names = self.__streamers.get_unresolved_names()
+        self.__metrics.set_gauge("streamer_names_fallback", len(fallback_names))
+        self.__metrics.set_gauge("streamer_names_unresolved", len(unresolved_names))
+        if len(fallback_names) > 0:
+            logger.info("表記ゆれとして解決した配信者の名前 : %s", ", ".join(f"{name} -> {code}" for name, code in fallback_names.items()))
+        if len(unresolved_names) > 0:
+            # 前方一致・あいまい検索で推定したものは推定した配信者で登録する
+            logger.warning(
+                "配信者を確定できなかった名前があります。 : %s",
+                ", ".join(
+                    f"{name}（{count}件 / {fallback_names[name]} と推定して登録）" if name in fallback_names else f"{name}（{count}件 / 登録しません）"
+                    for name, count in unresolved_names.items()
+                ),
+            )
+
+    def __get_video_id(self, youtube_url: str) -> str | None:
+        """
+        Youtube の URL から動画IDを取得する関数
+
         Args:
             youtube_url (str): Youtube の URL
-        
+
+        Returns:
+            str | None: 動画ID（URL が不正な場合は None）
+        """
+        match_video = re.search(r"^[^v]+v=(.{11}).*", youtube_url)
+        if not match_video:
+            logger.error("YouTube URL が不正です。 : %s", youtube_url)
+            return None
+        return match_video.group(1)
+
+    def __to_video_info(self, search_result: dict) -> tuple:
+        """
+        videos.list の検索結果から動画情報を取り出す関数
+
+        Args:
+            search_result (dict): videos.list の検索結果（items の要素）
+
         Returns:
             tuple: 動画情報（video_id, title, description, published_at, channel_id, channel_title, tags）
-        
+        """
+        # id
+        video_id = search_result["id"]
+        # タイトル
+        title = search_result["snippet"]["title"]
+        # 説明
+        description = search_result["snippet"]["description"]
+        # 投稿日
+        datetime_string = search_result["snippet"]["publishedAt"]
+        published_at = datetime.fromisoformat(datetime_string).astimezone(tz=timezone(timedelta(hours=+9)))
+        # チャンネルID
+        channel_id = search_result["snippet"]["channelId"]
+        # チャンネルタイトル
+        channel_title = search_result["snippet"]["channelTitle"]
+        # タグ（設定されていない＝キーが存在しない場合あり）
+        tags = search_result["snippet"].setdefault("tags", [])
+        return (video_id, title, description, published_at, channel_id, channel_title, tags)
+
+    def __get_executor(self) -> ThreadPoolExecutor:
+        """
+        動画情報を並行して取得するためのスレッドプールを取得する関数
+
+        Returns:
+            ThreadPoolExecutor: スレッドプール
+        """
+        if self.__executor is None:
+            self.__executor = ThreadPoolExecutor(max_workers=youtube_settings.max_workers, thread_name_prefix="youtube")
+        return self.__executor
+
+    def __list_videos(self, video_ids: list[str]) -> list[dict] | None:
+        """
+        videos.list で動画情報を取得する関数（呼び出し回数とクォータを制限する）
+
+        一時的なエラー（429・5xx・通信エラーなど）の場合は、待ち時間を延ばしながら呼び出し直す。
+        1日のクォータを使い切った場合は、一定時間 API の呼び出しを止める。
+
+        Args:
+            video_ids (list[str]): 動画IDのリスト（最大50件）
+
+        Returns:
+            list[dict] | None: videos.list の検索結果（取得を見送った場合は None）
+        """
+        if not self.__circuit_breaker.allow():
+            logger.warning("クォータを使い切ったため動画情報の取得を見送ります。 : %s件", len(video_ids))
+            self.__metrics.increment("api_circuit_rejected")
+            return None
+        for attempt in range(1, self.__retry_backoff.max_attempts + 1):
+            if not self.__quota_budget.consume(VIDEOS_LIST_QUOTA_COST):
+                logger.warning("クォータの上限に達したため動画情報を取得しません。 : %s件", len(video_ids))
+                self.__metrics.increment("api_quota_rejected")
+                # 試しに呼び出す番だった場合は、次の呼び出しに試す番を譲る
+                self.__circuit_breaker.release()
+                return None
+            self.__metrics.set_gauge("api_quota_used", self.__quota_budget.used)
+            self.__metrics.add_timing("api_rate_limit_wait", self.__rate_limiter.acquire())
+            logger.info('YOUTUBE_VIDEO_IDS : %s', ",".join(video_ids))
+            started_at = time.perf_counter()
+            try:
+                # Youtube はスクレイピングを禁止しているので YouTube Data API (v3) で情報を取得
+                search_response = self.__get_youtube().list_videos(video_ids)
+            except YoutubeApiError as e:
+                self.__metrics.increment("api_errors")
+                if e.is_quota_exceeded:
+                    logger.error("クォータを使い切りました。%s秒間 API の呼び出しを止めます。 : %s", youtube_settings.circuit_cooldown, e.reason)
+                    self.__metrics.increment("api_circuit_opened")
+                    self.__circuit_breaker.open()
+                    return None
+                self.__circuit_breaker.close()
+                if not e.is_transient:
+                    logger.error("HTTP エラー %d が発生したため動画情報の取得を見送ります。%s", e.status, e.content)
+                    return None
+                logger.warning("HTTP エラー %d が発生しました（%s/%s回目）。%s", e.status, attempt, self.__retry_backoff.max_attempts, e.reason)
+            except OSError as e:
+                # タイムアウト・接続エラーなど（requests の例外は OSError を継承する）
+                self.__metrics.increment("api_errors")
+                self.__circuit_breaker.close()
+                logger.warning("通信エラーが発生しました（%s/%s回目）。%s", attempt, self.__retry_backoff.max_attempts, e)
+            else:
+                self.__circuit_breaker.close()
+                self.__metrics.observe("api_call_latency", time.perf_counter() - started_at)
+                self.__metrics.increment("api_calls")
+                return search_response.get("items", [])
+            if attempt < self.__retry_backoff.max_attempts:
+                delay = self.__retry_backoff.get_delay(attempt)
+                self.__metrics.increment("api_retries")
+                self.__metrics.add_timing("api_retry_wait", delay)
+                time.sleep(delay)
+        logger.error("呼び出し直しても動画情報を取得できなかったため見送ります。 : %s件", len(video_ids))
+        return None
+
+    def __get_youtube_video_infos(self, video_ids: list[str]) -> dict[str, tuple]:
+        """
+        Youtube 動画情報をまとめて取得する関数（キャッシュにない動画のみ videos.list に最大50件ずつ ID を指定する）
+
+        取得を見送った動画IDは __deferred_video_ids に追加する。
+
+        Args:
+            video_ids (list[str]): 動画IDのリスト（重複なし）
+
+        Returns:
+            dict[str, tuple]: 動画IDをキーとした動画情報（video_id, title, description, published_at, channel_id, channel_title, tags）
+
         Raises:
-            HttpError: Youtube の API でエラーが発生した場合
-            Exception: その他のエラーが発生した場合
+            Exception: 動画情報の取得以外でエラーが発生した場合
         """
+        video_infos = {}
         try:
-            logger.info('YOUTUBE_URL : %s', youtube_url)
-            # Youtube の URL から ID を取得
-            match_video = re.search(r"^[^v]+v=(.{11}).*", youtube_url)
-            if not match_video:
-                logger.error("YouTube URL が不正です。")
-                return None
-            video_id = match_video.group(1)
-
-            # Youtube はスクレイピングを禁止しているので YouTube Data API (v3) で情報を取得
-            search_response = self.__youtube.videos().list(
-                # 結果として snippet のみを取得
-                part="snippet",
-                # 検索条件は id
-                id=video_id,
-                # 1件のみ取得
-                maxResults=1
-            ).execute()
-
-            # 検索結果から情報を取得
-            for search_result in search_response.get("items", []):
-                # id
-                video_id = search_result["id"]
-                # タイトル
-                title = search_result["snippet"]["title"]
-                # 説明
-                description = search_result["snippet"]["description"]
-                # 投稿日
-                datetime_string = search_result["snippet"]["publishedAt"]
-                published_at = datetime.fromisoformat(datetime_string).astimezone(tz=timezone(timedelta(hours=+9)))
-                # チャンネルID
-                channel_id = search_result["snippet"]["channelId"]
-                # チャンネルタイトル
-                channel_title = search_result["snippet"]["channelTitle"]
-                # タグ（設定されていない＝キーが存在しない場合あり）
-                tags = search_result["snippet"].setdefault("tags", [])
-                # 取得した情報を返却
-                return (video_id, title, description, published_at, channel_id, channel_title, tags)
-
-            logger.error("指定したIDに一致する動画がありません。")
-            return None
+            # 有効期間内のキャッシュがある動画と、中断した実行で取得済みの動画は API に問い合わせない
+            request_ids = []
+            checkpoint_count = 0
+            for video_id in video_ids:
+                item = self.__video_cache.get(video_id) if self.__video_cache is not None else None
+                if item is None:
+                    item = self.__checkpoint_items.get(video_id)
+                    checkpoint_count += 1 if item is not None else 0
+                if item is None:
+                    request_ids.append(video_id)
+                    continue
+                video_infos[video_id] = self.__to_video_info(item)
+            logger.info("動画情報キャッシュ : ヒット %s件 / チェックポイント %s件 / 問い合わせ %s件", len(video_infos) - checkpoint_count, checkpoint_count, len(request_ids))
+            self.__metrics.increment("video_cache_hits", len(video_infos) - checkpoint_count)
+            self.__metrics.increment("video_cache_misses", len(request_ids))
+            self.__metrics.increment("checkpoint_hits", checkpoint_count)
+
+            # videos.list の上限件数ずつに分けて問い合わせる（複数ある場合はスレッドプールで並行、結果は分けた順）
+            chunks = [request_ids[offset:offset + VIDEOS_LIST_MAX_RESULTS] for offset in range(0, len(request_ids), VIDEOS_LIST_MAX_RESULTS)]
+            if len(chunks) > 1 and youtube_settings.max_workers > 1:
+                responses = self.__get_executor().map(self.__list_videos, chunks)
+            else:
+                responses = map(self.__list_videos, chunks)
+
+            revalidated_count = 0
+            for chunk, search_results in zip(chunks, responses):
+                if search_results is None:
+                    with self.__deferred_lock:
+                        self.__deferred_video_ids.update(chunk)
+                    continue
+                # 再開に備えて取得できた分をチェックポイントに書き込む
+                if self.__checkpoint is not None:
+                    self.__checkpoint.append(search_results)
+                # 検索結果から情報を取得
+                for search_result in search_results:
+                    if self.__video_cache is not None:
+                        # ETag が変わっていなければ有効期間のみ延長、変わっていれば置き換え
+                        if self.__video_cache.revalidate(search_result):
+                            revalidated_count += 1
+                        else:
+                            self.__video_cache.put(search_result)
+                    video_info = self.__to_video_info(search_result)
+                    video_infos[video_info[0]] = video_info
+            if revalidated_count > 0:
+                logger.info("動画情報キャッシュ : ETag が一致した動画 %s件", revalidated_count)
+            return video_infos
 
-        except HttpError as e:
-            logger.error("HTTP エラー %d が発生しました。%s" % (e.resp.status, e.content))
-            raise
         except Exception as e:
             logger.error("エラーが発生しました。%s" % e)
             raise
+        finally:
+            # 取得できた分のキャッシュは保存しておく
+            if self.__video_cache is not None:
+                self.__video_cache.save()
+
+    def set_video_infos(self, schedules: ScheduleCollection) -> None:
+        """
+        ホロジュール情報に Youtube 動画情報を付与する関数
+
+        動画情報の取得を見送ったものは動画情報を付与せず、is_deferred で見送ったかどうかを確認できる。
+
+        Args:
+            schedules (ScheduleCollection): ホロジュール情報のコレクション
+
+        Raises:
+            Exception: 動画情報の取得以外でエラーが発生した場合
+        """
+        # 動画IDごとにホロジュール情報をまとめる（同じ動画が複数のスケジュールに含まれる場合あり）
+        targets: dict[str, list[ScheduleModel]] = {}
+        for schedule in schedules:
+            logger.info('SCHEDULE_NAME : %s', schedule.name)
+            logger.info('SCHEDULE_AT : %s', schedule.streaming_at)
+            video_id = self.__get_video_id(schedule.url)
+            if video_id is None:
+                continue
+            targets.setdefault(video_id, []).append(schedule)
+
+        # 動画情報をまとめて取得して各ホロジュール情報に付与
+        video_infos = self.__get_youtube_video_infos(list(targets))
+        missing_ids = []
+        deferred_ids = []
+        for video_id, video_schedules in targets.items():
+            video_info = video_infos.get(video_id)
+            if video_info is None:
+                with self.__deferred_lock:
+                    if video_id in self.__deferred_video_ids:
+                        deferred_ids.append(video_id)
+                        self.__deferred_identities.update(ScheduleCollection.get_identity(schedule) for schedule in video_schedules)
+                        continue
+                missing_ids.append(video_id)
+                continue
+            for schedule in video_schedules:
+                schedule.set_video_info(*video_info)
+                logger.info('SCHEDULE_TITLE : %s', schedule.title)
+        # 動画IDの索引を作り直す
+        schedules.reindex()
+
+        if len(missing_ids) > 0:
+            logger.error("指定したIDに一致する動画がありません。 : %s", ", ".join(missing_ids))
+            self.__metrics.increment("videos_missing", len(missing_ids))
+        if len(deferred_ids) > 0:
+            logger.warning("動画情報の取得を見送りました（次回の実行で取得し直します）。 : %s件", len(deferred_ids))
+            self.__metrics.increment("videos_deferred", len(deferred_ids))
+        logger.info("動画情報を取得しました。 : %s件（未取得 %s件 / 見送り %s件 / 消費したクォータ %s）", len(video_infos), len(missing_ids), len(deferred_ids), self.__quota_budget.used)
 
     def get_holodules(self) -> ScheduleCollection:
         """
@@ -196,38 +976,103 @@ class Collector:
         Raises:
             Exception: ホロジュールの取得に失敗した場合
         """
+        # 実行ごとにクォータとメトリクスを数え直す
+        self.start_run()
         try:
-            # オプションのセットアップ
-            options = self.__setup_options()
-            # ドライバの初期化（オプション（ヘッドレスモード）とプロファイルを指定）
-            self.__driver = webdriver.Chrome(options=options)
-            # 指定したドライバに対して最大で10秒間待つように設定する
-            self.__wait = WebDriverWait(self.__driver, 10)
-            # ホロジュール情報の取得
+            # ホロジュールの HTML の取得とホロジュール情報の取得（取得できたページから解析する）
             self.__schedules = self.__get_schedules()
-            # Youtube情報の取得
-            for schedule in self.__schedules:
-                try:
-                    # ホロジュール情報に動画情報を付与
-                    logger.info('SCHEDULE_NAME : %s', schedule.name)
-                    logger.info('SCHEDULE_AT : %s', schedule.streaming_at)
-                    video_info = self.__get_youtube_video_info(schedule.url)
-                    if video_info == None:
-                        continue
-                    schedule.set_video_info(*video_info)
-                    logger.info('SCHEDULE_TITLE : %s', schedule.title)
-                except Exception as e:
-                    logger.error("エラーが発生しました。", exc_info=True)
-                    raise e
+            # Youtube情報の取得（動画IDをまとめて問い合わせる、前回のブロックを再利用したものは付与済み）
+            if len(self.__parsed_schedules) > 0:
+                with self.__metrics.measure("enrich"):
+                    self.set_video_infos(self.__parsed_schedules)
+                # 動画IDの索引を作り直す
+                self.__schedules.reindex()
         except Exception as e:
             logger.error("エラーが発生しました。", exc_info=True)
+            # ブラウザの状態が不明なため次回は作り直す
+            self.__close_driver()
             raise e
         finally:
-            # ドライバを閉じる
-            if self.__driver is not None and len(self.__driver.window_handles) > 0:
-                self.__driver.close()
+            # ブラウザを使い回さない場合はドライバを閉じる
+            if not self.__keep_browser:
+                self.__close_driver()
         return self.__schedules
 
+    def iter_schedules(self) -> Iterator[ScheduleModel]:
+        """
+        ホロジュールの HTML を取得して、解析したホロジュール情報を1件ずつ返す関数（動画情報は付与しない）
+
+        クォータとメトリクスは数え直さないため、実行の開始時に start_run を呼び出しておくこと。
+
+        Yields:
+            ScheduleModel: ホロジュール情報
+
+        Raises:
+            Exception: ホロジュールの取得に失敗した場合
+        """
+        for schedule, _ in self.iter_parsed_schedules():
+            yield schedule
+
+    def iter_parsed_schedules(self) -> Iterator[tuple[ScheduleModel, bool]]:
+        """
+        ホロジュールの HTML を取得して、解析したホロジュール情報を再利用したかどうかとあわせて1件ずつ返す関数
+
+        前回と同じブロックのホロジュール情報は、前回の実行で動画情報を付与して登録済みのものを返す。
+        クォータとメトリクスは数え直さないため、実行の開始時に start_run を呼び出しておくこと。
+
+        Yields:
+            tuple[ScheduleModel, bool]: ホロジュール情報, 前回のブロックを再利用したかどうか（再利用した場合は付与と登録が不要）
+
+        Raises:
+            Exception: ホロジュールの取得に失敗した場合
+        """
+        try:
+            yield from self.__iter_parsed()
+        except Exception as e:
+            logger.error("エラーが発生しました。", exc_info=True)
+            # ブラウザの状態が不明なため次回は作り直す
+            self.__close_driver()
+            raise e
+        finally:
+            # ブラウザを使い回さない場合はドライバを閉じる
+            if not self.__keep_browser:
+                self.__close_driver()
+
+    def __close_driver(self) -> None:
+        """
+        ドライバを終了する関数（close はタブを閉じるのみで chromedriver のプロセスが残るため quit で終了する）
+        """
+        if self.__driver is not None:
+            try:
+                self.__driver.quit()
+            except Exception:
+                # ブラウザが応答しない場合も参照は破棄する
+                logger.warning("ブラウザを終了できませんでした。", exc_info=True)
+        self.__driver = None
+        self.__wait = None
+
+    def close(self) -> None:
+        """
+        使い回しているブラウザ・スレッドプール・HTTP のセッション・API のクライアントを閉じる関数
+        """
+        self.__close_driver()
+        if self.__executor is not None:
+            self.__executor.shutdown()
+            self.__executor = None
+        if self.__session is not None:
+            self.__session.close()
+            self.__session = None
+        with self.__youtube_lock:
+            if self.__youtube is not None:
+                self.__youtube.close()
+                self.__youtube = None
+        # 他のインスタンスが期限を待たずに引き継げるようにリースを解放する
+        if self.__lease_manager is not None:
+            try:
+                self.__lease_manager.release()
+            except Exception:
+                logger.warning("リースを解放できませんでした。", exc_info=True)
+
     def save_to_mongodb(self):
         """
         配信者情報とホロジュール情報を MongoDB へ登録する関数
@@ -235,10 +1080,86 @@ class Collector:
         Raises:
             Exception: MongoDB への登録に失敗した場合
         """
+        # 前回から変わっていない場合は登録済みのため登録しない（ページソースの記録は次回の実行のために置き換える）
+        if self.__is_unchanged:
+            logger.info("ホロジュールが前回から変わっていないため登録しません。")
+            self.commit_blocks()
+            return
+        # 担当するタブがない場合と、リースを他のインスタンスが引き継いだ場合は登録しない
+        if self.is_standby or not self.renew_leases():
+            return
         # 配信者情報のDB登録
-        self.__streamers.save_to_mongodb()
-        # ホロジュール情報のDB登録
-        self.__schedules.save_to_mongodb()
+        with self.__metrics.measure("save_streamers"):
+            result = self.__streamers.save_to_mongodb()
+        logger.info("配信者情報 : 追加 %s件 / 更新 %s件 / 変更なし %s件", result.inserted, result.updated, result.unchanged)
+        # ホロジュール情報のDB登録（前回のブロックを再利用したものは登録済み、diff は削除を検出するため全体を渡す）
+        # （動画情報の取得を見送ったものは登録済みの内容を残して削除も検出せず、一部のタブのみを担当する場合はタブごとの範囲で削除を検出する）
+        save_mode = mongo_settings.save_mode
+        schedules = self.exclude_deferred(self.__schedules if save_mode == "diff" else self.__parsed_schedules)
+        scopes = self.get_removal_scopes() if save_mode == "diff" else None
+        with self.__metrics.measure("save_schedules"):
+            result = schedules.save_to_mongodb(save_mode, scopes is not None, scopes)
+        self.record_save_result(result)
+        logger.info("ホロジュール情報 : 追加 %s件 / 更新 %s件 / 変更なし %s件 / 削除 %s件（%s）", result.inserted, result.updated, result.unchanged, result.deleted, save_mode)
+        # 実行が完了したかどうかを記録して、登録できたブロックを次回の実行で再利用する
+        self.finish_save()
+
+    def exclude_deferred(self, schedules: ScheduleCollection) -> ScheduleCollection:
+        """
+        動画情報の取得を見送ったホロジュール情報を除く関数（登録済みの内容を動画情報のないもので置き換えないため）
+
+        Args:
+            schedules (ScheduleCollection): ホロジュール情報のコレクション
+
+        Returns:
+            ScheduleCollection: 見送ったものを除いたコレクション（見送ったものがない場合は渡したもの）
+        """
+        if not self.is_incomplete:
+            return schedules
+        return ScheduleCollection(schedules=[schedule for schedule in schedules if not self.is_deferred(schedule)])
+
+    def finish_save(self) -> None:
+        """
+        ホロジュール情報の登録後に、実行が完了したかどうかを MongoDB に記録する関数（登録に成功した後に呼び出す）
+
+        動画情報の取得を見送ったものがある場合は未完了として見送った動画IDを記録し、チェックポイントを残して次回の実行で再開する。
+        完了した場合はチェックポイントを削除する。
+        """
+        with self.__deferred_lock:
+            deferred_video_ids = sorted(self.__deferred_video_ids)
+        ScheduleCollection.save_sync_state(deferred_video_ids)
+        self.__metrics.set_gauge("run_incomplete", 1 if len(deferred_video_ids) > 0 else 0)
+        if len(deferred_video_ids) > 0:
+            logger.warning("動画情報の取得を見送ったものがあるため、未完了として登録しました。 : %s件", len(deferred_video_ids))
+        elif self.__checkpoint is not None:
+            self.__checkpoint.clear()
+        # リースで分担する場合は、タブに表示されていた配信者を次回の削除の検出に使う（見送った場合は前回の記録を残す）
+        if self.__lease_manager is not None and len(deferred_video_ids) == 0:
+            ScheduleCollection.save_tab_codes(self.__tab_codes)
+        # 登録できたブロックを次回の実行で再利用する（見送ったものを含むブロックは次回も解析する）
+        self.commit_blocks()
+
+    def record_save_result(self, result: SaveResult) -> None:
+        """
+        ホロジュール情報の登録結果の件数をメトリクスに記録して、変更があれば変更イベントとして出力する関数
+
+        Args:
+            result (SaveResult): ホロジュール情報の登録結果
+        """
+        self.__metrics.increment("mongo_inserted", result.inserted)
+        self.__metrics.increment("mongo_updated", result.updated)
+        self.__metrics.increment("mongo_unchanged", result.unchanged)
+        self.__metrics.increment("mongo_deleted", result.deleted)
+        if len(result.changes) == 0:
+            return
+        for change_type in CHANGE_TYPES:
+            self.__metrics.increment(f"schedules_{change_type}", sum(1 for change in result.changes if change.event == change_type))
+        logger.info(
+            "ホロジュール情報の変更 : %s",
+            " / ".join(f"{change_type} {sum(1 for change in result.changes if change.event == change_type)}件" for change_type in CHANGE_TYPES),
+        )
+        if self.__event_writer is not None:
+            self.__metrics.increment("events_written", self.__event_writer.write(result.changes))
 
     def output_to_csv(self, filepath: str):
         """
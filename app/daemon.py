@@ -0,0 +1,113 @@
+import signal
+import asyncio
+import threading
+import time
+from logging import getLogger
+from app.collector import Collector
+from app.pipeline import create_collector_pipeline
+from app.settings import get_metrics_settings
+
+logger = getLogger(__name__)
+metrics_settings = get_metrics_settings()
+
+class CollectorDaemon:
+    """
+    Collector を常駐させて、ホロジュールの取得・登録を一定間隔で繰り返すクラス
+
+    ブラウザ・YouTube API クライアント・MongoDB の接続はサイクル間で使い回す。
+    サイクルは1つのスレッドで順に実行するため重ならない（複数のプロセスで常駐する場合はリースでタブを分担する）。
+    """
+
+    def __init__(self, collector: Collector, interval: int, csvpath: str | None = None, use_pipeline: bool = False):
+        """
+        CollectorDaemonクラスのコンストラクタ
+
+        Args:
+            collector (Collector): 使い回す Collector オブジェクト
+            interval (int): サイクルの開始間隔（秒）
+            csvpath (str | None, optional): 出力するCSVファイルのパス
+            use_pipeline (bool, optional): 取得・付与・登録をパイプラインで並行して行うかどうか
+        """
+        self.__collector = collector
+        self.__interval = interval
+        self.__csvpath = csvpath
+        self.__use_pipeline = use_pipeline
+        # 停止要求
+        self.__stop_event = threading.Event()
+
+    def stop(self, signum: int | None = None, frame=None) -> None:
+        """
+        常駐の停止を要求する関数（シグナルハンドラとしても利用する）
+
+        Args:
+            signum (int | None, optional): シグナル番号
+            frame (optional): スタックフレーム
+        """
+        if signum is not None:
+            logger.info("シグナルを受信しました。停止します。 : %s", signal.Signals(signum).name)
+        self.__stop_event.set()
+
+    def run_cycle(self) -> None:
+        """
+        ホロジュールの取得・登録を1回実行する関数
+
+        Raises:
+            Exception: ホロジュールの取得・登録に失敗した場合
+        """
+        is_succeeded = False
+        try:
+            started_at = time.perf_counter()
+            if self.__use_pipeline:
+                # ホロジュールの取得と登録を並行して行う（取得の時間に登録の時間を含む）
+                schedules = asyncio.run(create_collector_pipeline(self.__collector).run())
+                collected_at = saved_at = time.perf_counter()
+            else:
+                # ホロジュールの取得
+                schedules = self.__collector.get_holodules()
+                collected_at = time.perf_counter()
+                # ホロジュールの登録
+                self.__collector.save_to_mongodb()
+                saved_at = time.perf_counter()
+            # ホロジュールの出力
+            if self.__csvpath is not None:
+                schedules.output_to_csv(self.__csvpath)
+            finished_at = time.perf_counter()
+            logger.info(
+                "サイクルが完了しました。 : %s件 取得 %.2f秒 / 登録 %.2f秒 / 出力 %.2f秒 / 合計 %.2f秒",
+                len(schedules),
+                collected_at - started_at,
+                saved_at - collected_at,
+                finished_at - saved_at,
+                finished_at - started_at,
+            )
+            is_succeeded = True
+        finally:
+            # サイクルごとのメトリクスを出力する（失敗した場合も出力する）
+            self.__collector.metrics.finish(is_succeeded)
+            self.__collector.metrics.write(metrics_settings)
+
+    def run(self) -> None:
+        """
+        停止を要求されるまでサイクルを一定間隔で繰り返す関数（サイクルの失敗では停止しない）
+        """
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+        logger.info("常駐を開始します。 : 間隔 %s秒", self.__interval)
+        next_at = time.monotonic()
+        try:
+            while not self.__stop_event.is_set():
+                try:
+                    self.run_cycle()
+                except Exception:
+                    logger.error("サイクルでエラーが発生しました。", exc_info=True)
+                # 開始間隔を保つ（サイクルが間隔を超えた場合は次の開始時刻まで飛ばす）
+                next_at += self.__interval
+                now = time.monotonic()
+                if next_at < now:
+                    skipped = int((now - next_at) // self.__interval) + 1
+                    logger.warning("サイクルが間隔を超えたため %s回分スキップします。", skipped)
+                    next_at += skipped * self.__interval
+                self.__stop_event.wait(next_at - now)
+        finally:
+            self.__collector.close()
+            logger.info("常駐を終了しました。")
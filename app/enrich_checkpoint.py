@@ -0,0 +1,105 @@
+import os
+import json
+import time
+import threading
+from logging import getLogger
+from app.settings import YoutubeSettings
+
+logger = getLogger(__name__)
+
+class EnrichCheckpoint:
+    """
+    実行中に取得した動画情報を JSONL（1行に1件の JSON）で追記するチェックポイント（スレッドセーフ）
+
+    実行が中断した場合、次の実行で読み込んで取得済みの動画の API の呼び出しを省く。
+    実行が最後まで完了したら削除する。
+    """
+
+    def __init__(self, filepath: str, max_age: int):
+        """
+        EnrichCheckpointクラスのコンストラクタ
+
+        Args:
+            filepath (str): チェックポイントのファイルのパス
+            max_age (int): 再開に使う期間（秒、最後の書き込みからこの期間を過ぎたファイルは使わない）
+        """
+        self.__filepath = filepath
+        self.__max_age = max_age
+        self.__lock = threading.Lock()
+
+    def load(self) -> dict[str, dict]:
+        """
+        中断した実行で取得した動画情報を読み込む関数
+
+        Returns:
+            dict[str, dict]: 動画IDをキーとした動画情報（ファイルがない・古い・読み込めない場合は空）
+        """
+        try:
+            with self.__lock:
+                if not os.path.exists(self.__filepath):
+                    return {}
+                if time.time() - os.path.getmtime(self.__filepath) > self.__max_age:
+                    logger.info("チェックポイントが古いため削除します。 : %s", self.__filepath)
+                    os.remove(self.__filepath)
+                    return {}
+                items = {}
+                with open(self.__filepath, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            item = json.loads(line)
+                        except ValueError:
+                            # 書き込みの途中で中断した行は読み飛ばす
+                            continue
+                        if isinstance(item, dict) and "id" in item:
+                            items[item["id"]] = item
+        except OSError as e:
+            logger.warning("チェックポイントの読み込みに失敗しました。%s", e, exc_info=True)
+            return {}
+        if len(items) > 0:
+            logger.info("チェックポイントから動画情報を読み込みました。 : %s（%s件）", self.__filepath, len(items))
+        return items
+
+    def append(self, items: list[dict]) -> None:
+        """
+        取得した動画情報を追記する関数（書き込みに失敗しても処理は継続する）
+
+        Args:
+            items (list[dict]): 動画情報（API の応答の items）
+        """
+        if len(items) == 0:
+            return
+        content = "".join(json.dumps(item, ensure_ascii=False) + "\n" for item in items)
+        try:
+            with self.__lock:
+                dirpath = os.path.dirname(self.__filepath)
+                if dirpath != "":
+                    os.makedirs(dirpath, exist_ok=True)
+                with open(self.__filepath, "a", encoding="utf-8") as f:
+                    f.write(content)
+        except OSError as e:
+            logger.warning("チェックポイントの書き込みに失敗しました。%s", e, exc_info=True)
+
+    def clear(self) -> None:
+        """
+        チェックポイントを削除する関数（実行が最後まで完了した場合に呼び出す）
+        """
+        try:
+            with self.__lock:
+                if os.path.exists(self.__filepath):
+                    os.remove(self.__filepath)
+        except OSError as e:
+            logger.warning("チェックポイントの削除に失敗しました。%s", e, exc_info=True)
+
+def create_enrich_checkpoint(settings: YoutubeSettings) -> EnrichCheckpoint | None:
+    """
+    設定に応じた動画情報のチェックポイントを生成する関数
+
+    Args:
+        settings (YoutubeSettings): YouTube Data API の設定
+
+    Returns:
+        EnrichCheckpoint | None: チェックポイント（checkpoint_path が空の場合は None）
+    """
+    if settings.checkpoint_path == "":
+        return None
+    return EnrichCheckpoint(settings.checkpoint_path, settings.checkpoint_max_age)
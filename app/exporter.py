@@ -0,0 +1,199 @@
+import os
+import csv
+import gzip
+import json
+from collections.abc import Iterable, Iterator
+from datetime import date, datetime, timedelta
+from logging import getLogger
+from typing import IO
+import pymongo
+from app.mongodb import MongoDB
+from app.mongo_indexes import ensure_indexes_once
+from app.settings import get_mongo_settings
+from app.models.schedule import ScheduleModel
+from app.models.streamers import StreamerCollection
+
+logger = getLogger(__name__)
+
+# 出力形式（csv : CSV / jsonl : 1行1件の JSON / jsonl.gz : gzip で圧縮した jsonl）
+EXPORT_FORMATS = ("csv", "jsonl", "jsonl.gz")
+# 出力する項目（ScheduleModel の項目から _id を除いたもの）
+EXPORT_FIELDS = tuple(name for name in ScheduleModel.model_fields if name != "id")
+# カーソルで一度に取得する件数の既定値
+DEFAULT_BATCH_SIZE = 1000
+
+def get_export_codes(codes: Iterable[str] = (), groups: Iterable[str] = (), affiliations: Iterable[str] = ()) -> list[str] | None:
+    """
+    配信者コード・グループ・所属の指定から、出力する配信者コードを求める関数
+
+    グループと所属は配信者情報から配信者コードに変換し、複数の条件を指定した場合はすべてを満たすものとする。
+
+    Args:
+        codes (Iterable[str], optional): 配信者コード
+        groups (Iterable[str], optional): グループ（例 : hololive）
+        affiliations (Iterable[str], optional): 所属（例 : gen0）
+
+    Returns:
+        list[str] | None: 配信者コード（指定がない場合は None = 絞り込まない）
+    """
+    codes, groups, affiliations = set(codes), set(groups), set(affiliations)
+    if len(codes) == 0 and len(groups) == 0 and len(affiliations) == 0:
+        return None
+    selected = None if len(codes) == 0 else codes
+    if len(groups) > 0 or len(affiliations) > 0:
+        matched = {
+            streamer.code
+            for streamer in StreamerCollection.streamers.values()
+            if (len(groups) == 0 or streamer.group in groups)
+            and (len(affiliations) == 0 or len(affiliations.intersection(streamer.affiliations or [])) > 0)
+        }
+        selected = matched if selected is None else selected & matched
+    return sorted(selected)
+
+def build_export_query(since: date | None = None, until: date | None = None, codes: list[str] | None = None) -> dict:
+    """
+    出力するスケジュールの検索条件を作る関数
+
+    Args:
+        since (date | None, optional): 配信日の開始（この日を含む）
+        until (date | None, optional): 配信日の終了（この日を含む）
+        codes (list[str] | None, optional): 配信者コード（None の場合は絞り込まない）
+
+    Returns:
+        dict: 検索条件
+    """
+    query = {}
+    streaming_at = {}
+    if since is not None:
+        streaming_at["$gte"] = datetime(since.year, since.month, since.day)
+    if until is not None:
+        streaming_at["$lt"] = datetime(until.year, until.month, until.day) + timedelta(days=1)
+    if len(streaming_at) > 0:
+        query["streaming_at"] = streaming_at
+    if codes is not None:
+        query["code"] = {"$in": codes}
+    return query
+
+def iter_schedule_documents(query: dict, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[dict]:
+    """
+    MongoDB からスケジュールのドキュメントを配信日時の順に1件ずつ返す関数（出力する項目のみを一定件数ずつ取得する）
+
+    Args:
+        query (dict): 検索条件
+        batch_size (int, optional): カーソルで一度に取得する件数
+
+    Yields:
+        dict: ドキュメント（出力する項目のみ）
+    """
+    # 配信日時の範囲と並び順は streaming_at・code のインデックスを使う
+    if get_mongo_settings().ensure_indexes:
+        ensure_indexes_once()
+    collection = MongoDB.getInstance().holoduledb.schedules
+    projection = {"_id": 0, **{name: 1 for name in EXPORT_FIELDS}}
+    cursor = collection.find(query, projection).sort([("streaming_at", pymongo.ASCENDING), ("code", pymongo.ASCENDING)]).batch_size(batch_size)
+    try:
+        yield from cursor
+    finally:
+        cursor.close()
+
+def to_text(value: object) -> str:
+    """
+    CSV に出力する値を文字列に変換する関数（日時は ISO 8601 形式、タグはカンマ区切り）
+
+    Args:
+        value (object): 値
+
+    Returns:
+        str: 文字列
+    """
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, list):
+        return ",".join(str(item) for item in value)
+    return str(value)
+
+def to_json_value(value: object) -> str:
+    """
+    JSON に変換できない値を変換する関数（json.dumps の default に指定する）
+
+    Args:
+        value (object): 値
+
+    Returns:
+        str: 文字列（日時は ISO 8601 形式）
+    """
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+def write_documents(f: IO[str], documents: Iterable[dict], export_format: str) -> int:
+    """
+    ドキュメントを1件ずつ指定した形式で書き込む関数
+
+    Args:
+        f (IO[str]): 書き込み先
+        documents (Iterable[dict]): ドキュメント
+        export_format (str): 出力形式（csv / jsonl / jsonl.gz）
+
+    Returns:
+        int: 書き込んだ件数
+    """
+    count = 0
+    if export_format == "csv":
+        csvwriter = csv.writer(f, delimiter=",")
+        csvwriter.writerow(EXPORT_FIELDS)
+        for document in documents:
+            csvwriter.writerow([to_text(document.get(name)) for name in EXPORT_FIELDS])
+            count += 1
+    else:
+        for document in documents:
+            f.write(json.dumps({name: document.get(name) for name in EXPORT_FIELDS}, ensure_ascii=False, default=to_json_value))
+            f.write("\n")
+            count += 1
+    return count
+
+def export_schedules(filepath: str, export_format: str, query: dict, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    MongoDB のスケジュールを検索条件で絞り込んでファイルに出力する関数
+
+    カーソルから1件ずつ書き込むため、件数によらずメモリの使用量は一定となる。
+    一時ファイルに書き込んでから置き換えるため、失敗した場合に途中までのファイルは残らない。
+
+    Args:
+        filepath (str): 出力するファイルのパス
+        export_format (str): 出力形式（csv / jsonl / jsonl.gz）
+        query (dict): 検索条件
+        batch_size (int, optional): カーソルで一度に取得する件数
+
+    Returns:
+        int: 出力した件数
+
+    Raises:
+        ValueError: 出力形式の指定が不正な場合
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"出力形式の指定が不正です。 : {export_format}")
+    dirpath = os.path.dirname(filepath)
+    if dirpath != "":
+        os.makedirs(dirpath, exist_ok=True)
+    temppath = filepath + ".tmp"
+    documents = iter_schedule_documents(query, batch_size)
+    try:
+        if export_format == "jsonl.gz":
+            with gzip.open(temppath, "wt", encoding="utf-8") as f:
+                count = write_documents(f, documents, export_format)
+        else:
+            # CSV は従来の出力と同じく Excel で開けるように BOM を付ける
+            encoding = "utf_8_sig" if export_format == "csv" else "utf-8"
+            with open(temppath, "w", newline="", encoding=encoding) as f:
+                count = write_documents(f, documents, export_format)
+        os.replace(temppath, filepath)
+    except (OSError, pymongo.errors.PyMongoError) as e:
+        logger.error("スケジュールの出力に失敗しました。%s", e, exc_info=True)
+        if os.path.exists(temppath):
+            os.remove(temppath)
+        raise
+    logger.info("スケジュールを出力しました。 : %s（%s件 / %s）", filepath, count, export_format)
+    return count
@@ -0,0 +1,206 @@
+import os
+import math
+import socket
+from datetime import datetime, timezone, timedelta
+from logging import getLogger
+import pymongo
+from pymongo.database import Database
+from app.mongodb import MongoDB
+from app.settings import LeaseSettings
+
+logger = getLogger(__name__)
+
+# リースを記録するコレクション
+LEASE_COLLECTION = "leases"
+# 稼働中のインスタンスを表すドキュメントの _id の接頭辞（取得対象のリースと同じコレクションに記録する）
+MEMBER_PREFIX = "member:"
+
+def get_utcnow() -> datetime:
+    """
+    現在の UTC の日時を返す関数（MongoDB に合わせてタイムゾーンなし）
+
+    Returns:
+        datetime: 現在の日時
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def get_default_owner() -> str:
+    """
+    インスタンスを識別する既定の名前を返す関数
+
+    Returns:
+        str: ホスト名とプロセスIDを組み合わせた名前
+    """
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+class LeaseManager:
+    """
+    MongoDB に期限付きのリースを記録して、複数のインスタンスで取得対象を分担するクラス
+
+    各インスタンスは稼働中のインスタンスの数で等分した数までリースを取得し、
+    他のインスタンスが保持しているリースは期限が切れるまで取得しない（期限が切れたら引き継ぐ）。
+    日時は各インスタンスの時計で比べるため、インスタンス間の時計のずれは ttl より十分小さくしておくこと。
+    """
+
+    def __init__(self, owner: str, ttl: int, db: Database | None = None):
+        """
+        LeaseManagerクラスのコンストラクタ
+
+        Args:
+            owner (str): インスタンスを識別する名前
+            ttl (int): リースの有効期間（秒）
+            db (Database | None, optional): データベース（None の場合は holoduledb）
+        """
+        self.__owner = owner
+        self.__ttl = timedelta(seconds=ttl)
+        self.__db = db
+        self.__held: list[str] = []
+
+    @property
+    def owner(self) -> str:
+        """
+        インスタンスを識別する名前を返す
+
+        Returns:
+            str: インスタンスを識別する名前
+        """
+        return self.__owner
+
+    @property
+    def held(self) -> list[str]:
+        """
+        保持しているリースのキーを返す
+
+        Returns:
+            list[str]: リースのキー
+        """
+        return list(self.__held)
+
+    def __get_collection(self) -> pymongo.collection.Collection:
+        """
+        リースを記録するコレクションを取得する関数
+
+        Returns:
+            pymongo.collection.Collection: コレクション
+        """
+        db = self.__db if self.__db is not None else MongoDB.getInstance().holoduledb
+        return db[LEASE_COLLECTION]
+
+    def __heartbeat(self, now: datetime) -> int:
+        """
+        このインスタンスが稼働中であることを記録して、稼働中のインスタンスの数を返す関数
+
+        Args:
+            now (datetime): 現在の日時
+
+        Returns:
+            int: 稼働中のインスタンスの数（このインスタンスを含む）
+        """
+        collection = self.__get_collection()
+        collection.replace_one({"_id": MEMBER_PREFIX + self.__owner}, {"expires_at": now + self.__ttl}, upsert=True)
+        return max(collection.count_documents({"_id": {"$regex": f"^{MEMBER_PREFIX}"}, "expires_at": {"$gt": now}}), 1)
+
+    def __claim(self, key: str, now: datetime) -> bool:
+        """
+        リースを取得する関数（保持していない、または期限が切れたものを1回の操作で取得する）
+
+        Args:
+            key (str): リースのキー
+            now (datetime): 現在の日時
+
+        Returns:
+            bool: 取得できたかどうか（他のインスタンスが期限内のリースを保持している場合は False）
+        """
+        try:
+            previous = self.__get_collection().find_one_and_update(
+                {"_id": key, "$or": [{"owner": self.__owner}, {"expires_at": {"$lte": now}}]},
+                {"$set": {"owner": self.__owner, "expires_at": now + self.__ttl}},
+                upsert=True,
+                return_document=pymongo.ReturnDocument.BEFORE,
+            )
+        except pymongo.errors.DuplicateKeyError:
+            # 条件に一致しない（他のインスタンスが保持している）ため新しく登録しようとして重複した
+            return False
+        if previous is not None and previous.get("owner") != self.__owner:
+            logger.info("期限が切れたリースを引き継ぎました。 : %s（%s から）", key, previous.get("owner"))
+        return True
+
+    def acquire(self, keys: list[str]) -> list[str]:
+        """
+        稼働中のインスタンスで等分した数までリースを取得・延長する関数（実行の開始時に呼び出す）
+
+        等分した数より多く保持している場合は、多い分を解放して他のインスタンスに譲る。
+
+        Args:
+            keys (list[str]): 分担する取得対象のキー（すべてのインスタンスで同じ順）
+
+        Returns:
+            list[str]: 保持しているリースのキー（keys の順）
+        """
+        now = get_utcnow()
+        share = math.ceil(len(keys) / self.__heartbeat(now))
+        # 保持しているものを優先して延長して、足りない分は空いているものを取得する
+        candidates = [key for key in keys if key in self.__held] + [key for key in keys if key not in self.__held]
+        held = []
+        for key in candidates:
+            if len(held) >= share:
+                break
+            if self.__claim(key, now):
+                held.append(key)
+        excess = [key for key in self.__held if key not in held]
+        if len(excess) > 0:
+            self.release(excess)
+        self.__held = [key for key in keys if key in held]
+        return self.held
+
+    def renew(self) -> bool:
+        """
+        保持しているリースの期限を延長する関数（登録の前に呼び出す）
+
+        Returns:
+            bool: すべてのリースを保持できているかどうか（期限が切れて他のインスタンスが引き継いだ場合は False）
+        """
+        if len(self.__held) == 0:
+            return True
+        now = get_utcnow()
+        self.__heartbeat(now)
+        result = self.__get_collection().update_many(
+            {"_id": {"$in": self.__held}, "owner": self.__owner},
+            {"$set": {"expires_at": now + self.__ttl}},
+        )
+        return result.matched_count == len(self.__held)
+
+    def release(self, keys: list[str] | None = None) -> None:
+        """
+        リースを解放する関数（他のインスタンスが期限を待たずに取得できるようにする）
+
+        Args:
+            keys (list[str] | None, optional): 解放するリースのキー（None の場合はすべてと、稼働中の記録）
+        """
+        collection = self.__get_collection()
+        if keys is None:
+            keys = self.__held
+            collection.delete_one({"_id": MEMBER_PREFIX + self.__owner})
+        if len(keys) > 0:
+            collection.delete_many({"_id": {"$in": keys}, "owner": self.__owner})
+            logger.info("リースを解放しました。 : %s", ", ".join(keys))
+        self.__held = [key for key in self.__held if key not in keys]
+
+def create_lease_manager(settings: LeaseSettings) -> LeaseManager | None:
+    """
+    設定に応じたリースの管理を生成する関数
+
+    Args:
+        settings (LeaseSettings): リースの設定
+
+    Returns:
+        LeaseManager | None: リースの管理（enabled が False の場合は None）
+
+    Raises:
+        ValueError: リースの有効期間の指定が不正な場合
+    """
+    if not settings.enabled:
+        return None
+    if settings.ttl <= 0:
+        raise ValueError(f"リースの有効期間は1秒以上を指定してください。 : {settings.ttl}")
+    return LeaseManager(settings.owner or get_default_owner(), settings.ttl)
@@ -0,0 +1,243 @@
+import os
+import json
+import math
+import time
+import threading
+from contextlib import contextmanager
+from collections.abc import Iterator
+from logging import getLogger
+from app.settings import MetricsSettings
+
+logger = getLogger(__name__)
+
+# Prometheus のメトリクス名の接頭辞
+METRIC_PREFIX = "holocollect"
+# 出力するパーセンタイル
+QUANTILES = (0.5, 0.9, 0.99)
+
+def get_percentile(values: list[float], quantile: float) -> float:
+    """
+    パーセンタイルを求める関数（最近傍順位法）
+
+    Args:
+        values (list[float]): 値のリスト（昇順に並べ替え済み）
+        quantile (float): 分位（0 〜 1）
+
+    Returns:
+        float: パーセンタイル（値がない場合は 0）
+    """
+    if len(values) == 0:
+        return 0.0
+    rank = max(math.ceil(quantile * len(values)), 1)
+    return values[rank - 1]
+
+def get_process_tree_rss(pid: int) -> int | None:
+    """
+    プロセスとその子孫のプロセスの常駐メモリ（RSS）の合計を求める関数（/proc のある Linux のみ）
+
+    Args:
+        pid (int): プロセスID
+
+    Returns:
+        int | None: RSS の合計（バイト、求められない場合は None）
+    """
+    if not os.path.isdir(f"/proc/{pid}"):
+        return None
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    total = 0
+    pids = [pid]
+    while len(pids) > 0:
+        current = pids.pop()
+        try:
+            with open(f"/proc/{current}/statm", "r", encoding="utf-8") as f:
+                total += int(f.read().split()[1]) * page_size
+            for task in os.listdir(f"/proc/{current}/task"):
+                with open(f"/proc/{current}/task/{task}/children", "r", encoding="utf-8") as f:
+                    pids.extend(int(child) for child in f.read().split())
+        except (OSError, ValueError, IndexError):
+            # 途中で終了したプロセスは数えない
+            continue
+    return total
+
+class RunMetrics:
+    """
+    1回の実行の処理時間・件数・API の呼び出しなどを記録するクラス（スレッドセーフ）
+
+    timings : 段ごとの処理時間（秒、同じ段は合計）
+    counters : 件数（加算）
+    gauges : その時点の値（上書き）
+    latencies : 呼び出しごとの所要時間（秒、パーセンタイルを出力）
+    """
+
+    def __init__(self):
+        """
+        RunMetricsクラスのコンストラクタ
+        """
+        self.__lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        記録を消去する関数（実行の開始時に呼び出す）
+        """
+        with self.__lock:
+            self.__started_at = time.time()
+            self.__started_counter = time.perf_counter()
+            self.__timings: dict[str, float] = {}
+            self.__counters: dict[str, int] = {}
+            self.__gauges: dict[str, float] = {}
+            self.__latencies: dict[str, list[float]] = {}
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        """
+        with 文のブロックの処理時間を記録するコンテキストマネージャ
+
+        Args:
+            name (str): 段の名前
+        """
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_timing(name, time.perf_counter() - started_at)
+
+    def add_timing(self, name: str, seconds: float) -> None:
+        """
+        処理時間を加算する関数
+
+        Args:
+            name (str): 段の名前
+            seconds (float): 処理時間（秒）
+        """
+        with self.__lock:
+            self.__timings[name] = self.__timings.get(name, 0.0) + seconds
+
+    def increment(self, name: str, value: int = 1) -> None:
+        """
+        件数を加算する関数
+
+        Args:
+            name (str): 件数の名前
+            value (int, optional): 加算する値
+        """
+        with self.__lock:
+            self.__counters[name] = self.__counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """
+        値を記録する関数
+
+        Args:
+            name (str): 値の名前
+            value (float): 値
+        """
+        with self.__lock:
+            self.__gauges[name] = value
+
+    def observe(self, name: str, seconds: float) -> None:
+        """
+        呼び出しごとの所要時間を記録する関数
+
+        Args:
+            name (str): 呼び出しの名前
+            seconds (float): 所要時間（秒）
+        """
+        with self.__lock:
+            self.__latencies.setdefault(name, []).append(seconds)
+
+    def finish(self, is_succeeded: bool) -> None:
+        """
+        実行の終了時に成否と開始からの処理時間を記録する関数
+
+        Args:
+            is_succeeded (bool): 実行に成功したかどうか
+        """
+        self.set_gauge("run_succeeded", 1 if is_succeeded else 0)
+        self.add_timing("total", time.perf_counter() - self.__started_counter)
+
+    def get_summary(self) -> dict:
+        """
+        記録した内容の集計を取得する関数
+
+        Returns:
+            dict: 集計（started_at, timings, counters, gauges, latencies）
+        """
+        with self.__lock:
+            latencies = {}
+            for name, values in self.__latencies.items():
+                values = sorted(values)
+                latencies[name] = {
+                    "count": len(values),
+                    "sum": sum(values),
+                    "max": values[-1],
+                    **{f"p{int(quantile * 100)}": get_percentile(values, quantile) for quantile in QUANTILES},
+                }
+            return {
+                "started_at": self.__started_at,
+                "timings": dict(self.__timings),
+                "counters": dict(self.__counters),
+                "gauges": dict(self.__gauges),
+                "latencies": latencies,
+            }
+
+    def to_prometheus(self) -> str:
+        """
+        記録した内容を Prometheus のテキスト形式に変換する関数
+
+        Returns:
+            str: Prometheus のテキスト形式
+        """
+        summary = self.get_summary()
+        lines = [
+            f"# TYPE {METRIC_PREFIX}_run_started_timestamp_seconds gauge",
+            f"{METRIC_PREFIX}_run_started_timestamp_seconds {summary['started_at']:.3f}",
+            f"# TYPE {METRIC_PREFIX}_stage_duration_seconds gauge",
+        ]
+        for name, seconds in sorted(summary["timings"].items()):
+            lines.append(f'{METRIC_PREFIX}_stage_duration_seconds{{stage="{name}"}} {seconds:.6f}')
+        for name, value in sorted(summary["counters"].items()):
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} gauge")
+            lines.append(f"{METRIC_PREFIX}_{name} {value}")
+        for name, value in sorted(summary["gauges"].items()):
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} gauge")
+            lines.append(f"{METRIC_PREFIX}_{name} {value}")
+        for name, latency in sorted(summary["latencies"].items()):
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name}_seconds summary")
+            for quantile in QUANTILES:
+                lines.append(f'{METRIC_PREFIX}_{name}_seconds{{quantile="{quantile}"}} {latency[f"p{int(quantile * 100)}"]:.6f}')
+            lines.append(f"{METRIC_PREFIX}_{name}_seconds_sum {latency['sum']:.6f}")
+            lines.append(f"{METRIC_PREFIX}_{name}_seconds_count {latency['count']}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, settings: MetricsSettings) -> None:
+        """
+        記録した内容を JSON と Prometheus のテキスト形式のファイルに書き込む関数（パスが空の場合は書き込まない）
+
+        Args:
+            settings (MetricsSettings): メトリクスの設定
+        """
+        try:
+            if settings.json_path != "":
+                self.__write_file(settings.json_path, json.dumps(self.get_summary(), ensure_ascii=False, indent=2))
+            if settings.prometheus_path != "":
+                self.__write_file(settings.prometheus_path, self.to_prometheus())
+        except OSError as e:
+            # メトリクスの書き込みに失敗しても処理は継続する
+            logger.warning("メトリクスの書き込みに失敗しました。%s", e, exc_info=True)
+
+    def __write_file(self, filepath: str, content: str) -> None:
+        """
+        一時ファイルに書き込んでから置き換える関数（読み取り側が書き込み途中の内容を読まないようにする）
+
+        Args:
+            filepath (str): ファイルのパス
+            content (str): 書き込む内容
+        """
+        dirpath = os.path.dirname(filepath)
+        if dirpath != "":
+            os.makedirs(dirpath, exist_ok=True)
+        temppath = filepath + ".tmp"
+        with open(temppath, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(temppath, filepath)
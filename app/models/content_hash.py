@@ -0,0 +1,15 @@
+import json
+import hashlib
+
+def get_content_hash(document: dict | list) -> str:
+    """
+    ドキュメントの内容からハッシュ値を求める関数（キーの順序に依存しない）
+
+    Args:
+        document (dict | list): ドキュメント（またはドキュメントのリスト）
+
+    Returns:
+        str: ハッシュ値（SHA-1 の16進数表記）
+    """
+    serialized = json.dumps(document, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(serialized.encode("utf-8")).hexdigest()
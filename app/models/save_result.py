@@ -0,0 +1,19 @@
+from pydantic import BaseModel, Field
+from app.models.schedule_change import ScheduleChange
+
+class SaveResult(BaseModel):
+    """
+    MongoDB への登録結果を管理するクラス
+
+    Args:
+        inserted (int): 追加したドキュメントの数
+        updated (int): 更新したドキュメントの数
+        unchanged (int): 内容が変わっていないため更新しなかったドキュメントの数
+        deleted (int): 削除したドキュメントの数
+        changes (list[ScheduleChange]): 前回のスナップショットからの変更（保存方法が diff の場合のみ）
+    """
+    inserted: int = Field(default=0, description="追加したドキュメントの数")
+    updated: int = Field(default=0, description="更新したドキュメントの数")
+    unchanged: int = Field(default=0, description="更新しなかったドキュメントの数")
+    deleted: int = Field(default=0, description="削除したドキュメントの数")
+    changes: list[ScheduleChange] = Field(default_factory=list, description="前回のスナップショットからの変更")
@@ -1,7 +1,7 @@
 import re
 from datetime import datetime, timezone, timedelta
 from typing_extensions import Annotated
-from pydantic import BaseModel, ConfigDict, Field, computed_field
+from pydantic import BaseModel, ConfigDict, Field
 from pydantic.functional_validators import BeforeValidator
 
 PyObjectId = Annotated[str, BeforeValidator(str)]
@@ -69,7 +69,6 @@ class ScheduleModel(BaseModel):
     )
 
     @property
-    @computed_field
     def key(self) -> str:
         """
         スケジュールのキーを返す
@@ -0,0 +1,35 @@
+from datetime import datetime
+from pydantic import BaseModel, Field
+from app.models.schedule import JST
+
+# 変更の種類（added : 追加 / rescheduled : 配信日時の変更 / changed : 動画情報の変更 / removed : 削除）
+CHANGE_ADDED = "added"
+CHANGE_RESCHEDULED = "rescheduled"
+CHANGE_CHANGED = "changed"
+CHANGE_REMOVED = "removed"
+CHANGE_TYPES = (CHANGE_ADDED, CHANGE_RESCHEDULED, CHANGE_CHANGED, CHANGE_REMOVED)
+
+class ScheduleChange(BaseModel):
+    """
+    前回のスナップショット（MongoDB に登録済みのスケジュール）からの変更を管理するクラス
+
+    Args:
+        event (str): 変更の種類（added / rescheduled / changed / removed）
+        detected_at (datetime): 変更を検出した日時
+        video_id (str | None): 動画ID
+        key (str): スケジュールのキー（配信者コードと配信日時）
+        code (str | None): 配信者コード
+        streaming_at (datetime | None): 配信日時（removed の場合は削除したスケジュールの配信日時）
+        previous_streaming_at (datetime | None): 変更前の配信日時（rescheduled の場合のみ）
+        changed_fields (list[str]): 変更された項目（rescheduled・changed の場合のみ）
+        schedule (dict): スケジュールのドキュメント（removed の場合は削除したもの）
+    """
+    event: str = Field(description="変更の種類")
+    detected_at: datetime = Field(default_factory=lambda: datetime.now(tz=JST), description="変更を検出した日時")
+    video_id: str | None = Field(default=None, description="動画ID")
+    key: str = Field(default="", description="スケジュールのキー")
+    code: str | None = Field(default=None, description="配信者コード")
+    streaming_at: datetime | None = Field(default=None, description="配信日時")
+    previous_streaming_at: datetime | None = Field(default=None, description="変更前の配信日時")
+    changed_fields: list[str] = Field(default_factory=list, description="変更された項目")
+    schedule: dict = Field(default_factory=dict, description="スケジュールのドキュメント")
@@ -0,0 +1,73 @@
+from collections.abc import Sequence
+from datetime import datetime
+from typing import NamedTuple
+from app.models.schedule import ScheduleModel
+
+class ScheduleRecord(NamedTuple):
+    """
+    検証済みのスケジュール情報をまとめて扱うための軽量なレコードクラス
+
+    ScheduleModel と同じ項目を持つが、検証を行わず、インスタンスごとの辞書も持たない。
+    過去分の一括登録などで件数が多い場合に、ScheduleModel を経由せずに MongoDB のドキュメントを作る。
+    （ScheduleModel.model_construct は既定値の生成のたびに関数のシグネチャを調べるため、検証ありの生成より遅い）
+
+    Args:
+        code (str | None): 配信者コード
+        video_id (str | None): 動画ID
+        streaming_at (datetime | None): 配信日時
+        name (str | None): 配信者名
+        title (str | None): タイトル
+        url (str | None): Youtube URL
+        description (str | None): 概要
+        published_at (datetime | None): 投稿日時
+        channel_id (str | None): チャンネルID
+        channel_title (str | None): チャンネル名
+        tags (Sequence[str]): タグ
+    """
+    code: str | None = None
+    video_id: str | None = None
+    streaming_at: datetime | None = None
+    name: str | None = None
+    title: str | None = None
+    url: str | None = None
+    description: str | None = None
+    published_at: datetime | None = None
+    channel_id: str | None = None
+    channel_title: str | None = None
+    tags: Sequence[str] = ()
+
+    @classmethod
+    def from_model(cls, schedule: ScheduleModel) -> "ScheduleRecord":
+        """
+        ScheduleModelオブジェクトからレコードを作る関数
+
+        Args:
+            schedule (ScheduleModel): ScheduleModelオブジェクト
+
+        Returns:
+            ScheduleRecord: レコード
+        """
+        return cls(
+            schedule.code,
+            schedule.video_id,
+            schedule.streaming_at,
+            schedule.name,
+            schedule.title,
+            schedule.url,
+            schedule.description,
+            schedule.published_at,
+            schedule.channel_id,
+            schedule.channel_title,
+            schedule.tags,
+        )
+
+    def to_document(self) -> dict:
+        """
+        MongoDB のドキュメントに変換する関数（ScheduleModel の model_dump(by_alias=True, exclude=["id"]) と同じ内容）
+
+        Returns:
+            dict: ドキュメント
+        """
+        document = self._asdict()
+        document["tags"] = list(self.tags)
+        return document
@@ -1,42 +1,150 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 import pymongo
 import csv
+import bisect
+import threading
+from datetime import date, datetime, timezone
 from logging import getLogger
+from typing import NamedTuple
+from collections.abc import Iterable, Iterator
 from app.models.schedule import ScheduleModel
+from app.models.schedule_record import ScheduleRecord
+from app.models.schedule_change import CHANGE_ADDED, CHANGE_RESCHEDULED, CHANGE_CHANGED, CHANGE_REMOVED, ScheduleChange
+from app.models.save_result import SaveResult
+from app.models.content_hash import get_content_hash
 from app.mongodb import MongoDB
+from app.schedule_queries import invalidate_query_cache
 
 logger = getLogger(__name__)
 
+# 保存方法（replace : 削除して一括登録 / upsert : 変更のあったもののみ置き換え / diff : 前回との差分のみを登録）
+SAVE_MODES = ("replace", "upsert", "diff")
+# 変更された項目の比較から除く項目
+DIFF_IGNORED_FIELDS = ("_id", "content_hash")
+# タブごとに前回表示された配信者コードを記録する sync_states の _id の接頭辞
+TAB_CODES_PREFIX = "tab_codes:"
+
+def get_comparable_value(value: object) -> object:
+    """
+    登録済みのドキュメントと比較できる値に変換する関数（MongoDB はタイムゾーン付きの日時を UTC の日時として返す）
+
+    Args:
+        value (object): 値
+
+    Returns:
+        object: 比較できる値
+    """
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+class RemovalScope(NamedTuple):
+    """
+    diff の場合に削除を検出する範囲（範囲内の登録済みのスケジュールのうち、今回含まれていないものを削除とする）
+
+    Args:
+        start (datetime): 配信日時の範囲の始まり（含む）
+        end (datetime): 配信日時の範囲の終わり（含む）
+        codes (frozenset[str] | None): 対象の配信者コード（None の場合はすべて）
+    """
+    start: datetime
+    end: datetime
+    codes: frozenset[str] | None
+
 class ScheduleCollection(BaseModel):
     """
     ScheduleModelオブジェクトのコレクションクラス
+
+    追加した順のリストに加えて、video_id・キー・配信者コード・配信日ごとの索引を持ち、
+    同じスケジュール（配信者コード・配信日時・URL が同じもの）は追加時に後のもので置き換える。
+    video_id は追加した後に動画情報として設定されるため、設定した後は reindex で索引を作り直すこと。
     """
     schedules: list[ScheduleModel] = []
-    index: int = 0
+    # 索引の更新とイテレーションを排他するためのロック
+    _lock: threading.RLock = PrivateAttr(default_factory=threading.RLock)
+    # 同じスケジュールの判定用（識別子 → リストの位置）
+    _positions: dict[tuple, int] = PrivateAttr(default_factory=dict)
+    # 索引（値 → 識別子 → ScheduleModelオブジェクト、置き換え時に1件ずつ削除できるように識別子で持つ）
+    _by_video_id: dict[str, dict[tuple, ScheduleModel]] = PrivateAttr(default_factory=dict)
+    _by_key: dict[str, dict[tuple, ScheduleModel]] = PrivateAttr(default_factory=dict)
+    _by_code: dict[str, dict[tuple, ScheduleModel]] = PrivateAttr(default_factory=dict)
+    _by_date: dict[date, dict[tuple, ScheduleModel]] = PrivateAttr(default_factory=dict)
+    # 配信日時の順に並べたもの（範囲の検索で必要になったときに作る）
+    _by_time: list[ScheduleModel] | None = PrivateAttr(default=None)
+
+    def model_post_init(self, __context) -> None:
+        """
+        生成時に渡されたスケジュールの重複を除いて索引を作る
+        """
+        self.reindex()
 
-    def __iter__(self) -> 'ScheduleCollection':
+    @staticmethod
+    def get_identity(schedule: ScheduleModel) -> tuple:
         """
-        イテレータを返す
+        同じスケジュールかどうかを判定するための識別子を返す
+
+        Args:
+            schedule (ScheduleModel): ScheduleModelオブジェクト
 
         Returns:
-            ScheduleCollection: ScheduleCollectionオブジェクト
+            tuple: 識別子（配信者コード, 配信日時, URL）
         """
-        self.index = 0
-        return self
+        return (schedule.code, schedule.streaming_at, schedule.url)
 
-    def __next__(self) -> ScheduleModel:
+    @staticmethod
+    def get_document_key(document: dict) -> tuple:
         """
-        次のScheduleModelオブジェクトを返す
+        MongoDB のドキュメントを特定するためのキーを返す（video_id があるものは video_id と配信者コード、ないものは配信者コードと配信日時）
+
+        コラボ配信などで1つの動画が複数の配信者のスケジュールに含まれるため、video_id のみでは特定できない。
+
+        Args:
+            document (dict): ドキュメント
 
         Returns:
-            ScheduleModel: ScheduleModelオブジェクト
+            tuple: キー
         """
-        if self.index < len(self.schedules):
-            result = self.schedules[self.index]
-            self.index += 1
-            return result
-        else:
-            raise StopIteration
+        if document.get("video_id") is not None:
+            return ("video_id", document["video_id"], document.get("code"))
+        return ("key", document.get("code"), document.get("streaming_at"))
+
+    @staticmethod
+    def get_document_query(key: tuple) -> dict:
+        """
+        get_document_key で求めたキーに一致するドキュメントの検索条件を返す
+
+        Args:
+            key (tuple): キー
+
+        Returns:
+            dict: 検索条件
+        """
+        if key[0] == "video_id":
+            return {"video_id": key[1], "code": key[2]}
+        return {"video_id": None, "code": key[1], "streaming_at": key[2]}
+
+    def get_window(self) -> tuple[datetime, datetime] | None:
+        """
+        スケジュールの配信日時の範囲（ホロジュールに表示されている期間）を返す
+
+        Returns:
+            tuple[datetime, datetime] | None: 最も早い配信日時と最も遅い配信日時（スケジュールがない場合は None）
+        """
+        with self._lock:
+            streaming_ats = [schedule.streaming_at for schedule in self.schedules if schedule.streaming_at is not None]
+        if len(streaming_ats) == 0:
+            return None
+        return (min(streaming_ats), max(streaming_ats))
+
+    def __iter__(self) -> Iterator[ScheduleModel]:
+        """
+        イテレータを返す（呼び出し時点のスナップショットのため、複数のループや他スレッドでの追加と干渉しない）
+
+        Returns:
+            Iterator[ScheduleModel]: ScheduleModelオブジェクトのイテレータ
+        """
+        with self._lock:
+            return iter(tuple(self.schedules))
 
     def __len__(self) -> int:
         """
@@ -56,14 +164,53 @@ class ScheduleCollection(BaseModel):
         """
         return self.schedules[index]
 
-    def append(self, schedule: ScheduleModel) -> None:
+    def __contains__(self, schedule: ScheduleModel) -> bool:
+        """
+        同じスケジュールが含まれているかどうかを返す
+
+        Args:
+            schedule (ScheduleModel): ScheduleModelオブジェクト
+
+        Returns:
+            bool: 含まれているかどうか
+        """
+        return ScheduleCollection.get_identity(schedule) in self._positions
+
+    def append(self, schedule: ScheduleModel) -> bool:
         """
-        ScheduleModelオブジェクトを追加する
+        ScheduleModelオブジェクトを追加する（同じスケジュールがある場合はその位置で置き換える）
         
         Args:
             schedule (ScheduleModel): ScheduleModelオブジェクト
+
+        Returns:
+            bool: 追加したかどうか（置き換えた場合は False）
+        """
+        with self._lock:
+            identity = ScheduleCollection.get_identity(schedule)
+            position = self._positions.get(identity)
+            if position is not None:
+                self.__remove_from_indexes(self.schedules[position], identity)
+                self.schedules[position] = schedule
+                self.__add_to_indexes(schedule, identity)
+                return False
+            self._positions[identity] = len(self.schedules)
+            self.schedules.append(schedule)
+            self.__add_to_indexes(schedule, identity)
+            return True
+
+    def merge(self, other: Iterable[ScheduleModel]) -> int:
+        """
+        他のスケジュールをまとめて追加する（同じスケジュールは置き換える）
+
+        Args:
+            other (Iterable[ScheduleModel]): 追加するScheduleModelオブジェクト
+
+        Returns:
+            int: 追加した数（置き換えた数は含まない）
         """
-        self.schedules.append(schedule)
+        with self._lock:
+            return sum(1 for schedule in other if self.append(schedule))
 
     def remove_at(self, index: int) -> None:
         """
@@ -72,44 +219,500 @@ class ScheduleCollection(BaseModel):
         Args:
             index (int): インデックス
         """
-        self.schedules.pop(index)
+        with self._lock:
+            self.schedules.pop(index)
+            self.reindex()
+
+    def reindex(self) -> None:
+        """
+        重複を除いて索引を作り直す（動画情報の設定など、追加した後に ScheduleModel を変更した場合に呼び出す）
+        """
+        with self._lock:
+            schedules = self.schedules
+            self.schedules = []
+            self._positions = {}
+            self._by_video_id = {}
+            self._by_key = {}
+            self._by_code = {}
+            self._by_date = {}
+            self._by_time = None
+            for schedule in schedules:
+                self.append(schedule)
+
+    def __get_index_values(self, schedule: ScheduleModel) -> list[tuple[dict, object]]:
+        """
+        各索引と、その索引での値の組を返す（値がないものは含まない）
+
+        Args:
+            schedule (ScheduleModel): ScheduleModelオブジェクト
+
+        Returns:
+            list[tuple[dict, object]]: 索引と値の組のリスト
+        """
+        index_values = [
+            (self._by_video_id, schedule.video_id),
+            (self._by_key, schedule.key),
+            (self._by_code, schedule.code),
+            (self._by_date, schedule.streaming_at.date() if schedule.streaming_at is not None else None),
+        ]
+        return [(index, value) for index, value in index_values if value is not None]
+
+    def __add_to_indexes(self, schedule: ScheduleModel, identity: tuple) -> None:
+        """
+        索引に追加する
+
+        Args:
+            schedule (ScheduleModel): ScheduleModelオブジェクト
+            identity (tuple): 識別子
+        """
+        for index, value in self.__get_index_values(schedule):
+            index.setdefault(value, {})[identity] = schedule
+        self._by_time = None
+
+    def __remove_from_indexes(self, schedule: ScheduleModel, identity: tuple) -> None:
+        """
+        索引から削除する
+
+        Args:
+            schedule (ScheduleModel): ScheduleModelオブジェクト
+            identity (tuple): 識別子
+        """
+        for index, value in self.__get_index_values(schedule):
+            entries = index.get(value)
+            if entries is None:
+                continue
+            entries.pop(identity, None)
+            if len(entries) == 0:
+                del index[value]
+        self._by_time = None
+
+    def get_by_video_id(self, video_id: str) -> list[ScheduleModel]:
+        """
+        動画IDが一致するScheduleModelオブジェクトを返す（コラボ配信などで複数の場合あり）
+
+        Args:
+            video_id (str): 動画ID
+
+        Returns:
+            list[ScheduleModel]: ScheduleModelオブジェクトのリスト（追加した順）
+        """
+        return list(self._by_video_id.get(video_id, {}).values())
+
+    def get_by_key(self, key: str) -> list[ScheduleModel]:
+        """
+        スケジュールのキー（配信者コードと配信日時）が一致するScheduleModelオブジェクトを返す
+
+        Args:
+            key (str): スケジュールのキー
+
+        Returns:
+            list[ScheduleModel]: ScheduleModelオブジェクトのリスト（追加した順）
+        """
+        return list(self._by_key.get(key, {}).values())
+
+    def get_by_code(self, code: str) -> list[ScheduleModel]:
+        """
+        配信者コードが一致するScheduleModelオブジェクトを返す
+
+        Args:
+            code (str): 配信者コード
+
+        Returns:
+            list[ScheduleModel]: ScheduleModelオブジェクトのリスト（追加した順）
+        """
+        return list(self._by_code.get(code, {}).values())
+
+    def get_by_date(self, streaming_date: date) -> list[ScheduleModel]:
+        """
+        配信日が一致するScheduleModelオブジェクトを返す
+
+        Args:
+            streaming_date (date): 配信日
+
+        Returns:
+            list[ScheduleModel]: ScheduleModelオブジェクトのリスト（追加した順）
+        """
+        return list(self._by_date.get(streaming_date, {}).values())
+
+    def get_between(self, start: datetime, end: datetime) -> list[ScheduleModel]:
+        """
+        配信日時が start 以上 end 未満のScheduleModelオブジェクトを返す（配信日時のないものは対象外）
+
+        Args:
+            start (datetime): 開始日時
+            end (datetime): 終了日時（含まない）
+
+        Returns:
+            list[ScheduleModel]: ScheduleModelオブジェクトのリスト（配信日時の順）
+        """
+        with self._lock:
+            if self._by_time is None:
+                self._by_time = sorted((schedule for schedule in self.schedules if schedule.streaming_at is not None), key=lambda schedule: schedule.streaming_at)
+            by_time = self._by_time
+        lower = bisect.bisect_left(by_time, start, key=lambda schedule: schedule.streaming_at)
+        upper = bisect.bisect_left(by_time, end, key=lambda schedule: schedule.streaming_at)
+        return by_time[lower:upper]
 
     def output_to_csv(self, filepath: str) -> None:
         """
-        ScheduleModelオブジェクトをCSVファイルに出力する関数
-        
+        ScheduleModelオブジェクトをCSVファイルに出力する関数（1件ずつ書き込む）
+
+        過去分も含めて MongoDB から出力する場合は app.exporter を使う。
+
         Args:
             filepath (str): CSVファイルのパス
         """
+        fields = list(ScheduleModel.model_fields)
         try:
             with open(filepath, "w", newline="", encoding="utf_8_sig") as csvfile:
                 csvwriter = csv.writer(csvfile, delimiter=",")
-                csvwriter.writerow([attr for attr in vars(ScheduleModel())])
-                for schedule in self.schedules:
-                    csvwriter.writerow([value for value in vars(schedule).values()])
+                csvwriter.writerow(fields)
+                for schedule in self:
+                    csvwriter.writerow([getattr(schedule, field) for field in fields])
         except (FileNotFoundError, PermissionError) as e:
-            self._logger.error("CSV エラーが発生しました。%s", e, exc_info=True)
+            logger.error("CSV エラーが発生しました。%s", e, exc_info=True)
             raise
 
-    def save_to_mongodb(self) -> None:
+    def save_to_mongodb(self, mode: str = "replace", detect_removed: bool = True, scopes: list[RemovalScope] | None = None) -> SaveResult:
         """
         ScheduleModelオブジェクトをMongoDBに保存する関数
+
+        Args:
+            mode (str, optional): 保存方法（replace : 削除して一括登録 / upsert : 変更のあったもののみ置き換え / diff : 前回との差分のみを登録）
+            detect_removed (bool, optional): diff の場合に、配信日時の範囲内で含まれていない登録済みのスケジュールを削除とするかどうか
+                （コレクションがスナップショット全体ではない場合は False を指定する）
+            scopes (list[RemovalScope] | None, optional): 削除を検出する範囲（None の場合はコレクションの配信日時の範囲のすべての配信者）
+
+        Returns:
+            SaveResult: 登録結果（diff の場合は変更の内容を含む）
+
+        Raises:
+            ValueError: 保存方法の指定が不正な場合
+        """
+        documents = [schedule.model_dump(by_alias=True, exclude=["id"]) for schedule in self.schedules]
+        if mode != "diff" or not detect_removed:
+            scopes = None
+        elif scopes is None:
+            window = self.get_window()
+            scopes = [RemovalScope(window[0], window[1], None)] if window is not None else None
+        return self.save_documents_to_mongodb(documents, mode, scopes)
+
+    @classmethod
+    def save_sync_state(cls, deferred_video_ids: list[str]) -> None:
+        """
+        ホロジュール情報の登録が完了したかどうかを MongoDB の sync_states に記録する関数
+
+        Args:
+            deferred_video_ids (list[str]): 動画情報の取得を見送った動画ID（空でない場合は未完了とする）
+        """
+        try:
+            db = MongoDB.getInstance().holoduledb
+            db.sync_states.replace_one(
+                {"_id": "schedules"},
+                {
+                    "is_incomplete": len(deferred_video_ids) > 0,
+                    "deferred_video_ids": deferred_video_ids,
+                    "updated_at": datetime.now(timezone.utc).replace(tzinfo=None),
+                },
+                upsert=True,
+            )
+        except pymongo.errors.PyMongoError as e:
+            logger.error("MongoDB エラーが発生しました。%s", e, exc_info=True)
+            raise
+
+    @classmethod
+    def load_tab_codes(cls, labels: list[str]) -> dict[str, set[str]]:
+        """
+        タブごとに前回の登録で表示されていた配信者コードを MongoDB の sync_states から読み込む関数
+
+        Args:
+            labels (list[str]): タブの名前
+
+        Returns:
+            dict[str, set[str]]: タブの名前をキーとした配信者コード（記録がないタブは含まない）
+        """
+        try:
+            db = MongoDB.getInstance().holoduledb
+            states = db.sync_states.find({"_id": {"$in": [TAB_CODES_PREFIX + label for label in labels]}})
+            return {state["_id"][len(TAB_CODES_PREFIX):]: set(state.get("codes", [])) for state in states}
+        except pymongo.errors.PyMongoError as e:
+            logger.error("MongoDB エラーが発生しました。%s", e, exc_info=True)
+            raise
+
+    @classmethod
+    def save_tab_codes(cls, codes_by_label: dict[str, set[str]]) -> None:
+        """
+        タブごとに今回表示されていた配信者コードを MongoDB の sync_states に記録する関数
+
+        次回の実行でタブから配信者のスケジュールがすべて消えた場合も、その配信者を削除の検出の対象とするために使う。
+
+        Args:
+            codes_by_label (dict[str, set[str]]): タブの名前をキーとした配信者コード
+        """
+        if len(codes_by_label) == 0:
+            return
+        try:
+            db = MongoDB.getInstance().holoduledb
+            updated_at = datetime.now(timezone.utc).replace(tzinfo=None)
+            db.sync_states.bulk_write(
+                [
+                    pymongo.ReplaceOne({"_id": TAB_CODES_PREFIX + label}, {"codes": sorted(codes), "updated_at": updated_at}, upsert=True)
+                    for label, codes in codes_by_label.items()
+                ],
+                ordered=False,
+            )
+        except pymongo.errors.PyMongoError as e:
+            logger.error("MongoDB エラーが発生しました。%s", e, exc_info=True)
+            raise
+
+    @classmethod
+    def save_records_to_mongodb(cls, records: Iterable[ScheduleRecord], mode: str = "replace") -> SaveResult:
+        """
+        検証済みのレコードを ScheduleModel を経由せずに MongoDB に保存する関数（過去分の一括登録など件数が多い場合に使う）
+
+        Args:
+            records (Iterable[ScheduleRecord]): レコード
+            mode (str, optional): 保存方法（replace : 削除して一括登録 / upsert : 変更のあったもののみ置き換え）
+
+        Returns:
+            SaveResult: 登録結果
+
+        Raises:
+            ValueError: 保存方法の指定が不正な場合
         """
+        return cls.save_documents_to_mongodb([record.to_document() for record in records], mode)
+
+    @classmethod
+    def save_documents_to_mongodb(cls, documents: list[dict], mode: str = "replace", scopes: list[RemovalScope] | None = None) -> SaveResult:
+        """
+        スケジュール情報のドキュメントを MongoDB に保存する関数（渡したドキュメントには _id・content_hash が追加される）
+
+        Args:
+            documents (list[dict]): ドキュメント（_id を含まない）
+            mode (str, optional): 保存方法（replace : 削除して一括登録 / upsert : 変更のあったもののみ置き換え / diff : 前回との差分のみを登録）
+            scopes (list[RemovalScope] | None, optional): diff の場合に削除を検出する範囲（None の場合は検出しない）
+
+        Returns:
+            SaveResult: 登録結果（diff の場合は変更の内容を含む）
+
+        Raises:
+            ValueError: 保存方法の指定が不正な場合
+        """
+        if mode not in SAVE_MODES:
+            raise ValueError(f"保存方法の指定が不正です。 : {mode}")
         try:
             db = MongoDB.getInstance().holoduledb
             collection = db.schedules
-            # video_id が一致するドキュメントを削除
-            video_ids = [schedule.video_id for schedule in self.schedules]
-            collection.delete_many({"video_id": {"$in": video_ids}})
-            # ScheduleModelオブジェクトをドキュメントに変換して一括登録
-            dumps = [schedule.model_dump(by_alias=True, exclude=["id"]) for schedule in self.schedules]
-            collection.insert_many(dumps)
-        except pymongo.errors.ConnectionError as e:
-            self.logger.error("MongoDB 接続に失敗しました。%s", e, exc_info=True)
+            if mode == "upsert":
+                result = cls.__upsert(collection, documents)
+            elif mode == "diff":
+                result = cls.__diff(collection, documents, scopes)
+            else:
+                result = cls.__replace(collection, documents)
+            # 登録済みのスケジュールの検索結果のキャッシュを破棄
+            if result.inserted > 0 or result.updated > 0 or result.deleted > 0:
+                invalidate_query_cache()
+            return result
+        except pymongo.errors.ConnectionFailure as e:
+            logger.error("MongoDB 接続に失敗しました。%s", e, exc_info=True)
             raise
         except pymongo.errors.OperationFailure as e:
-            self.logger.error("MongoDB 操作に失敗しました。%s", e, exc_info=True)
+            logger.error("MongoDB 操作に失敗しました。%s", e, exc_info=True)
             raise
         except pymongo.errors.PyMongoError as e:
-            self.logger.error("MongoDB エラーが発生しました。%s", e, exc_info=True)
+            logger.error("MongoDB エラーが発生しました。%s", e, exc_info=True)
             raise
+
+    @classmethod
+    def __replace(cls, collection: pymongo.collection.Collection, documents: list[dict]) -> SaveResult:
+        """
+        video_id が一致するドキュメントを削除してから一括登録する関数
+
+        Args:
+            collection (pymongo.collection.Collection): 登録先のコレクション
+            documents (list[dict]): 登録するドキュメント
+
+        Returns:
+            SaveResult: 登録結果
+        """
+        result = SaveResult()
+        if len(documents) == 0:
+            return result
+        # video_id と配信者コードの組は一意のインデックスがあるため、同じ組のドキュメントは後のもののみ登録する（upsert と同じ）
+        keyed_documents = {cls.get_document_key(document): document for document in documents}
+        documents = list(keyed_documents.values())
+        # video_id が一致するドキュメントを削除（video_id のないものは対象外）
+        video_ids = list({document["video_id"] for document in documents if document["video_id"] is not None})
+        if len(video_ids) > 0:
+            result.deleted = collection.delete_many({"video_id": {"$in": video_ids}}).deleted_count
+        # 一括登録
+        result.inserted = len(collection.insert_many(documents).inserted_ids)
+        return result
+
+    @classmethod
+    def __upsert(cls, collection: pymongo.collection.Collection, documents: list[dict]) -> SaveResult:
+        """
+        内容のハッシュ値が変わったドキュメントのみを1回の bulk_write で置き換える関数
+
+        video_id があるものは video_id と配信者コードを、ないものは配信者コードと配信日時をキーとする。
+
+        Args:
+            collection (pymongo.collection.Collection): 登録先のコレクション
+            documents (list[dict]): 登録するドキュメント
+
+        Returns:
+            SaveResult: 登録結果
+        """
+        result = SaveResult()
+        # キーごとのドキュメント（同じキーが複数ある場合は後のものを優先）
+        keyed_documents: dict[tuple, dict] = {}
+        for dump in documents:
+            dump["content_hash"] = get_content_hash(dump)
+            keyed_documents[cls.get_document_key(dump)] = dump
+        if len(keyed_documents) == 0:
+            return result
+
+        # 登録済みのハッシュ値を1回の検索でまとめて取得
+        video_ids = list({key[1] for key in keyed_documents if key[0] == "video_id"})
+        stored_hashes = {}
+        if len(video_ids) > 0:
+            cursor = collection.find({"video_id": {"$in": video_ids}}, {"_id": 0, "video_id": 1, "code": 1, "content_hash": 1})
+            stored_hashes = {cls.get_document_key(document): document.get("content_hash") for document in cursor}
+
+        requests = []
+        for key, dump in keyed_documents.items():
+            if key[0] == "video_id" and stored_hashes.get(key) == dump["content_hash"]:
+                result.unchanged += 1
+                continue
+            requests.append(pymongo.ReplaceOne(cls.get_document_query(key), dump, upsert=True))
+
+        if len(requests) > 0:
+            bulk_result = collection.bulk_write(requests, ordered=False)
+            result.inserted = bulk_result.upserted_count
+            result.updated = bulk_result.modified_count
+            result.unchanged += bulk_result.matched_count - bulk_result.modified_count
+        return result
+
+    @classmethod
+    def __diff(cls, collection: pymongo.collection.Collection, documents: list[dict], scopes: list[RemovalScope] | None) -> SaveResult:
+        """
+        登録済みのスケジュール（前回のスナップショット）との差分を求めて、差分のみを1回の bulk_write で登録する関数
+
+        video_id と配信者コード（video_id がないものは配信者コードと配信日時）で対応付けて、追加・配信日時の変更・動画情報の変更に分類する。
+        scopes を指定した場合は、いずれかの範囲内の登録済みのスケジュールのうち今回含まれていないものを削除とする。
+
+        Args:
+            collection (pymongo.collection.Collection): 登録先のコレクション
+            documents (list[dict]): 登録するドキュメント
+            scopes (list[RemovalScope] | None): 削除を検出する範囲
+
+        Returns:
+            SaveResult: 登録結果と変更の内容
+        """
+        result = SaveResult()
+        # キーごとのドキュメント（同じキーが複数ある場合は後のものを優先）
+        keyed_documents: dict[tuple, dict] = {}
+        for dump in documents:
+            dump["content_hash"] = get_content_hash(dump)
+            keyed_documents[cls.get_document_key(dump)] = dump
+
+        # 対応する登録済みのドキュメントと、範囲内の登録済みのドキュメントを1回の検索でまとめて取得
+        conditions = []
+        video_ids = list({key[1] for key in keyed_documents if key[0] == "video_id"})
+        if len(video_ids) > 0:
+            conditions.append({"video_id": {"$in": video_ids}})
+        streaming_ats = list({key[2] for key in keyed_documents if key[0] == "key"})
+        if len(streaming_ats) > 0:
+            conditions.append({"video_id": None, "streaming_at": {"$in": streaming_ats}})
+        for scope in scopes or []:
+            condition = {"streaming_at": {"$gte": scope.start, "$lte": scope.end}}
+            if scope.codes is not None:
+                condition["code"] = {"$in": sorted(scope.codes)}
+            conditions.append(condition)
+        if len(conditions) == 0:
+            return result
+        stored_documents: dict[tuple, dict] = {}
+        duplicate_ids = []
+        for stored in collection.find({"$or": conditions}):
+            key = cls.get_document_key(stored)
+            if key in stored_documents:
+                # 同じキーで重複して登録されているものは変更イベントを出さずに削除する
+                duplicate_ids.append(stored["_id"])
+                continue
+            stored_documents[key] = stored
+
+        requests = []
+        for key, dump in keyed_documents.items():
+            stored = stored_documents.pop(key, None)
+            if stored is None:
+                change = ScheduleChange(event=CHANGE_ADDED)
+                requests.append(pymongo.ReplaceOne(cls.get_document_query(key), dump, upsert=True))
+                result.inserted += 1
+            elif stored.get("content_hash") == dump["content_hash"]:
+                result.unchanged += 1
+                continue
+            else:
+                changed_fields = [
+                    field for field in dump
+                    if field not in DIFF_IGNORED_FIELDS and get_comparable_value(dump[field]) != get_comparable_value(stored.get(field))
+                ]
+                if get_comparable_value(dump["streaming_at"]) != get_comparable_value(stored.get("streaming_at")):
+                    change = ScheduleChange(event=CHANGE_RESCHEDULED, previous_streaming_at=stored.get("streaming_at"), changed_fields=changed_fields)
+                else:
+                    change = ScheduleChange(event=CHANGE_CHANGED, changed_fields=changed_fields)
+                requests.append(pymongo.ReplaceOne({"_id": stored["_id"]}, dump))
+                result.updated += 1
+            change.video_id = dump["video_id"]
+            change.key = cls.__get_key(dump)
+            change.code = dump["code"]
+            change.streaming_at = dump["streaming_at"]
+            change.schedule = {field: value for field, value in dump.items() if field not in DIFF_IGNORED_FIELDS}
+            result.changes.append(change)
+
+        # 範囲内で今回含まれていないものは削除（video_id の検索のみで見つかった範囲外のものは対象外）
+        # （登録済みの日時はタイムゾーンなしで返るため、範囲もタイムゾーンなしに揃えて比べる）
+        if scopes is not None:
+            ranges = [(get_comparable_value(scope.start), get_comparable_value(scope.end), scope.codes) for scope in scopes]
+            for stored in stored_documents.values():
+                streaming_at = stored.get("streaming_at")
+                if streaming_at is None or not any(
+                    start <= get_comparable_value(streaming_at) <= end and (codes is None or stored.get("code") in codes)
+                    for start, end, codes in ranges
+                ):
+                    continue
+                requests.append(pymongo.DeleteOne({"_id": stored["_id"]}))
+                result.deleted += 1
+                result.changes.append(ScheduleChange(
+                    event=CHANGE_REMOVED,
+                    video_id=stored.get("video_id"),
+                    key=cls.__get_key(stored),
+                    code=stored.get("code"),
+                    streaming_at=streaming_at,
+                    schedule={field: value for field, value in stored.items() if field not in DIFF_IGNORED_FIELDS},
+                ))
+        for duplicate_id in duplicate_ids:
+            requests.append(pymongo.DeleteOne({"_id": duplicate_id}))
+        if len(duplicate_ids) > 0:
+            logger.warning("重複して登録されていたスケジュールを削除します。 : %s件", len(duplicate_ids))
+            result.deleted += len(duplicate_ids)
+
+        if len(requests) > 0:
+            collection.bulk_write(requests, ordered=False)
+        return result
+
+    @staticmethod
+    def __get_key(document: dict) -> str:
+        """
+        ドキュメントからスケジュールのキー（ScheduleModel.key と同じ形式）を返す関数
+
+        Args:
+            document (dict): ドキュメント
+
+        Returns:
+            str: スケジュールのキー
+        """
+        code = document.get("code")
+        streaming_at = document.get("streaming_at")
+        if code is None or streaming_at is None:
+            return ""
+        return code + "_" + streaming_at.strftime("%Y%m%d_%H%M%S")
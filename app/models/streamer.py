@@ -17,6 +17,7 @@ class StreamerModel(BaseModel):
         image_name (str, optional): 画像名
         channel_id (str, optional): チャンネルID
         is_retired (bool, optional): 引退済み
+        aliases (list[str], optional): 別名（ホロジュールでの表記ゆれ）
         model_config (ConfigDict): モデルの設定辞書
     """
     
@@ -28,6 +29,7 @@ class StreamerModel(BaseModel):
     image_name: str | None = Field(default=None, description="画像名")
     channel_id: str | None = Field(default=None, description="チャンネルID")
     is_retired: bool | None = Field(default=False, description="引退済み")
+    aliases: list[str] = Field(default_factory=list, description="別名")
 
     model_config = ConfigDict(
         populate_by_name=True,          # エイリアス名でのアクセスを許可するか（例えば id と _id）
@@ -40,7 +42,8 @@ class StreamerModel(BaseModel):
                 "affiliations": ['bland', 'jp'],
                 "image_name": "hololive.jpg",
                 "channel_id": "@hololive",
-                "is_retired": False
+                "is_retired": False,
+                "aliases": [],
             }
         },
     )
@@ -0,0 +1,155 @@
+import re
+import difflib
+import unicodedata
+from collections.abc import Mapping
+from logging import getLogger
+from app.models.streamer import StreamerModel
+
+logger = getLogger(__name__)
+
+# 名前の比較で無視する文字（空白・中黒・アポストロフィ・ピリオド・ハイフン・アンダースコア・先頭の @）
+IGNORED_CHARACTERS = re.compile(r"[\s・'’‘.\-_@]+")
+# あいまい検索の類似度の下限
+FUZZY_CUTOFF = 0.85
+# あいまい検索の対象とする名前の長さ（正規化後）
+FUZZY_MIN_LENGTH = 3
+FUZZY_MAX_LENGTH = 64
+
+def normalize_name(name: str) -> str:
+    """
+    配信者の名前を比較用に正規化する関数（NFKC 正規化・大文字小文字の同一視・区切り文字の除去）
+
+    Args:
+        name (str): 配信者の名前
+
+    Returns:
+        str: 正規化した名前
+    """
+    return IGNORED_CHARACTERS.sub("", unicodedata.normalize("NFKC", name).casefold())
+
+class StreamerNameIndex:
+    """
+    ホロジュールに表示された名前から配信者を解決する索引クラス
+
+    短縮名・名前・チャンネルID・別名を表示どおりと正規化したものの両方で索引にしておき、
+    表示どおりに一致しない名前のみ正規化・前方一致・あいまい検索で解決する（結果は reset を呼び出すまでキャッシュする）。
+    前方一致・あいまい検索は推定のため、解決した場合も解決できなかった名前として数える（新しい配信者の取り違えに気付けるように）。
+    """
+
+    def __init__(self, streamers: Mapping[str, StreamerModel]):
+        """
+        StreamerNameIndexクラスのコンストラクタ
+
+        Args:
+            streamers (Mapping[str, StreamerModel]): 短縮名をキーとした配信者情報
+        """
+        # 表示どおりの名前（正規化なしで一致するものは正規化せずに解決する）
+        self.__exact: dict[str, StreamerModel] = {}
+        # 正規化した名前
+        self.__index: dict[str, StreamerModel] = {}
+        for short_name, streamer in streamers.items():
+            for alias in [short_name, streamer.name, streamer.channel_id, *streamer.aliases]:
+                if alias is None:
+                    continue
+                self.__exact.setdefault(alias, streamer)
+                normalized = normalize_name(alias)
+                registered = self.__index.setdefault(normalized, streamer)
+                if registered.code != streamer.code:
+                    logger.warning("配信者の別名が重複しています。 : %s（%s / %s）", alias, registered.code, streamer.code)
+        # 表示どおりに一致しなかった名前（元の名前 → 配信者、解決できなかった場合は None）と、前方一致・あいまい検索で推定した名前
+        self.__fallbacks: dict[str, StreamerModel | None] = {}
+        self.__guessed: set[str] = set()
+        # 解決できなかった名前（推定したものを含む）と出現した回数
+        self.__unresolved: dict[str, int] = {}
+
+    @property
+    def unresolved(self) -> dict[str, int]:
+        """
+        解決できなかった名前（前方一致・あいまい検索で推定したものを含む）と出現した回数を返す
+
+        Returns:
+            dict[str, int]: 解決できなかった名前と出現した回数
+        """
+        return dict(self.__unresolved)
+
+    @property
+    def fallbacks(self) -> dict[str, str]:
+        """
+        正規化・前方一致・あいまい検索で解決した名前と配信者コードを返す
+
+        Returns:
+            dict[str, str]: 解決した名前と配信者コード
+        """
+        return {name: streamer.code for name, streamer in self.__fallbacks.items() if streamer is not None}
+
+    def reset(self) -> None:
+        """
+        あいまい検索のキャッシュと解決できなかった名前を消去する関数（実行の開始時に呼び出す）
+        """
+        self.__fallbacks = {}
+        self.__guessed = set()
+        self.__unresolved = {}
+
+    def resolve(self, name: str) -> StreamerModel | None:
+        """
+        名前から配信者を解決する関数
+
+        Args:
+            name (str): ホロジュールに表示された名前
+
+        Returns:
+            StreamerModel | None: 配信者情報（解決できなかった場合は None）
+        """
+        streamer = self.__exact.get(name)
+        if streamer is not None:
+            return streamer
+        if name not in self.__fallbacks:
+            streamer, is_guessed = self.__resolve_fallback(name)
+            self.__fallbacks[name] = streamer
+            if is_guessed:
+                self.__guessed.add(name)
+        streamer = self.__fallbacks[name]
+        if streamer is None or name in self.__guessed:
+            self.__unresolved[name] = self.__unresolved.get(name, 0) + 1
+        return streamer
+
+    def __resolve_fallback(self, name: str) -> tuple[StreamerModel | None, bool]:
+        """
+        正規化した名前の一致・一意な前方一致・あいまい検索の順に配信者を解決する関数
+
+        Args:
+            name (str): ホロジュールに表示された名前
+
+        Returns:
+            tuple[StreamerModel | None, bool]: 配信者情報（解決できなかった場合は None）, 前方一致・あいまい検索で推定したかどうか
+        """
+        normalized = normalize_name(name)
+        streamer = self.__index.get(normalized)
+        if streamer is not None:
+            return streamer, False
+        if not FUZZY_MIN_LENGTH <= len(normalized) <= FUZZY_MAX_LENGTH:
+            return None, False
+
+        # 表示された名前が先頭と一致する別名が1人の配信者に限られる場合（例 : Raora と Raora Panthera）
+        # （逆向きは別名で始まる新しい配信者の名前を取り違えるため使わない）
+        candidates = {
+            streamer.code: streamer
+            for alias, streamer in self.__index.items()
+            if alias.startswith(normalized)
+        }
+        if len(candidates) == 1:
+            streamer = next(iter(candidates.values()))
+            logger.warning("配信者の名前を前方一致で推定しました。 : %s -> %s", name, streamer.code)
+            return streamer, True
+
+        # 類似度が下限以上で最も近い別名（前方一致と同じく、別名で始まる名前は取り違えるため除く）
+        matches = [
+            match
+            for match in difflib.get_close_matches(normalized, list(self.__index), n=3, cutoff=FUZZY_CUTOFF)
+            if not normalized.startswith(match)
+        ]
+        if len(matches) == 0:
+            return None, False
+        streamer = self.__index[matches[0]]
+        logger.warning("配信者の名前をあいまい検索で推定しました。 : %s -> %s", name, streamer.code)
+        return streamer, True
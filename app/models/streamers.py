@@ -1,9 +1,13 @@
 from typing import ClassVar
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, PrivateAttr
 import pymongo
 from logging import getLogger
 from app.models.streamer import StreamerModel
+from app.models.streamer_names import StreamerNameIndex
+from app.models.save_result import SaveResult
+from app.models.content_hash import get_content_hash
 from app.mongodb import MongoDB
+from app.schedule_queries import invalidate_query_cache
 
 logger = getLogger(__name__)
 
@@ -517,6 +521,7 @@ class StreamerCollection(BaseModel):
             affiliations=["gen1", "en"],
             image_name="mori_calliope.jpg",
             channel_id="@MoriCalliope",
+            aliases=["Calliope"],
         ),
         "Kiara": StreamerModel(
             code="HLEN02",
@@ -533,6 +538,7 @@ class StreamerCollection(BaseModel):
             affiliations=["gen1", "en"],
             image_name="ninomae_ina'nis.jpg",
             channel_id="@NinomaeInanis",
+            aliases=["Ina'nis"],
         ),
         "Gura": StreamerModel(
             code="HLEN04",
@@ -669,30 +675,87 @@ class StreamerCollection(BaseModel):
         ),
     }
 
+    # 名前から配信者を解決する索引（表記ゆれのキャッシュと解決できなかった名前はインスタンスごと）
+    _name_index: StreamerNameIndex = PrivateAttr(default_factory=lambda: StreamerNameIndex(StreamerCollection.streamers))
+
     def get_streamer_by_name(self, name: str) -> StreamerModel | None:
         """
-        指定した名前（短縮名）のStreamerModelオブジェクトを取得する関数
+        指定した名前のStreamerModelオブジェクトを取得する関数（短縮名・名前・チャンネルID・別名と表記ゆれに対応）
 
         Args:
-            name (str): 配信者の名前（短縮名）
+            name (str): 配信者の名前
+
+        Returns:
+            StreamerModel | None: 指定した名前のStreamerModelオブジェクト（解決できなかった場合は None）
+        """
+        return self._name_index.resolve(name)
+
+    def get_unresolved_names(self) -> dict[str, int]:
+        """
+        解決できなかった名前（前方一致・あいまい検索で推定したものを含む）と出現した回数を取得する関数
+
+        Returns:
+            dict[str, int]: 解決できなかった名前と出現した回数
+        """
+        return self._name_index.unresolved
+
+    def get_fallback_names(self) -> dict[str, str]:
+        """
+        表記ゆれとして解決した名前と配信者コードを取得する関数
 
         Returns:
-            StreamerModel | None: 指定した名前（短縮名）のStreamerModelオブジェクト
+            dict[str, str]: 解決した名前と配信者コード
         """
-        return StreamerCollection.streamers.get(name, None)
+        return self._name_index.fallbacks
 
-    def save_to_mongodb(self) -> None:
+    def reset_name_resolution(self) -> None:
+        """
+        表記ゆれのキャッシュと解決できなかった名前を消去する関数（実行の開始時に呼び出す）
+        """
+        self._name_index.reset()
+
+    def get_roster_hash(self) -> str:
+        """
+        配信者情報全体のハッシュ値を取得する関数
+
+        Returns:
+            str: 配信者情報全体のハッシュ値
+        """
+        dumps = [streamer.model_dump(by_alias=True, exclude={"id"}) for streamer in StreamerCollection.streamers.values()]
+        return get_content_hash(dumps)
+
+    def save_to_mongodb(self) -> SaveResult:
         """
         StreamerModelオブジェクトをMongoDBに保存する関数
+
+        前回登録した配信者情報全体のハッシュ値と配信者コードの一覧が、どちらも一致する場合は登録しない（sync_states の1回の読み込みのみ）。
+        コレクションを手動で削除・復元した場合は、sync_states の streamers を削除すると次回の実行で登録し直す。
+
+        Returns:
+            SaveResult: 登録結果
         """
         try:
             db = MongoDB.getInstance().holoduledb
-            collection = db.streamers
-            for streamer in StreamerCollection.streamers.values():
-                # codeをキーにして更新
-                query = {"code": streamer.code}
-                dump = streamer.model_dump(by_alias=True, exclude={"id"})
-                collection.replace_one(query, dump, upsert=True)
+            roster_hash = self.get_roster_hash()
+            codes = sorted(streamer.code for streamer in StreamerCollection.streamers.values())
+            # 前回登録した配信者情報と同じであれば何もしない（ハッシュ値とあわせて登録した配信者コードの一覧も比べる）
+            sync_state = db.sync_states.find_one({"_id": "streamers"})
+            if sync_state is not None and sync_state.get("content_hash") == roster_hash and sync_state.get("codes") == codes:
+                return SaveResult(unchanged=len(StreamerCollection.streamers))
+            # codeをキーにして1回の bulk_write で更新
+            requests = [
+                pymongo.ReplaceOne({"code": streamer.code}, streamer.model_dump(by_alias=True, exclude={"id"}), upsert=True)
+                for streamer in StreamerCollection.streamers.values()
+            ]
+            bulk_result = db.streamers.bulk_write(requests, ordered=False)
+            db.sync_states.replace_one({"_id": "streamers"}, {"content_hash": roster_hash, "codes": codes}, upsert=True)
+            # 配信者情報を結合した検索結果のキャッシュを破棄
+            invalidate_query_cache()
+            return SaveResult(
+                inserted=bulk_result.upserted_count,
+                updated=bulk_result.modified_count,
+                unchanged=bulk_result.matched_count - bulk_result.modified_count,
+            )
         except pymongo.errors.ConnectionFailure as e:
             logger.error("MongoDB 接続に失敗しました。%s", e, exc_info=True)
             raise
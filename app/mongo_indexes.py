@@ -0,0 +1,211 @@
+import sys
+import threading
+from datetime import datetime
+from logging import getLogger
+from typing import NamedTuple
+import pymongo
+from pymongo.database import Database
+from app.mongodb import MongoDB
+
+logger = getLogger(__name__)
+
+class IndexSpec(NamedTuple):
+    """
+    コレクションに作成するインデックスの定義
+
+    Args:
+        collection (str): コレクション名
+        name (str): インデックス名
+        keys (list[tuple[str, int]]): キーと並び順
+        unique (bool): 一意とするかどうか
+        partial_filter (dict | None): 部分インデックスの条件（None の場合はすべてのドキュメント）
+    """
+    collection: str
+    name: str
+    keys: list[tuple[str, int]]
+    unique: bool = False
+    partial_filter: dict | None = None
+
+# 作成するインデックス
+# コラボ配信などで1つの動画が複数の配信者のスケジュールに含まれるため、video_id と配信者コードの組を一意とする
+# video_id は動画情報を取得できなかったスケジュールでは None となるため、文字列のもののみを対象とする
+# （$gt: "" は文字列のみに一致し、video_id の等価・$in の検索はこの条件を満たすためインデックスを使える）
+INDEX_SPECS = (
+    IndexSpec("schedules", "video_id_code_unique", [("video_id", pymongo.ASCENDING), ("code", pymongo.ASCENDING)], unique=True, partial_filter={"video_id": {"$gt": ""}}),
+    IndexSpec("schedules", "streaming_at_code", [("streaming_at", pymongo.ASCENDING), ("code", pymongo.ASCENDING)]),
+    IndexSpec("streamers", "code_unique", [("code", pymongo.ASCENDING)], unique=True),
+    IndexSpec("video_cache", "cache_video_id_unique", [("video_id", pymongo.ASCENDING)], unique=True),
+)
+
+# 以前の定義で作成していたインデックス（コレクション名, インデックス名、video_id のみで一意とするとコラボ配信を登録できないため削除する）
+OBSOLETE_INDEXES = (
+    ("schedules", "video_id_unique"),
+)
+
+# インデックスを確認済みかどうか（プロセスごとに1回のみ確認する）
+_ensured = False
+_ensure_lock = threading.Lock()
+
+def ensure_indexes(db: Database | None = None) -> dict[str, bool]:
+    """
+    定義したインデックスがなければ作成して、作成済みの場合は定義と一致するかを確認する関数
+
+    定義と異なる同名のインデックスは削除せずに警告のみとする（作り直すかどうかは運用で判断する）。
+    以前の定義で作成していたインデックス（OBSOLETE_INDEXES）は削除する。
+    既存のドキュメントが一意の制約を満たさない場合も、作成に失敗したことを記録して処理は継続する。
+
+    Args:
+        db (Database | None, optional): データベース（None の場合は holoduledb）
+
+    Returns:
+        dict[str, bool]: インデックス名をキーとした、定義どおりのインデックスがあるかどうか
+    """
+    if db is None:
+        db = MongoDB.getInstance().holoduledb
+    for collection_name, name in OBSOLETE_INDEXES:
+        if name in db[collection_name].index_information():
+            db[collection_name].drop_index(name)
+            logger.info("以前の定義のインデックスを削除しました。 : %s.%s", collection_name, name)
+    results = {}
+    for spec in INDEX_SPECS:
+        collection = db[spec.collection]
+        existing = collection.index_information().get(spec.name)
+        if existing is not None:
+            is_same = (
+                [(key, int(direction)) for key, direction in existing["key"]] == spec.keys
+                and existing.get("unique", False) == spec.unique
+                and existing.get("partialFilterExpression") == spec.partial_filter
+            )
+            if not is_same:
+                logger.warning("インデックスの定義が異なります。 : %s.%s（%s）", spec.collection, spec.name, existing)
+            results[spec.name] = is_same
+            continue
+        options = {"name": spec.name, "unique": spec.unique}
+        if spec.partial_filter is not None:
+            options["partialFilterExpression"] = spec.partial_filter
+        try:
+            collection.create_index(spec.keys, **options)
+            logger.info("インデックスを作成しました。 : %s.%s", spec.collection, spec.name)
+            results[spec.name] = True
+        except pymongo.errors.OperationFailure as e:
+            # 重複したドキュメントがある場合など（インデックスなしで処理は継続する）
+            logger.error("インデックスの作成に失敗しました。 : %s.%s %s", spec.collection, spec.name, e)
+            results[spec.name] = False
+    return results
+
+def ensure_indexes_once() -> None:
+    """
+    プロセスの起動後に1回だけ ensure_indexes を呼び出す関数（失敗した場合も収集は継続する）
+    """
+    global _ensured
+    with _ensure_lock:
+        if _ensured:
+            return
+        _ensured = True
+        try:
+            ensure_indexes()
+        except pymongo.errors.PyMongoError as e:
+            logger.warning("インデックスを確認できませんでした。%s", e, exc_info=True)
+
+def get_index_names(plan: dict) -> list[str]:
+    """
+    実行計画で使われるインデックス名を取得する関数（入れ子の段をすべてたどる）
+
+    Args:
+        plan (dict): 実行計画（winningPlan）
+
+    Returns:
+        list[str]: インデックス名（インデックスを使わない場合は空）
+    """
+    names = []
+    stages = [plan]
+    while len(stages) > 0:
+        stage = stages.pop()
+        if stage.get("stage") == "IXSCAN" and "indexName" in stage:
+            names.append(stage["indexName"])
+        if "inputStage" in stage:
+            stages.append(stage["inputStage"])
+        stages.extend(stage.get("inputStages", []))
+        # 8.0 以降の実行計画（queryPlan の下に段がある）
+        if "queryPlan" in stage:
+            stages.append(stage["queryPlan"])
+    return names
+
+def check_query_plans(db: Database | None = None) -> dict[str, tuple[str, list[str]]]:
+    """
+    主な読み取り・書き込みのクエリの実行計画を explain で取得して、想定したインデックスを使うかを確認する関数
+
+    explain は queryPlanner で取得するため、クエリは実行されない。
+
+    Args:
+        db (Database | None, optional): データベース（None の場合は holoduledb）
+
+    Returns:
+        dict[str, tuple[str, list[str]]]: クエリの名前をキーとした、想定したインデックス名と実際に使われるインデックス名
+    """
+    if db is None:
+        db = MongoDB.getInstance().holoduledb
+    streaming_at = datetime(2000, 1, 1)
+    # クエリの名前, 想定したインデックス名, explain のコマンド
+    commands = [
+        (
+            "schedules.replace_one(video_id, code)",
+            "video_id_code_unique",
+            {"update": "schedules", "updates": [{"q": {"video_id": "video_id_01", "code": "HL0000"}, "u": {"code": "HL0000"}, "upsert": True}]},
+        ),
+        (
+            "schedules.find(video_id $in)",
+            "video_id_code_unique",
+            {"find": "schedules", "filter": {"video_id": {"$in": ["video_id_01", "video_id_02"]}}, "projection": {"_id": 0, "video_id": 1, "content_hash": 1}},
+        ),
+        (
+            "schedules.delete_many(video_id $in)",
+            "video_id_code_unique",
+            {"delete": "schedules", "deletes": [{"q": {"video_id": {"$in": ["video_id_01", "video_id_02"]}}, "limit": 0}]},
+        ),
+        (
+            "schedules.replace_one(code, streaming_at)",
+            "streaming_at_code",
+            {"update": "schedules", "updates": [{"q": {"video_id": None, "code": "HL0000", "streaming_at": streaming_at}, "u": {"code": "HL0000"}, "upsert": True}]},
+        ),
+        (
+            "schedules.find(streaming_at range) sort",
+            "streaming_at_code",
+            {"find": "schedules", "filter": {"streaming_at": {"$gte": streaming_at, "$lt": datetime(2000, 2, 1)}}, "sort": {"streaming_at": 1, "code": 1}},
+        ),
+        (
+            "streamers.replace_one(code)",
+            "code_unique",
+            {"update": "streamers", "updates": [{"q": {"code": "HL0000"}, "u": {"code": "HL0000"}, "upsert": True}]},
+        ),
+        (
+            "video_cache.replace_one(video_id)",
+            "cache_video_id_unique",
+            {"update": "video_cache", "updates": [{"q": {"video_id": "video_id_01"}, "u": {"video_id": "video_id_01"}, "upsert": True}]},
+        ),
+    ]
+    results = {}
+    for name, expected, command in commands:
+        explained = db.command("explain", command, verbosity="queryPlanner")
+        results[name] = (expected, get_index_names(explained["queryPlanner"]["winningPlan"]))
+    return results
+
+def main() -> int:
+    """
+    インデックスを作成・確認して、主なクエリが想定したインデックスを使うかを explain で確認する関数
+
+    Returns:
+        int: 終了コード（インデックスがない・想定したインデックスを使わないクエリがある場合は 1）
+    """
+    is_ok = True
+    for name, is_same in ensure_indexes().items():
+        print(f"インデックス {name:<20} : {'OK' if is_same else 'NG'}")
+        is_ok = is_ok and is_same
+    for name, (expected, used) in check_query_plans().items():
+        is_used = expected in used
+        print(f"実行計画 {name:<42} : {'OK' if is_used else 'NG'}（想定 {expected} / 使用 {', '.join(used) or 'COLLSCAN'}）")
+        is_ok = is_ok and is_used
+    return 0 if is_ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
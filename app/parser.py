@@ -0,0 +1,454 @@
+import re
+import sys
+import time
+import hashlib
+import argparse
+from collections.abc import Iterator
+from datetime import datetime, date
+from logging import getLogger
+from lxml import etree
+from app.models.schedule import ScheduleModel
+from app.models.schedules import ScheduleCollection
+from app.models.streamers import StreamerCollection
+from app.metrics import RunMetrics
+
+logger = getLogger(__name__)
+
+# 日付（例 : 12/31）と時刻（例 : 23:59）のパターン
+DATE_PATTERN = re.compile(r"([0-9]{1,2})/([0-9]{1,2})")
+TIME_PATTERN = re.compile(r"([0-9]{1,2}):([0-9]{1,2})")
+
+# ホロジュールの HTML の class 属性（ページの構成に合わせて決め打ち）
+CLASS_TAB_PANE = "tab-pane show active"
+CLASS_DATE = "holodule navbar-text"
+CLASS_TIME = "col-4 col-sm-4 col-md-4 text-left datetime"
+CLASS_NAME = "col text-right name"
+CLASS_CONTAINER = "container"
+
+def get_year(month: int, today: date) -> int:
+    """
+    ホロジュールに表示された月から年を求める関数（年をまたぐ前後の表示に対応）
+
+    Args:
+        month (int): 月
+        today (date): 基準日
+
+    Returns:
+        int: 年
+    """
+    if month == 12 and today.month == 1:
+        return today.year - 1
+    if month == 1 and today.month == 12:
+        return today.year + 1
+    return today.year
+
+def get_block_fingerprint(block: etree._Element, current_date: date | None, today: date) -> str:
+    """
+    ホロジュールのブロック（日ごとのコンテナ）の指紋を求める関数
+
+    空白をまとめた HTML に、解析の結果が依存する直前の日付と基準日を加えたもののハッシュ値とする。
+
+    Args:
+        block (etree._Element): ブロックの要素
+        current_date (date | None): ブロックの直前の日付（ブロックに日付がない場合に使う）
+        today (date): 年を求める基準日
+
+    Returns:
+        str: 指紋（SHA-1 の16進数表記）
+    """
+    html = " ".join(etree.tostring(block, encoding="unicode", with_tail=False).split())
+    return hashlib.sha1(f"{today}|{current_date}|{html}".encode("utf-8")).hexdigest()
+
+def record_skipped(metrics: RunMetrics | None, reason: str) -> None:
+    """
+    スキップしたサムネイルの件数を記録する関数
+
+    Args:
+        metrics (RunMetrics | None): メトリクス（None の場合は記録しない）
+        reason (str): スキップした理由の件数名
+    """
+    if metrics is not None:
+        metrics.increment("entries_skipped")
+        metrics.increment(reason)
+
+class SoupScheduleParser:
+    """
+    BeautifulSoup の find_all / find でホロジュールの HTML を解析するクラス（従来の実装）
+    """
+
+    def __init__(self, streamers: StreamerCollection, url_pattern: str, metrics: RunMetrics | None = None):
+        """
+        SoupScheduleParserクラスのコンストラクタ
+
+        Args:
+            streamers (StreamerCollection): 配信者情報のコレクション
+            url_pattern (str): Youtube の URL パターン
+            metrics (RunMetrics | None, optional): スキップした件数を記録するメトリクス
+        """
+        self.__streamers = streamers
+        self.__url_pattern = url_pattern
+        self.__metrics = metrics
+
+    def parse(self, html: str, tab_id: str | None = None) -> ScheduleCollection:
+        """
+        ホロジュールの HTML からホロジュール情報を取得する関数
+
+        Args:
+            html (str): ページソース
+            tab_id (str | None, optional): 解析するタブの id 属性（None の場合は表示中のタブ）
+
+        Returns:
+            ScheduleCollection: ホロジュール情報のコレクション
+        """
+        # bs4 は読み込みに時間がかかるため、このパーサを使うときに読み込む
+        from bs4 import BeautifulSoup
+        # ページソースの解析（パーサとして lxml を指定）
+        soup = BeautifulSoup(html.encode("utf-8"), "lxml")
+        # タイトルの取得（確認用）
+        head = soup.find("head")
+        title = head.find("title").text
+        logger.info('TITLE : %s', title)
+
+        # TODO : ここからはページの構成に合わせて決め打ち = ページの構成が変わったら動かない
+        # スケジュールの取得
+        schedules = ScheduleCollection()
+        date_string = ""
+        today = date.today()
+        if tab_id is None:
+            tab_pane = soup.find("div", class_=CLASS_TAB_PANE)
+        else:
+            tab_pane = soup.find("div", id=tab_id)
+        if tab_pane is None:
+            logger.warning("ホロジュールのタブがありません。 : %s", tab_id or CLASS_TAB_PANE)
+            return schedules
+        containers = tab_pane.find_all("div", class_="container")
+
+        for container in containers:
+            # 日付のみ取得
+            div_date = container.find("div", class_=CLASS_DATE)
+            if div_date is not None:
+                date_text = div_date.text.strip()
+                match_date = re.search(r"[0-9]{1,2}/[0-9]{1,2}", date_text)
+                dates = match_date.group(0).split("/")
+                month = int(dates[0])
+                day = int(dates[1])
+                year = get_year(month, today)
+                date_string = f"{year}/{month}/{day}"
+
+            # 配信者毎のスケジュール
+            thumbnails = container.find_all("a", class_="thumbnail")
+            if thumbnails is not None:
+                for thumbnail in thumbnails:
+                    # Youtube URL
+                    stream_url = thumbnail.get("href")
+                    if stream_url is None or re.match(self.__url_pattern, stream_url) is None:
+                        record_skipped(self.__metrics, "entries_skipped_url")
+                        continue
+                    # 時刻（先に取得しておいた日付と合体）
+                    div_time = thumbnail.find("div", class_=CLASS_TIME)
+                    if div_time is None:
+                        record_skipped(self.__metrics, "entries_skipped_incomplete")
+                        continue
+                    time_text = div_time.text.strip()
+                    match_time = re.search(r"[0-9]{1,2}:[0-9]{1,2}", time_text)
+                    times = match_time.group(0).split(":")
+                    hour = int(times[0])
+                    minute = int(times[1])
+                    datetime_string = f"{date_string} {hour}:{minute}"
+                    stream_datetime = datetime.strptime(datetime_string, "%Y/%m/%d %H:%M")
+                    # 配信者の名前
+                    div_name = thumbnail.find("div", class_=CLASS_NAME)
+                    if div_name is None:
+                        record_skipped(self.__metrics, "entries_skipped_incomplete")
+                        continue
+                    stream_name = div_name.text.strip()
+                    # リストに追加
+                    streamer = self.__streamers.get_streamer_by_name(stream_name)
+                    if streamer is None:
+                        record_skipped(self.__metrics, "entries_skipped_streamer")
+                        continue
+                    schedule = ScheduleModel(code=streamer.code, url=stream_url, streaming_at=stream_datetime, name=streamer.name)
+                    schedules.append(schedule)
+        return schedules
+
+    def iter_parse(self, html: str, tab_id: str | None = None) -> Iterator[ScheduleModel]:
+        """
+        ホロジュールの HTML を解析して、ホロジュール情報を1件ずつ返す関数（全体を解析してから返す）
+
+        Args:
+            html (str): ページソース
+            tab_id (str | None, optional): 解析するタブの id 属性（None の場合は表示中のタブ）
+
+        Yields:
+            ScheduleModel: ホロジュール情報
+        """
+        yield from self.parse(html, tab_id).schedules
+
+def has_class(name: str) -> str:
+    """
+    class 属性に指定したクラスを含むかどうかの XPath 条件を返す関数
+
+    Args:
+        name (str): クラス名
+
+    Returns:
+        str: XPath の条件式
+    """
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+class LxmlScheduleParser:
+    """
+    lxml のコンパイル済み XPath でホロジュールの HTML を1回の走査で解析するクラス
+
+    表示中のタブに含まれる日付・サムネイル・時刻・名前の要素を文書順に取得して、
+    日付の後に続くサムネイルをその日のスケジュールとして扱う。
+    """
+
+    # タイトル
+    XPATH_TITLE = etree.XPath("string(/html/head/title)")
+    # 表示中のタブ
+    XPATH_TAB_PANE = etree.XPath(f"(//div[@class='{CLASS_TAB_PANE}'])[1]")
+    # id 属性で指定したタブ
+    XPATH_TAB_PANE_BY_ID = etree.XPath("(//div[@id=$tab_id])[1]")
+    # 表示中のタブに含まれる日付・サムネイル・時刻・名前（文書順）
+    XPATH_ENTRIES = etree.XPath(
+        f"descendant::*[@class='{CLASS_DATE}' or @class='{CLASS_TIME}' or @class='{CLASS_NAME}'"
+        f" or (self::a and {has_class('thumbnail')})]"
+    )
+
+    def __init__(self, streamers: StreamerCollection, url_pattern: str, metrics: RunMetrics | None = None):
+        """
+        LxmlScheduleParserクラスのコンストラクタ
+
+        Args:
+            streamers (StreamerCollection): 配信者情報のコレクション
+            url_pattern (str): Youtube の URL パターン
+            metrics (RunMetrics | None, optional): スキップした件数を記録するメトリクス
+        """
+        self.__streamers = streamers
+        self.__url_pattern = re.compile(url_pattern)
+        self.__metrics = metrics
+        self.__parser = etree.HTMLParser(encoding="utf-8")
+
+    def parse(self, html: str, tab_id: str | None = None) -> ScheduleCollection:
+        """
+        ホロジュールの HTML からホロジュール情報を取得する関数
+
+        Args:
+            html (str): ページソース
+            tab_id (str | None, optional): 解析するタブの id 属性（None の場合は表示中のタブ）
+
+        Returns:
+            ScheduleCollection: ホロジュール情報のコレクション
+        """
+        return ScheduleCollection(schedules=list(self.iter_parse(html, tab_id)))
+
+    def iter_parse(self, html: str, tab_id: str | None = None) -> Iterator[ScheduleModel]:
+        """
+        ホロジュールの HTML を解析して、ホロジュール情報を文書順に1件ずつ返す関数
+
+        Args:
+            html (str): ページソース
+            tab_id (str | None, optional): 解析するタブの id 属性（None の場合は表示中のタブ）
+
+        Yields:
+            ScheduleModel: ホロジュール情報
+        """
+        root = etree.fromstring(html.encode("utf-8"), self.__parser)
+        logger.info('TITLE : %s', LxmlScheduleParser.XPATH_TITLE(root))
+
+        if tab_id is None:
+            tab_panes = LxmlScheduleParser.XPATH_TAB_PANE(root)
+        else:
+            tab_panes = LxmlScheduleParser.XPATH_TAB_PANE_BY_ID(root, tab_id=tab_id)
+        if len(tab_panes) == 0:
+            logger.warning("ホロジュールのタブがありません。 : %s", tab_id or CLASS_TAB_PANE)
+            return
+        yield from self.__iter_element(tab_panes[0], date.today(), [None])
+
+    def iter_blocks(self, html: str, tab_id: str | None = None) -> list[etree._Element]:
+        """
+        ホロジュールの HTML を解析して、タブに含まれるブロック（日ごとのコンテナ）の要素を文書順に返す関数
+
+        サムネイルの中のコンテナは含めない。タブにコンテナがない場合はタブ全体を1つのブロックとする。
+
+        Args:
+            html (str): ページソース
+            tab_id (str | None, optional): 解析するタブの id 属性（None の場合は表示中のタブ）
+
+        Returns:
+            list[etree._Element]: ブロックの要素（タブがない場合は空）
+        """
+        root = etree.fromstring(html.encode("utf-8"), self.__parser)
+        logger.info('TITLE : %s', LxmlScheduleParser.XPATH_TITLE(root))
+        if tab_id is None:
+            tab_panes = LxmlScheduleParser.XPATH_TAB_PANE(root)
+        else:
+            tab_panes = LxmlScheduleParser.XPATH_TAB_PANE_BY_ID(root, tab_id=tab_id)
+        if len(tab_panes) == 0:
+            logger.warning("ホロジュールのタブがありません。 : %s", tab_id or CLASS_TAB_PANE)
+            return []
+        # コンテナより下はたどらない（要素を逆順に積んで文書順に取り出す）
+        blocks = []
+        elements = list(reversed(tab_panes[0]))
+        while len(elements) > 0:
+            element = elements.pop()
+            if not isinstance(element.tag, str):
+                continue
+            if element.tag == "div" and CLASS_CONTAINER in element.get("class", "").split():
+                blocks.append(element)
+            else:
+                elements.extend(reversed(element))
+        return blocks if len(blocks) > 0 else [tab_panes[0]]
+
+    def parse_block(self, block: etree._Element, current_date: date | None, today: date) -> tuple[list[ScheduleModel], date | None]:
+        """
+        ブロック（日ごとのコンテナ）からホロジュール情報を取得する関数
+
+        Args:
+            block (etree._Element): ブロックの要素
+            current_date (date | None): ブロックの直前の日付（ブロックに日付がない場合に使う）
+            today (date): 年を求める基準日
+
+        Returns:
+            tuple[list[ScheduleModel], date | None]: ホロジュール情報, ブロックの最後の日付（次のブロックの直前の日付）
+        """
+        context = [current_date]
+        schedules = list(self.__iter_element(block, today, context))
+        return schedules, context[0]
+
+    def __iter_element(self, parent: etree._Element, today: date, context: list) -> Iterator[ScheduleModel]:
+        """
+        要素に含まれる日付・サムネイル・時刻・名前を文書順にたどって、ホロジュール情報を1件ずつ返す関数
+
+        Args:
+            parent (etree._Element): タブまたはブロックの要素
+            today (date): 年を求める基準日
+            context (list): 直前の日付を持つ1要素のリスト（たどった後は最後の日付に置き換える）
+
+        Yields:
+            ScheduleModel: ホロジュール情報
+        """
+        current_date = context[0]
+        # 解析中のサムネイルの情報（URL, 日付, 時刻, 名前）
+        entry = None
+
+        for element in LxmlScheduleParser.XPATH_ENTRIES(parent):
+            if element.tag == "a":
+                schedule = self.__to_schedule(entry)
+                if schedule is not None:
+                    yield schedule
+                stream_url = element.get("href")
+                if stream_url is None or self.__url_pattern.match(stream_url) is None:
+                    record_skipped(self.__metrics, "entries_skipped_url")
+                    entry = None
+                else:
+                    entry = [stream_url, current_date, None, None]
+                continue
+
+            css_class = element.get("class")
+            if css_class == CLASS_DATE:
+                # 日付のみ取得
+                schedule = self.__to_schedule(entry)
+                if schedule is not None:
+                    yield schedule
+                entry = None
+                match_date = DATE_PATTERN.search("".join(element.itertext()))
+                month = int(match_date.group(1))
+                current_date = date(get_year(month, today), month, int(match_date.group(2)))
+                context[0] = current_date
+            elif entry is None:
+                continue
+            elif css_class == CLASS_TIME and entry[2] is None:
+                match_time = TIME_PATTERN.search("".join(element.itertext()))
+                entry[2] = (int(match_time.group(1)), int(match_time.group(2)))
+            elif css_class == CLASS_NAME and entry[3] is None:
+                entry[3] = "".join(element.itertext()).strip()
+        schedule = self.__to_schedule(entry)
+        if schedule is not None:
+            yield schedule
+
+    def __to_schedule(self, entry: list | None) -> ScheduleModel | None:
+        """
+        解析したサムネイルの情報をホロジュール情報に変換する関数
+
+        Args:
+            entry (list | None): サムネイルの情報（URL, 日付, 時刻, 名前）
+
+        Returns:
+            ScheduleModel | None: ホロジュール情報（情報が足りない・配信者が不明な場合は None）
+        """
+        if entry is None:
+            return None
+        stream_url, stream_date, stream_time, stream_name = entry
+        if stream_date is None or stream_time is None or stream_name is None:
+            record_skipped(self.__metrics, "entries_skipped_incomplete")
+            return None
+        streamer = self.__streamers.get_streamer_by_name(stream_name)
+        if streamer is None:
+            record_skipped(self.__metrics, "entries_skipped_streamer")
+            return None
+        stream_datetime = datetime(stream_date.year, stream_date.month, stream_date.day, stream_time[0], stream_time[1])
+        return ScheduleModel(code=streamer.code, url=stream_url, streaming_at=stream_datetime, name=streamer.name)
+
+# 選択できるパーサ
+SCHEDULE_PARSERS = {
+    "bs4": SoupScheduleParser,
+    "lxml": LxmlScheduleParser,
+}
+
+def create_schedule_parser(name: str, streamers: StreamerCollection, url_pattern: str, metrics: RunMetrics | None = None) -> SoupScheduleParser | LxmlScheduleParser:
+    """
+    指定した名前のパーサを生成する関数
+
+    Args:
+        name (str): パーサの名前（bs4 / lxml）
+        streamers (StreamerCollection): 配信者情報のコレクション
+        url_pattern (str): Youtube の URL パターン
+        metrics (RunMetrics | None, optional): スキップした件数を記録するメトリクス
+
+    Returns:
+        SoupScheduleParser | LxmlScheduleParser: パーサ
+
+    Raises:
+        ValueError: パーサの名前が不正な場合
+    """
+    parser_class = SCHEDULE_PARSERS.get(name)
+    if parser_class is None:
+        raise ValueError(f"パーサの指定が不正です。 : {name}")
+    return parser_class(streamers, url_pattern, metrics)
+
+def main() -> int:
+    """
+    保存したホロジュールの HTML を各パーサで解析して、結果と処理時間を比較する関数
+
+    Returns:
+        int: 終了コード（結果が一致しない場合は 1）
+    """
+    parser = argparse.ArgumentParser(description="保存したホロジュールの HTML を各パーサで解析して結果と処理時間を比較")
+    parser.add_argument("htmlpath", help="ホロジュールの HTML ファイルのパス")
+    parser.add_argument("--url-pattern", default=r"https://www\.youtube\.com/watch", help="Youtube の URL パターン")
+    parser.add_argument("--repeat", type=int, default=5, help="計測の繰り返し回数")
+    args = parser.parse_args()
+
+    with open(args.htmlpath, "r", encoding="utf-8") as f:
+        html = f.read()
+
+    streamers = StreamerCollection()
+    results = {}
+    for name in SCHEDULE_PARSERS:
+        schedule_parser = create_schedule_parser(name, streamers, args.url_pattern)
+        elapsed = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            schedules = schedule_parser.parse(html)
+            elapsed.append(time.perf_counter() - start)
+        results[name] = [schedule.model_dump(exclude={"published_at"}) for schedule in schedules]
+        print(f"{name:5s} : {len(schedules)}件 最小 {min(elapsed) * 1000:.1f}ms 平均 {sum(elapsed) / len(elapsed) * 1000:.1f}ms")
+
+    is_same = all(result == results["bs4"] for result in results.values())
+    print("結果 : " + ("一致" if is_same else "不一致"))
+    return 0 if is_same else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
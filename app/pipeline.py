@@ -0,0 +1,235 @@
+import asyncio
+from logging import getLogger
+from app.collector import Collector, VIDEOS_LIST_MAX_RESULTS
+from app.settings import get_pipeline_settings, get_mongo_settings
+from app.models.schedule import ScheduleModel
+from app.models.schedules import ScheduleCollection, RemovalScope
+from app.models.streamers import StreamerCollection
+from app.models.save_result import SaveResult
+
+logger = getLogger(__name__)
+
+# キューの終端を表す値
+END_OF_QUEUE = None
+
+class CollectorPipeline:
+    """
+    ホロジュールの解析・動画情報の付与・MongoDB への登録を asyncio で並行して行うクラス
+
+    解析したホロジュール情報は上限付きのキューを通して動画情報の付与ワーカーへ、
+    動画情報を付与したものはさらに登録ワーカーへ流れる（キューが一杯の場合は前の段が待つ）。
+    """
+
+    def __init__(self, collector: Collector, enrich_workers: int, queue_size: int, batch_wait: float, write_batch_size: int, save_mode: str):
+        """
+        CollectorPipelineクラスのコンストラクタ
+
+        Args:
+            collector (Collector): ホロジュールの取得と動画情報の付与に使う Collector オブジェクト
+            enrich_workers (int): 動画情報の付与ワーカーの数
+            queue_size (int): 各キューの上限
+            batch_wait (float): 動画情報をまとめて問い合わせるために次のホロジュール情報を待つ時間（秒）
+            write_batch_size (int): MongoDB へ一度に登録する件数
+            save_mode (str): ホロジュール情報の保存方法（upsert / replace / diff）
+        """
+        self.__collector = collector
+        self.__enrich_workers = enrich_workers
+        self.__queue_size = queue_size
+        self.__batch_wait = batch_wait
+        self.__write_batch_size = write_batch_size
+        self.__save_mode = save_mode
+        # 実行中にリースを他のインスタンスが引き継いだかどうか（以降の登録は行わない）
+        self.__is_lease_lost = False
+
+    async def run(self) -> ScheduleCollection:
+        """
+        パイプラインを実行する関数
+
+        Returns:
+            ScheduleCollection: 動画情報を付与したホロジュール情報のコレクション（解析した順）
+
+        Raises:
+            Exception: いずれかの段で失敗した場合
+        """
+        # 実行ごとにクォータとメトリクスを数え直す（担当するタブのリースも取得する）
+        self.__collector.start_run()
+        self.__is_lease_lost = False
+        parsed_queue = asyncio.Queue(maxsize=self.__queue_size)
+        enriched_queue = asyncio.Queue(maxsize=self.__queue_size)
+        schedules = ScheduleCollection()
+        results = []
+
+        async with asyncio.TaskGroup() as task_group:
+            task_group.create_task(self.__parse(parsed_queue, schedules))
+            enrich_tasks = [task_group.create_task(self.__enrich(parsed_queue, enriched_queue)) for _ in range(self.__enrich_workers)]
+            task_group.create_task(self.__write(enriched_queue, results))
+            # 配信者情報の登録は他の段と並行して行う（担当するタブがない場合とリースを引き継がれた場合は登録しない）
+            streamer_task = task_group.create_task(asyncio.to_thread(self.__save_streamers))
+            # すべての付与ワーカーが終わったら登録ワーカーへ終端を伝える
+            await asyncio.gather(*enrich_tasks)
+            await enriched_queue.put(END_OF_QUEUE)
+
+        # diff の場合は、一定件数ずつの登録では分からない削除を今回取得した全体で検出する（登録済みの分は変更なしになる）
+        # （前回から変わっていない場合は登録済みのため、動画情報の取得を見送った場合は全体が揃っていないため検出しない）
+        # （一部のタブのみを担当する場合は、タブごとの範囲と配信者に限って検出する）
+        # （担当するタブがない場合と、リースを他のインスタンスが引き継いだ場合は登録していないため記録しない）
+        if self.__collector.is_unchanged:
+            logger.info("ホロジュールが前回から変わっていないため登録しません。")
+            self.__collector.commit_blocks()
+        elif not self.__collector.is_standby and not self.__is_lease_lost:
+            scopes = await asyncio.to_thread(self.__collector.get_removal_scopes) if self.__save_mode == "diff" else None
+            if scopes is not None:
+                results.append(await asyncio.to_thread(self.__save_schedules, schedules, scopes))
+            # 実行が完了したかどうかを記録して、登録できたブロックを次回の実行で再利用する
+            if not self.__is_lease_lost:
+                await asyncio.to_thread(self.__collector.finish_save)
+
+        streamer_result = streamer_task.result()
+        if streamer_result is not None:
+            logger.info("配信者情報 : 追加 %s件 / 更新 %s件 / 変更なし %s件", streamer_result.inserted, streamer_result.updated, streamer_result.unchanged)
+        logger.info(
+            "ホロジュール情報 : 追加 %s件 / 更新 %s件 / 変更なし %s件 / 削除 %s件（%s）",
+            sum(result.inserted for result in results),
+            sum(result.updated for result in results),
+            sum(result.unchanged for result in results),
+            sum(result.deleted for result in results),
+            self.__save_mode,
+        )
+        return schedules
+
+    async def __parse(self, parsed_queue: asyncio.Queue, schedules: ScheduleCollection) -> None:
+        """
+        ホロジュールの HTML を取得・解析してキューへ流す段
+
+        解析はスレッドで行い、キューが一杯の場合は空くまで解析を止める。
+        前回のブロックを再利用したものは動画情報を付与して登録済みのため、キューへは流さない。
+
+        Args:
+            parsed_queue (asyncio.Queue): 解析したホロジュール情報のキュー
+            schedules (ScheduleCollection): 解析したホロジュール情報を順に追加するコレクション
+        """
+        loop = asyncio.get_running_loop()
+
+        def produce():
+            for schedule, is_reused in self.__collector.iter_parsed_schedules():
+                schedules.append(schedule)
+                if not is_reused:
+                    asyncio.run_coroutine_threadsafe(parsed_queue.put(schedule), loop).result()
+
+        try:
+            await asyncio.to_thread(produce)
+            logger.info("ホロジュール情報を解析しました。 : %s件", len(schedules))
+        finally:
+            # 失敗した場合も付与ワーカーが終わるように終端を流す
+            for _ in range(self.__enrich_workers):
+                await parsed_queue.put(END_OF_QUEUE)
+
+    async def __enrich(self, parsed_queue: asyncio.Queue, enriched_queue: asyncio.Queue) -> None:
+        """
+        キューから取り出したホロジュール情報に動画情報を付与する段（videos.list の上限件数ずつまとめる）
+
+        Args:
+            parsed_queue (asyncio.Queue): 解析したホロジュール情報のキュー
+            enriched_queue (asyncio.Queue): 動画情報を付与したホロジュール情報のキュー
+        """
+        is_end = False
+        while not is_end:
+            # 1件目は届くまで待ち、以降は一定時間内に届いたものを上限件数までまとめる
+            batch: list[ScheduleModel] = []
+            schedule = await parsed_queue.get()
+            while schedule is not END_OF_QUEUE:
+                batch.append(schedule)
+                if len(batch) >= VIDEOS_LIST_MAX_RESULTS:
+                    break
+                try:
+                    schedule = await asyncio.wait_for(parsed_queue.get(), timeout=self.__batch_wait)
+                except TimeoutError:
+                    break
+            is_end = schedule is END_OF_QUEUE
+            if len(batch) == 0:
+                continue
+            await asyncio.to_thread(self.__collector.set_video_infos, ScheduleCollection(schedules=batch))
+            for schedule in batch:
+                await enriched_queue.put(schedule)
+
+    async def __write(self, enriched_queue: asyncio.Queue, results: list[SaveResult]) -> None:
+        """
+        動画情報を付与したホロジュール情報を一定件数ずつ MongoDB へ登録する段
+
+        Args:
+            enriched_queue (asyncio.Queue): 動画情報を付与したホロジュール情報のキュー
+            results (list[SaveResult]): 登録結果を追加するリスト
+        """
+        batch: list[ScheduleModel] = []
+        while True:
+            schedule = await enriched_queue.get()
+            if schedule is not END_OF_QUEUE:
+                batch.append(schedule)
+            if len(batch) > 0 and (schedule is END_OF_QUEUE or len(batch) >= self.__write_batch_size):
+                results.append(await asyncio.to_thread(self.__save_schedules, ScheduleCollection(schedules=batch), None))
+                batch = []
+            if schedule is END_OF_QUEUE:
+                break
+
+    def __save_streamers(self) -> SaveResult | None:
+        """
+        配信者情報を MongoDB へ登録する関数（処理時間をメトリクスに記録する）
+
+        ホロジュール情報の登録と同じく、担当するタブがない場合とリースを他のインスタンスが引き継いだ場合は登録しない。
+
+        Returns:
+            SaveResult | None: 登録結果（登録しなかった場合は None）
+        """
+        if self.__collector.is_standby or self.__is_lease_lost:
+            return None
+        if not self.__collector.renew_leases():
+            self.__is_lease_lost = True
+            return None
+        with self.__collector.metrics.measure("save_streamers"):
+            return StreamerCollection().save_to_mongodb()
+
+    def __save_schedules(self, schedules: ScheduleCollection, scopes: list[RemovalScope] | None) -> SaveResult:
+        """
+        ホロジュール情報を MongoDB へ登録する関数（処理時間と件数をメトリクスに記録する）
+
+        Args:
+            schedules (ScheduleCollection): 登録するホロジュール情報のコレクション
+            scopes (list[RemovalScope] | None): diff の場合に削除を検出する範囲（今回取得した全体を渡す場合のみ指定、None の場合は検出しない）
+
+        Returns:
+            SaveResult: 登録結果
+        """
+        # リースを他のインスタンスが引き継いだ場合は登録しない
+        if self.__is_lease_lost or not self.__collector.renew_leases():
+            self.__is_lease_lost = True
+            return SaveResult()
+        # 動画情報の取得を見送ったものは登録済みの内容を残す
+        schedules = self.__collector.exclude_deferred(schedules)
+        with self.__collector.metrics.measure("save_schedules"):
+            result = schedules.save_to_mongodb(self.__save_mode, scopes is not None, scopes)
+        if scopes is not None and self.__save_mode == "diff":
+            # 今回取得した全体は一定件数ずつの登録で数えた分と重なるため、変更なしの件数は数えない
+            result.unchanged = 0
+        self.__collector.record_save_result(result)
+        return result
+
+def create_collector_pipeline(collector: Collector) -> CollectorPipeline:
+    """
+    設定に応じたパイプラインを生成する関数
+
+    Args:
+        collector (Collector): ホロジュールの取得と動画情報の付与に使う Collector オブジェクト
+
+    Returns:
+        CollectorPipeline: パイプライン
+    """
+    pipeline_settings = get_pipeline_settings()
+    mongo_settings = get_mongo_settings()
+    return CollectorPipeline(
+        collector,
+        pipeline_settings.enrich_workers,
+        pipeline_settings.queue_size,
+        pipeline_settings.batch_wait,
+        pipeline_settings.write_batch_size,
+        mongo_settings.save_mode,
+    )
@@ -0,0 +1,206 @@
+import time
+import random
+import threading
+
+class TokenBucket:
+    """
+    トークンバケット方式で単位時間あたりの呼び出し回数を制限するクラス（スレッドセーフ）
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        """
+        TokenBucketクラスのコンストラクタ
+
+        Args:
+            rate (float): 1秒あたりに補充するトークンの数（0 以下の場合は制限しない）
+            capacity (int): 貯めておけるトークンの最大数（連続して呼び出せる回数）
+        """
+        self.__rate = rate
+        self.__capacity = max(capacity, 1)
+        self.__tokens = float(self.__capacity)
+        self.__updated_at = time.monotonic()
+        self.__lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        トークンを1つ取得する関数（トークンがない場合は補充されるまで待つ）
+
+        Returns:
+            float: 待った時間（秒）
+        """
+        if self.__rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self.__lock:
+                now = time.monotonic()
+                self.__tokens = min(self.__capacity, self.__tokens + (now - self.__updated_at) * self.__rate)
+                self.__updated_at = now
+                if self.__tokens >= 1:
+                    self.__tokens -= 1
+                    return waited
+                wait = (1 - self.__tokens) / self.__rate
+            time.sleep(wait)
+            waited += wait
+
+class QuotaBudget:
+    """
+    1回の実行で消費できる API のクォータを管理するクラス（スレッドセーフ）
+    """
+
+    def __init__(self, limit: int):
+        """
+        QuotaBudgetクラスのコンストラクタ
+
+        Args:
+            limit (int): 1回の実行で消費できるクォータ（0 以下の場合は制限しない）
+        """
+        self.__limit = limit
+        self.__used = 0
+        self.__lock = threading.Lock()
+
+    @property
+    def used(self) -> int:
+        """
+        消費したクォータを返す
+
+        Returns:
+            int: 消費したクォータ
+        """
+        return self.__used
+
+    def reset(self) -> None:
+        """
+        消費したクォータを0に戻す関数（実行の開始時に呼び出す）
+        """
+        with self.__lock:
+            self.__used = 0
+
+    def consume(self, units: int) -> bool:
+        """
+        クォータを消費する関数
+
+        Args:
+            units (int): 消費するクォータ
+
+        Returns:
+            bool: 消費できたかどうか（上限を超える場合は消費せずに False）
+        """
+        with self.__lock:
+            if self.__limit > 0 and self.__used + units > self.__limit:
+                return False
+            self.__used += units
+            return True
+
+class RetryBackoff:
+    """
+    一時的なエラーで呼び出し直すまでの待ち時間を指数関数的に延ばすクラス（ジッタを加える）
+    """
+
+    def __init__(self, max_attempts: int, base_delay: float, max_delay: float):
+        """
+        RetryBackoffクラスのコンストラクタ
+
+        Args:
+            max_attempts (int): 最初の呼び出しを含めた呼び出しの最大回数（1 以下の場合は呼び出し直さない）
+            base_delay (float): 1回目に呼び出し直すまでの待ち時間の上限（秒）
+            max_delay (float): 待ち時間の上限（秒）
+        """
+        self.__max_attempts = max(max_attempts, 1)
+        self.__base_delay = base_delay
+        self.__max_delay = max_delay
+
+    @property
+    def max_attempts(self) -> int:
+        """
+        最初の呼び出しを含めた呼び出しの最大回数を返す
+
+        Returns:
+            int: 呼び出しの最大回数
+        """
+        return self.__max_attempts
+
+    def get_delay(self, attempt: int) -> float:
+        """
+        呼び出し直すまでの待ち時間を求める関数（0 から上限までの一様乱数 = Full Jitter）
+
+        複数のスレッドが同時に失敗した場合も、呼び出し直す時刻がばらけるようにする。
+
+        Args:
+            attempt (int): 失敗した呼び出しの回数（1 から）
+
+        Returns:
+            float: 待ち時間（秒）
+        """
+        return random.uniform(0, min(self.__max_delay, self.__base_delay * 2 ** (attempt - 1)))
+
+class CircuitBreaker:
+    """
+    クォータの超過などで API を呼び出せない間、呼び出しを一定時間止めるクラス（スレッドセーフ）
+
+    開いている間は呼び出さずに失敗させ、一定時間が過ぎたら1回だけ試しに呼び出す（成功したら閉じる）。
+    """
+
+    def __init__(self, cooldown: float):
+        """
+        CircuitBreakerクラスのコンストラクタ
+
+        Args:
+            cooldown (float): 開いてから試しに呼び出すまでの時間（秒）
+        """
+        self.__cooldown = cooldown
+        self.__opened_at = None
+        self.__is_trying = False
+        self.__lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        """
+        呼び出しを止めているかどうかを返す
+
+        Returns:
+            bool: 止めているかどうか
+        """
+        with self.__lock:
+            return self.__opened_at is not None
+
+    def allow(self) -> bool:
+        """
+        呼び出してよいかどうかを返す関数（一定時間が過ぎた後は1つのスレッドのみ試しに呼び出せる）
+
+        Returns:
+            bool: 呼び出してよいかどうか
+        """
+        with self.__lock:
+            if self.__opened_at is None:
+                return True
+            if self.__is_trying or time.monotonic() - self.__opened_at < self.__cooldown:
+                return False
+            self.__is_trying = True
+            return True
+
+    def open(self) -> None:
+        """
+        呼び出しを止める関数（試しに呼び出して失敗した場合は止める時間を数え直す）
+        """
+        with self.__lock:
+            self.__opened_at = time.monotonic()
+            self.__is_trying = False
+
+    def close(self) -> None:
+        """
+        試しに呼び出してクォータの超過以外の結果となった場合に、呼び出しを再開する関数
+
+        止める前に始めた呼び出しの結果では再開しない。
+        """
+        with self.__lock:
+            if self.__is_trying:
+                self.__opened_at = None
+                self.__is_trying = False
+
+    def release(self) -> None:
+        """
+        試しに呼び出す番だったが呼び出さなかった場合に、次の呼び出しに番を譲る関数
+        """
+        with self.__lock:
+            self.__is_trying = False
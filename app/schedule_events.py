@@ -0,0 +1,64 @@
+import os
+import threading
+from logging import getLogger
+from app.settings import EventSettings
+from app.models.schedule_change import ScheduleChange
+
+logger = getLogger(__name__)
+
+class ScheduleEventWriter:
+    """
+    スケジュールの変更を JSONL（1行に1件の JSON）のイベントとしてファイルに追記するクラス（スレッドセーフ）
+
+    追記のみを行うため、利用側は tail -F などで変更だけを読み取れる。
+    """
+
+    def __init__(self, filepath: str):
+        """
+        ScheduleEventWriterクラスのコンストラクタ
+
+        Args:
+            filepath (str): イベントを追記するファイルのパス
+        """
+        self.__filepath = filepath
+        self.__lock = threading.Lock()
+
+    def write(self, changes: list[ScheduleChange]) -> int:
+        """
+        変更をイベントとして追記する関数（1回の書き込みでまとめて追記する）
+
+        Args:
+            changes (list[ScheduleChange]): 変更のリスト
+
+        Returns:
+            int: 追記したイベントの数（書き込みに失敗した場合は 0）
+        """
+        if len(changes) == 0:
+            return 0
+        content = "".join(change.model_dump_json() + "\n" for change in changes)
+        try:
+            with self.__lock:
+                dirpath = os.path.dirname(self.__filepath)
+                if dirpath != "":
+                    os.makedirs(dirpath, exist_ok=True)
+                with open(self.__filepath, "a", encoding="utf-8") as f:
+                    f.write(content)
+        except OSError as e:
+            # イベントの書き込みに失敗しても登録は継続する（登録した内容は MongoDB に残る）
+            logger.warning("スケジュールの変更イベントの書き込みに失敗しました。%s", e, exc_info=True)
+            return 0
+        return len(changes)
+
+def create_schedule_event_writer(settings: EventSettings) -> ScheduleEventWriter | None:
+    """
+    設定に応じたスケジュールの変更イベントの書き込み先を生成する関数
+
+    Args:
+        settings (EventSettings): スケジュールの変更イベントの設定
+
+    Returns:
+        ScheduleEventWriter | None: 書き込み先（path が空の場合は None）
+    """
+    if settings.path == "":
+        return None
+    return ScheduleEventWriter(settings.path)
@@ -0,0 +1,357 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from datetime import datetime, timezone, timedelta
+from logging import getLogger
+import pymongo
+from app.mongodb import MongoDB
+from app.settings import QuerySettings, get_query_settings
+
+logger = getLogger(__name__)
+
+JST = timezone(timedelta(hours=+9), "JST")
+
+# 結果に含めるスケジュールの項目（概要・タグなどの大きい項目は含めない）
+SCHEDULE_FIELDS = ("code", "video_id", "streaming_at", "name", "title", "url")
+# 結果に含める配信者の項目（streamers から $lookup で結合する）
+STREAMER_FIELDS = ("group", "affiliations", "image_name")
+# 一度に返す件数の既定値
+DEFAULT_LIMIT = 100
+# 検索結果のキャッシュの世代（登録のたびに増やす）を記録する sync_states の _id
+CACHE_GENERATION_ID = "query_cache"
+
+class QueryCache:
+    """
+    検索結果をプロセス内に保持する有効期間つきの LRU キャッシュクラス
+
+    有効期間を過ぎたものと、上限を超えた場合に最も使われていないものから破棄する。
+    ホロジュール情報・配信者情報を登録した場合は invalidate ですべて破棄し、
+    別のプロセスで登録した場合は sync_generation に渡した世代が変わったときにすべて破棄する。
+    """
+
+    def __init__(self, ttl: int, max_entries: int):
+        """
+        QueryCacheクラスのコンストラクタ
+
+        Args:
+            ttl (int): 検索結果の有効期間（秒）
+            max_entries (int): 保持する検索結果の上限
+        """
+        self.__ttl = ttl
+        self.__max_entries = max_entries
+        # キー => (有効期限, 検索結果)
+        self.__entries: OrderedDict[tuple, tuple[float, list[dict]]] = OrderedDict()
+        # 破棄した回数（検索中に破棄された場合は結果を保持しない）
+        self.__generation = 0
+        # 保持している検索結果の元になった、MongoDB に記録された世代（未確認の場合は None）
+        self.__stored_generation: int | None = None
+        self.__lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """
+        保持している検索結果の件数を返す関数
+
+        Returns:
+            int: 件数
+        """
+        with self.__lock:
+            return len(self.__entries)
+
+    def get_or_load(self, key: tuple, load: Callable[[], list[dict]]) -> list[dict]:
+        """
+        キーに対応する検索結果を返す関数（保持していないか有効期限を過ぎた場合は load で検索して保持する）
+
+        Args:
+            key (tuple): 検索の種類と条件からなるキー
+            load (Callable[[], list[dict]]): 検索する関数
+
+        Returns:
+            list[dict]: 検索結果
+        """
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.__entries.move_to_end(key)
+                return entry[1]
+            generation = self.__generation
+        # 検索中はロックを解放する（同じキーを同時に検索した場合は後の結果で上書きする）
+        result = load()
+        with self.__lock:
+            if generation == self.__generation:
+                self.__entries[key] = (time.monotonic() + self.__ttl, result)
+                self.__entries.move_to_end(key)
+                while len(self.__entries) > self.__max_entries:
+                    self.__entries.popitem(last=False)
+        return result
+
+    def invalidate(self) -> None:
+        """
+        保持している検索結果をすべて破棄する関数
+        """
+        with self.__lock:
+            self.__entries.clear()
+            self.__generation += 1
+
+    def sync_generation(self, generation: int) -> None:
+        """
+        MongoDB に記録された世代が前回から変わっていれば、保持している検索結果をすべて破棄する関数
+
+        Args:
+            generation (int): MongoDB に記録された世代（いずれかのプロセスで登録するたびに増える）
+        """
+        with self.__lock:
+            if self.__stored_generation == generation:
+                return
+            self.__entries.clear()
+            self.__generation += 1
+            self.__stored_generation = generation
+
+def create_query_cache(settings: QuerySettings) -> QueryCache | None:
+    """
+    設定に応じた検索結果のキャッシュを生成する関数
+
+    Args:
+        settings (QuerySettings): 検索の設定
+
+    Returns:
+        QueryCache | None: キャッシュ（有効期間か上限が 0 の場合は None = キャッシュしない）
+
+    Raises:
+        ValueError: 有効期間か上限の指定が不正な場合
+    """
+    if settings.cache_ttl < 0 or settings.cache_max_entries < 0:
+        raise ValueError(f"検索結果のキャッシュの指定が不正です。 : ttl={settings.cache_ttl} max_entries={settings.cache_max_entries}")
+    if settings.cache_ttl == 0 or settings.cache_max_entries == 0:
+        return None
+    return QueryCache(settings.cache_ttl, settings.cache_max_entries)
+
+_cache: QueryCache | None = None
+_cache_created = False
+_cache_lock = threading.Lock()
+
+def get_query_cache() -> QueryCache | None:
+    """
+    プロセスで共有する検索結果のキャッシュを取得する関数（最初に呼び出したときに生成する）
+
+    Returns:
+        QueryCache | None: キャッシュ（キャッシュしない場合は None）
+    """
+    global _cache, _cache_created
+    with _cache_lock:
+        if not _cache_created:
+            _cache = create_query_cache(get_query_settings())
+            _cache_created = True
+        return _cache
+
+def get_cache_generation() -> int:
+    """
+    MongoDB の sync_states に記録された検索結果のキャッシュの世代を取得する関数（_id による1回の検索）
+
+    Returns:
+        int: 世代（記録がない場合は 0）
+
+    Raises:
+        pymongo.errors.PyMongoError: MongoDB の操作に失敗した場合
+    """
+    state = MongoDB.getInstance().holoduledb.sync_states.find_one({"_id": CACHE_GENERATION_ID}, {"generation": 1})
+    return state.get("generation", 0) if state is not None else 0
+
+def invalidate_query_cache() -> None:
+    """
+    検索結果のキャッシュをすべて破棄する関数（ホロジュール情報・配信者情報の登録後に呼び出す）
+
+    同じプロセスのキャッシュを破棄して、MongoDB の sync_states に記録した世代を増やす。
+    別のプロセスのキャッシュは、次に検索したときに世代が変わったことを確認して破棄する。
+
+    Raises:
+        pymongo.errors.PyMongoError: MongoDB の操作に失敗した場合
+    """
+    with _cache_lock:
+        cache = _cache
+    if cache is not None:
+        cache.invalidate()
+    MongoDB.getInstance().holoduledb.sync_states.update_one({"_id": CACHE_GENERATION_ID}, {"$inc": {"generation": 1}}, upsert=True)
+
+def get_now() -> datetime:
+    """
+    現在の日時を返す関数（ホロジュールの配信日時と同じく、日本時間でタイムゾーンを持たない）
+
+    Returns:
+        datetime: 現在の日時
+    """
+    return datetime.now(tz=JST).replace(tzinfo=None)
+
+def build_streamer_stages(group: str | None = None, affiliation: str | None = None) -> list[dict]:
+    """
+    配信者情報を $lookup で結合して、グループ・所属で絞り込み、結果の項目を絞るステージを作る関数
+
+    Args:
+        group (str | None, optional): グループ（例 : hololive、None の場合は絞り込まない）
+        affiliation (str | None, optional): 所属（例 : gen0、None の場合は絞り込まない）
+
+    Returns:
+        list[dict]: 集計パイプラインのステージ
+    """
+    stages = [
+        # streamers の code には一意のインデックスがある
+        {"$lookup": {"from": "streamers", "localField": "code", "foreignField": "code", "as": "streamer"}},
+        {"$unwind": {"path": "$streamer", "preserveNullAndEmptyArrays": True}},
+    ]
+    streamer_filter = {}
+    if group is not None:
+        streamer_filter["streamer.group"] = group
+    if affiliation is not None:
+        streamer_filter["streamer.affiliations"] = affiliation
+    if len(streamer_filter) > 0:
+        stages.append({"$match": streamer_filter})
+    stages.append({
+        "$project": {
+            "_id": 0,
+            **{name: 1 for name in SCHEDULE_FIELDS},
+            **{name: f"$streamer.{name}" for name in STREAMER_FIELDS},
+        }
+    })
+    return stages
+
+def aggregate_schedules(pipeline: list[dict]) -> list[dict]:
+    """
+    スケジュールのコレクションで集計パイプラインを実行する関数
+
+    Args:
+        pipeline (list[dict]): 集計パイプライン
+
+    Returns:
+        list[dict]: 集計結果
+
+    Raises:
+        pymongo.errors.PyMongoError: MongoDB の操作に失敗した場合
+    """
+    try:
+        collection = MongoDB.getInstance().holoduledb.schedules
+        return list(collection.aggregate(pipeline))
+    except pymongo.errors.PyMongoError as e:
+        logger.error("スケジュールの検索に失敗しました。%s", e, exc_info=True)
+        raise
+
+def get_cached(key: tuple, load: Callable[[], list[dict]]) -> list[dict]:
+    """
+    キャッシュした検索結果があれば返して、なければ検索する関数
+
+    別のプロセスで登録した場合に前の結果を返さないように、返す前に MongoDB に記録された世代を確認する。
+    結果の辞書はキャッシュと共有するため、呼び出し側で変更しないこと。
+
+    Args:
+        key (tuple): 検索の種類と条件からなるキー
+        load (Callable[[], list[dict]]): 検索する関数
+
+    Returns:
+        list[dict]: 検索結果
+    """
+    cache = get_query_cache()
+    if cache is None:
+        return load()
+    try:
+        cache.sync_generation(get_cache_generation())
+    except pymongo.errors.PyMongoError as e:
+        logger.error("検索結果のキャッシュの世代の取得に失敗しました。%s", e, exc_info=True)
+        raise
+    return list(cache.get_or_load(key, load))
+
+def find_schedules_between(start: datetime, end: datetime, codes: list[str] | None = None, group: str | None = None, affiliation: str | None = None, limit: int = DEFAULT_LIMIT) -> list[dict]:
+    """
+    配信日時が範囲内のスケジュールを配信日時の順に MongoDB から取得する関数（キャッシュを使わない）
+
+    Args:
+        start (datetime): 配信日時の開始（この日時を含む）
+        end (datetime): 配信日時の終了（この日時を含まない）
+        codes (list[str] | None, optional): 配信者コード（None の場合は絞り込まない）
+        group (str | None, optional): グループ（None の場合は絞り込まない）
+        affiliation (str | None, optional): 所属（None の場合は絞り込まない）
+        limit (int, optional): 取得する件数の上限
+
+    Returns:
+        list[dict]: スケジュール（SCHEDULE_FIELDS と STREAMER_FIELDS の項目のみ）
+    """
+    query = {"streaming_at": {"$gte": start, "$lt": end}}
+    if codes is not None:
+        query["code"] = {"$in": codes}
+    pipeline = [
+        # streaming_at・code のインデックスで絞り込みと並べ替えを行う
+        {"$match": query},
+        {"$sort": {"streaming_at": pymongo.ASCENDING, "code": pymongo.ASCENDING}},
+    ]
+    # グループ・所属は結合した後に絞り込むため、その場合のみ上限を結合した後に適用する
+    if group is None and affiliation is None:
+        pipeline.append({"$limit": limit})
+        pipeline.extend(build_streamer_stages())
+    else:
+        pipeline.extend(build_streamer_stages(group, affiliation))
+        pipeline.append({"$limit": limit})
+    return aggregate_schedules(pipeline)
+
+def get_schedules_between(start: datetime, end: datetime, codes: list[str] | None = None, group: str | None = None, affiliation: str | None = None, limit: int = DEFAULT_LIMIT) -> list[dict]:
+    """
+    配信日時が範囲内のスケジュールを配信日時の順に取得する関数（キャッシュがあればキャッシュから返す）
+
+    Args:
+        start (datetime): 配信日時の開始（この日時を含む）
+        end (datetime): 配信日時の終了（この日時を含まない）
+        codes (list[str] | None, optional): 配信者コード（None の場合は絞り込まない）
+        group (str | None, optional): グループ（None の場合は絞り込まない）
+        affiliation (str | None, optional): 所属（None の場合は絞り込まない）
+        limit (int, optional): 取得する件数の上限
+
+    Returns:
+        list[dict]: スケジュール（SCHEDULE_FIELDS と STREAMER_FIELDS の項目のみ）
+    """
+    key = ("between", start, end, None if codes is None else tuple(sorted(codes)), group, affiliation, limit)
+    return get_cached(key, lambda: find_schedules_between(start, end, codes, group, affiliation, limit))
+
+def get_upcoming_schedules(codes: list[str] | None = None, group: str | None = None, affiliation: str | None = None, limit: int = DEFAULT_LIMIT, days: int = 7) -> list[dict]:
+    """
+    これから配信するスケジュールを配信日時の順に取得する関数（キャッシュがあればキャッシュから返す）
+
+    キャッシュした結果は有効期間内であれば再利用するため、その間に配信を開始したものを含む場合がある。
+
+    Args:
+        codes (list[str] | None, optional): 配信者コード（None の場合は絞り込まない）
+        group (str | None, optional): グループ（None の場合は絞り込まない）
+        affiliation (str | None, optional): 所属（None の場合は絞り込まない）
+        limit (int, optional): 取得する件数の上限
+        days (int, optional): 取得する日数
+
+    Returns:
+        list[dict]: スケジュール（SCHEDULE_FIELDS と STREAMER_FIELDS の項目のみ）
+    """
+    def load() -> list[dict]:
+        now = get_now()
+        return find_schedules_between(now, now + timedelta(days=days), codes, group, affiliation, limit)
+    key = ("upcoming", None if codes is None else tuple(sorted(codes)), group, affiliation, limit, days)
+    return get_cached(key, load)
+
+def get_latest_schedules(group: str | None = None, affiliation: str | None = None, days: int = 30) -> list[dict]:
+    """
+    配信者ごとに直近に配信した（配信を開始した）スケジュールを取得する関数（キャッシュがあればキャッシュから返す）
+
+    Args:
+        group (str | None, optional): グループ（None の場合は絞り込まない）
+        affiliation (str | None, optional): 所属（None の場合は絞り込まない）
+        days (int, optional): さかのぼる日数（この期間に配信のない配信者は含まない）
+
+    Returns:
+        list[dict]: 配信者コードの順のスケジュール（SCHEDULE_FIELDS と STREAMER_FIELDS の項目のみ）
+    """
+    def load() -> list[dict]:
+        now = get_now()
+        pipeline = [
+            # streaming_at・code のインデックスを逆順にたどり、配信者ごとに最初のものを残す
+            {"$match": {"streaming_at": {"$gte": now - timedelta(days=days), "$lte": now}}},
+            {"$sort": {"streaming_at": pymongo.DESCENDING, "code": pymongo.DESCENDING}},
+            {"$group": {"_id": "$code", **{name: {"$first": f"${name}"} for name in SCHEDULE_FIELDS}}},
+            {"$sort": {"code": pymongo.ASCENDING}},
+            *build_streamer_stages(group, affiliation),
+        ]
+        return aggregate_schedules(pipeline)
+    key = ("latest", group, affiliation, days)
+    return get_cached(key, load)
@@ -1,21 +1,99 @@
+import os
 import urllib.request
 from functools import lru_cache
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Any
+from dotenv import dotenv_values
+from pydantic.fields import FieldInfo
+from pydantic_settings import BaseSettings, PydanticBaseSettingsSource, SettingsConfigDict
 
-class MongoSettings(BaseSettings):
+@lru_cache
+def read_env_file(filepath: str) -> dict[str, str]:
+    """
+    .env ファイルを読み込む関数（設定クラスごとに読み込まないようにキャッシュする）
+
+    Args:
+        filepath (str): .env ファイルのパス
+
+    Returns:
+        dict[str, str]: 小文字にした変数名をキーとした値（ファイルがない場合は空）
+    """
+    if not os.path.isfile(filepath):
+        return {}
+    return {name.lower(): value for name, value in dotenv_values(filepath, encoding="utf-8").items() if value is not None}
+
+class EnvFileSettingsSource(PydanticBaseSettingsSource):
+    """
+    キャッシュした .env ファイルから設定値を取得するクラス（環境変数より優先度は低い）
+    """
+
+    def get_field_value(self, field: FieldInfo, field_name: str) -> tuple[Any, str, bool]:
+        """
+        項目の値を .env ファイルから取得する関数
+
+        Args:
+            field (FieldInfo): 項目の情報
+            field_name (str): 項目の名前
+
+        Returns:
+            tuple[Any, str, bool]: 値（ない場合は None）, 変数名, 複合型かどうか
+        """
+        env_name = (self.config.get("env_prefix", "") + field_name).lower()
+        return read_env_file(self.config.get("env_file") or ".env").get(env_name), env_name, False
+
+    def __call__(self) -> dict[str, Any]:
+        """
+        .env ファイルに値がある項目を取得する関数
+
+        Returns:
+            dict[str, Any]: 項目の名前をキーとした値
+        """
+        values = {}
+        for field_name, field in self.settings_cls.model_fields.items():
+            value, _, _ = self.get_field_value(field, field_name)
+            if value is not None:
+                values[field_name] = value
+        return values
+
+class EnvFileSettings(BaseSettings):
+    """
+    .env ファイルを1回だけ読み込んで共有する設定の基底クラス
+    """
+
+    @classmethod
+    def settings_customise_sources(
+        cls,
+        settings_cls: type[BaseSettings],
+        init_settings: PydanticBaseSettingsSource,
+        env_settings: PydanticBaseSettingsSource,
+        dotenv_settings: PydanticBaseSettingsSource,
+        file_secret_settings: PydanticBaseSettingsSource,
+    ) -> tuple[PydanticBaseSettingsSource, ...]:
+        """
+        設定値の取得元を指定する関数（.env ファイルの読み込みをキャッシュしたものに置き換える）
+
+        Returns:
+            tuple[PydanticBaseSettingsSource, ...]: 優先度の高い順の取得元
+        """
+        return (init_settings, env_settings, EnvFileSettingsSource(settings_cls), file_secret_settings)
+
+class MongoSettings(EnvFileSettings):
     """
     MongoDBの設定を管理するクラス
     
     Args:
         uri (str): MongoDBの接続URI
         database (str): 使用するデータベース名
+        save_mode (str): ホロジュール情報の保存方法（upsert : 変更のあったもののみ置き換え / replace : 削除して一括登録 / diff : 前回との差分のみを登録して変更イベントを出力）
+        ensure_indexes (bool): 起動時にインデックスを作成・確認するかどうか
         model_config (SettingsConfigDict): モデルの設定辞書
     """
     uri: str
     database: str
+    save_mode: str = "upsert"
+    ensure_indexes: bool = True
     model_config = SettingsConfigDict(env_file=".env", env_prefix='mongo_', extra="ignore")
 
-class YoutubeSettings(BaseSettings):
+class YoutubeSettings(EnvFileSettings):
     """
     YouTubeの設定を管理するクラス
 
@@ -24,23 +102,59 @@ class YoutubeSettings(BaseSettings):
         api_service_name (str): YouTube Data APIのサービス名
         api_version (str): YouTube Data APIのバージョン
         url_pattern (str): YouTubeのURLパターン
+        max_workers (int): 動画情報を並行して取得するスレッドの数
+        rate_per_second (float): 1秒あたりの API の呼び出し回数の上限（0 以下の場合は制限しない）
+        quota_budget (int): 1回の実行で消費できるクォータ（0 以下の場合は制限しない）
+        client (str): API のクライアント（rest : requests で videos.list のみを呼び出す / discovery : googleapiclient に同梱のディスカバリドキュメントを使う）
+        timeout (int): API の問い合わせのタイムアウト（秒、rest の場合のみ）
+        retry_max_attempts (int): 一時的なエラーの場合に呼び出し直す回数の上限（最初の呼び出しを含む）
+        retry_base_delay (float): 1回目に呼び出し直すまでの待ち時間の上限（秒、以降は倍に延ばす）
+        retry_max_delay (float): 呼び出し直すまでの待ち時間の上限（秒）
+        circuit_cooldown (int): クォータを使い切った場合に API の呼び出しを止める時間（秒）
+        checkpoint_path (str): 実行中に取得した動画情報を書き込むチェックポイントのファイルのパス（空の場合は書き込まない）
+        checkpoint_max_age (int): 中断した実行のチェックポイントを再開に使う期間（秒）
         model_config (SettingsConfigDict): モデルの設定辞書
     """
     api_key: str
     api_service_name: str
     api_version: str
     url_pattern: str
+    max_workers: int = 4
+    rate_per_second: float = 5.0
+    quota_budget: int = 1000
+    client: str = "rest"
+    timeout: int = 10
+    retry_max_attempts: int = 4
+    retry_base_delay: float = 1.0
+    retry_max_delay: float = 30.0
+    circuit_cooldown: int = 3600
+    checkpoint_path: str = "cache/enrich_checkpoint.jsonl"
+    checkpoint_max_age: int = 21600
     model_config = SettingsConfigDict(env_file=".env", env_prefix='youtube_', extra="ignore")
 
-class HoloduleSettings(BaseSettings):
+class HoloduleSettings(EnvFileSettings):
     """
     Holoduleの設定を管理するクラス
 
     Args:
         url (str): HoloduleのURL
+        urls (str): 取得するページの URL（カンマ区切り、#タブの id を付けるとそのタブ、空の場合は url の表示中のタブのみ）
+        fetch_mode (str): 取得方法（http : HTTP で取得して必要な場合のみ Selenium / selenium : 常に Selenium）
+        timeout (int): ページ取得のタイムアウト（秒）
+        parser (str): HTML のパーサ（lxml : XPath で1回の走査 / bs4 : BeautifulSoup の find_all）
+        browser_mode (str): Selenium のブラウザの設定（lean : 画像・メディア・フォント・外部のホストを読み込まず DOM の構築まで待つ / full : すべて読み込む）
+        browser_profile_dir (str): ブラウザのプロファイル（ディスクキャッシュ）を使い回すディレクトリ（空の場合は実行ごとに一時的なプロファイル）
+        block_max_age (int): 前回と変わらないブロック（日ごとのコンテナ）の解析・動画情報を再利用する期間（秒、0 の場合は再利用しない、lxml のみ）
         model_config (SettingsConfigDict): モデルの設定辞書
     """
     url: str
+    urls: str = ""
+    fetch_mode: str = "http"
+    timeout: int = 10
+    parser: str = "lxml"
+    browser_mode: str = "lean"
+    browser_profile_dir: str = "cache/chrome-profile"
+    block_max_age: int = 3600
     model_config = SettingsConfigDict(env_file=".env", env_prefix='holodule_', extra="ignore")
 
     async def check_holodule_url(self) -> bool:
@@ -68,6 +182,94 @@ class HoloduleSettings(BaseSettings):
         except Exception:
             return False
 
+class CacheSettings(EnvFileSettings):
+    """
+    動画情報キャッシュの設定を管理するクラス
+
+    Args:
+        backend (str): キャッシュの保存先（file / mongodb / none）
+        path (str): キャッシュファイルのパス（backend が file の場合）
+        ttl_upcoming (int): 配信予定・配信中の動画の有効期間（秒）
+        ttl_finished (int): 配信済み・公開済みの動画の有効期間（秒）
+        max_entries (int): キャッシュする動画の最大件数
+        model_config (SettingsConfigDict): モデルの設定辞書
+    """
+    backend: str = "file"
+    path: str = "cache/video_cache.json"
+    ttl_upcoming: int = 600
+    ttl_finished: int = 604800
+    max_entries: int = 5000
+    model_config = SettingsConfigDict(env_file=".env", env_prefix='cache_', extra="ignore")
+
+class PipelineSettings(EnvFileSettings):
+    """
+    パイプライン実行の設定を管理するクラス
+
+    Args:
+        enrich_workers (int): 動画情報の付与ワーカーの数
+        queue_size (int): 各段の間のキューの上限
+        batch_wait (float): 動画情報をまとめて問い合わせるために次のホロジュール情報を待つ時間（秒）
+        write_batch_size (int): MongoDB へ一度に登録する件数
+        model_config (SettingsConfigDict): モデルの設定辞書
+    """
+    enrich_workers: int = 4
+    queue_size: int = 200
+    batch_wait: float = 0.1
+    write_batch_size: int = 100
+    model_config = SettingsConfigDict(env_file=".env", env_prefix='pipeline_', extra="ignore")
+
+class MetricsSettings(EnvFileSettings):
+    """
+    実行ごとのメトリクスの出力の設定を管理するクラス
+
+    Args:
+        json_path (str): JSON の集計を出力するファイルのパス（空の場合は出力しない）
+        prometheus_path (str): Prometheus のテキスト形式で出力するファイルのパス（空の場合は出力しない）
+        model_config (SettingsConfigDict): モデルの設定辞書
+    """
+    json_path: str = "metrics/metrics.json"
+    prometheus_path: str = "metrics/holocollect.prom"
+    model_config = SettingsConfigDict(env_file=".env", env_prefix='metrics_', extra="ignore")
+
+class EventSettings(EnvFileSettings):
+    """
+    スケジュールの変更イベントの出力の設定を管理するクラス
+
+    Args:
+        path (str): 変更イベントを JSONL で追記するファイルのパス（空の場合は出力しない、MONGO_SAVE_MODE が diff の場合のみ）
+        model_config (SettingsConfigDict): モデルの設定辞書
+    """
+    path: str = "events/schedule_events.jsonl"
+    model_config = SettingsConfigDict(env_file=".env", env_prefix='events_', extra="ignore")
+
+class QuerySettings(EnvFileSettings):
+    """
+    登録済みのスケジュールの検索の設定を管理するクラス
+
+    Args:
+        cache_ttl (int): 検索結果をキャッシュする有効期間（秒、0 の場合はキャッシュしない）
+        cache_max_entries (int): キャッシュする検索結果の上限（0 の場合はキャッシュしない）
+        model_config (SettingsConfigDict): モデルの設定辞書
+    """
+    cache_ttl: int = 60
+    cache_max_entries: int = 256
+    model_config = SettingsConfigDict(env_file=".env", env_prefix='query_', extra="ignore")
+
+class LeaseSettings(EnvFileSettings):
+    """
+    複数のインスタンスで取得対象のタブを分担するリースの設定を管理するクラス
+
+    Args:
+        enabled (bool): リースで分担するかどうか（1つのインスタンスで実行する場合は不要）
+        ttl (int): リースの有効期間（秒、常駐する場合は実行間隔とサイクルの処理時間の合計より長くする）
+        owner (str): インスタンスを識別する名前（空の場合はホスト名とプロセスID）
+        model_config (SettingsConfigDict): モデルの設定辞書
+    """
+    enabled: bool = False
+    ttl: int = 900
+    owner: str = ""
+    model_config = SettingsConfigDict(env_file=".env", env_prefix='lease_', extra="ignore")
+
 @lru_cache
 def get_mongo_settings() -> MongoSettings:
     """
@@ -97,3 +299,63 @@ def get_holodule_settings() -> HoloduleSettings:
         HoloduleSettings: ホロジュールの設定
     """
     return HoloduleSettings()
+
+@lru_cache
+def get_cache_settings() -> CacheSettings:
+    """
+    キャッシュした動画情報キャッシュの設定を取得する関数
+
+    Returns:
+        CacheSettings: 動画情報キャッシュの設定
+    """
+    return CacheSettings()
+
+@lru_cache
+def get_pipeline_settings() -> PipelineSettings:
+    """
+    キャッシュしたパイプライン実行の設定を取得する関数
+
+    Returns:
+        PipelineSettings: パイプライン実行の設定
+    """
+    return PipelineSettings()
+
+@lru_cache
+def get_metrics_settings() -> MetricsSettings:
+    """
+    キャッシュしたメトリクスの出力の設定を取得する関数
+
+    Returns:
+        MetricsSettings: メトリクスの出力の設定
+    """
+    return MetricsSettings()
+
+@lru_cache
+def get_event_settings() -> EventSettings:
+    """
+    キャッシュしたスケジュールの変更イベントの出力の設定を取得する関数
+
+    Returns:
+        EventSettings: スケジュールの変更イベントの出力の設定
+    """
+    return EventSettings()
+
+@lru_cache
+def get_query_settings() -> QuerySettings:
+    """
+    キャッシュした登録済みのスケジュールの検索の設定を取得する関数
+
+    Returns:
+        QuerySettings: 登録済みのスケジュールの検索の設定
+    """
+    return QuerySettings()
+
+@lru_cache
+def get_lease_settings() -> LeaseSettings:
+    """
+    キャッシュしたリースの設定を取得する関数
+
+    Returns:
+        LeaseSettings: リースの設定
+    """
+    return LeaseSettings()
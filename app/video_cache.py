@@ -0,0 +1,301 @@
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+from logging import getLogger
+import pymongo
+from app.mongodb import MongoDB
+from app.settings import CacheSettings
+
+logger = getLogger(__name__)
+
+# 配信予定・配信中を表す liveBroadcastContent の値
+LIVE_BROADCAST_CONTENTS = ("upcoming", "live")
+# キャッシュする snippet のキー（動画情報の生成と有効期間の判定に使うもののみ）
+SNIPPET_KEYS = ("title", "description", "publishedAt", "channelId", "channelTitle", "tags", "liveBroadcastContent")
+
+class FileVideoCacheStore:
+    """
+    動画情報キャッシュをJSONファイルに保存するクラス
+    """
+
+    def __init__(self, filepath: str):
+        """
+        FileVideoCacheStoreクラスのコンストラクタ
+
+        Args:
+            filepath (str): キャッシュファイルのパス
+        """
+        self.__filepath = filepath
+
+    def load(self) -> list[dict]:
+        """
+        キャッシュエントリを読み込む関数
+
+        Returns:
+            list[dict]: キャッシュエントリのリスト（ファイルが存在しない・壊れている場合は空）
+        """
+        try:
+            with open(self.__filepath, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return []
+        except json.JSONDecodeError:
+            logger.warning("キャッシュファイルの形式が正しくないため破棄します。 : %s", self.__filepath)
+            return []
+
+    def save(self, entries: list[dict], updated_ids: list[str], removed_ids: list[str]) -> None:
+        """
+        キャッシュエントリを書き込む関数（全件を一時ファイルに書き込んでから置き換える）
+
+        Args:
+            entries (list[dict]): 保持しているすべてのキャッシュエントリ
+            updated_ids (list[str]): 更新した動画IDのリスト（全件を書き直すため未使用）
+            removed_ids (list[str]): 削除した動画IDのリスト（全件を書き直すため未使用）
+        """
+        dirpath = os.path.dirname(self.__filepath)
+        if dirpath != "":
+            os.makedirs(dirpath, exist_ok=True)
+        temppath = self.__filepath + ".tmp"
+        with open(temppath, "w", encoding="utf-8") as f:
+            json.dump(entries, f, ensure_ascii=False)
+        os.replace(temppath, self.__filepath)
+
+class MongoVideoCacheStore:
+    """
+    動画情報キャッシュを MongoDB のコレクションに保存するクラス
+    """
+
+    def __init__(self, max_entries: int):
+        """
+        MongoVideoCacheStoreクラスのコンストラクタ
+
+        Args:
+            max_entries (int): 読み込むキャッシュエントリの最大件数
+        """
+        self.__max_entries = max_entries
+
+    def load(self) -> list[dict]:
+        """
+        キャッシュエントリを読み込む関数（最近取得・延長したものから最大件数まで）
+
+        Returns:
+            list[dict]: キャッシュエントリのリスト（古い順）
+        """
+        collection = MongoDB.getInstance().holoduledb.video_cache
+        cursor = collection.find({}, {"_id": 0}).sort("accessed_at", pymongo.DESCENDING).limit(self.__max_entries)
+        return list(reversed(list(cursor)))
+
+    def save(self, entries: list[dict], updated_ids: list[str], removed_ids: list[str]) -> None:
+        """
+        更新・削除したキャッシュエントリのみを書き込む関数
+
+        Args:
+            entries (list[dict]): 保持しているすべてのキャッシュエントリ
+            updated_ids (list[str]): 更新した動画IDのリスト
+            removed_ids (list[str]): 削除した動画IDのリスト
+        """
+        collection = MongoDB.getInstance().holoduledb.video_cache
+        updated = set(updated_ids)
+        requests = [pymongo.ReplaceOne({"video_id": entry["video_id"]}, entry, upsert=True) for entry in entries if entry["video_id"] in updated]
+        if len(removed_ids) > 0:
+            requests.append(pymongo.DeleteMany({"video_id": {"$in": removed_ids}}))
+        if len(requests) > 0:
+            collection.bulk_write(requests, ordered=False)
+
+class VideoCache:
+    """
+    videos.list の検索結果を動画IDごとに保持するキャッシュクラス
+
+    配信予定・配信中の動画と配信済みの動画で有効期間を分け、
+    件数が上限を超えた場合は参照が古いものから破棄する。
+    参照の順はメモリ上でのみ更新し、保存先へは取得・有効期間の延長・破棄したエントリのみを書き込む
+    （参照のたびに書き込むと、変更がない実行でもキャッシュ全体・参照した件数分を書き込むことになるため）。
+    複数のスレッドから利用できるように各操作はロックで保護する。
+    """
+
+    def __init__(self, store: FileVideoCacheStore | MongoVideoCacheStore, ttl_upcoming: int, ttl_finished: int, max_entries: int):
+        """
+        VideoCacheクラスのコンストラクタ
+
+        Args:
+            store (FileVideoCacheStore | MongoVideoCacheStore): キャッシュの保存先
+            ttl_upcoming (int): 配信予定・配信中の動画の有効期間（秒）
+            ttl_finished (int): 配信済み・公開済みの動画の有効期間（秒）
+            max_entries (int): キャッシュする動画の最大件数
+        """
+        self.__store = store
+        self.__ttl_upcoming = ttl_upcoming
+        self.__ttl_finished = ttl_finished
+        self.__max_entries = max_entries
+        self.__entries: OrderedDict[str, dict] = OrderedDict()
+        self.__dirty_ids: set[str] = set()
+        self.__removed_ids: set[str] = set()
+        self.__lock = threading.RLock()
+        for entry in self.__store.load():
+            self.__entries[entry["video_id"]] = entry
+        self.__evict()
+
+    def __len__(self) -> int:
+        """
+        キャッシュしている動画の数を返す
+
+        Returns:
+            int: キャッシュしている動画の数
+        """
+        return len(self.__entries)
+
+    def __ttl(self, item: dict) -> int:
+        """
+        検索結果に応じた有効期間を返す関数
+
+        Args:
+            item (dict): videos.list の検索結果（items の要素）
+
+        Returns:
+            int: 有効期間（秒）
+        """
+        if item.get("snippet", {}).get("liveBroadcastContent") in LIVE_BROADCAST_CONTENTS:
+            return self.__ttl_upcoming
+        return self.__ttl_finished
+
+    def __evict(self) -> None:
+        """
+        最大件数を超えたキャッシュエントリを参照が古いものから破棄する関数
+        """
+        while len(self.__entries) > self.__max_entries:
+            video_id, _ = self.__entries.popitem(last=False)
+            self.__dirty_ids.discard(video_id)
+            self.__removed_ids.add(video_id)
+
+    def __touch(self, video_id: str) -> dict:
+        """
+        キャッシュエントリを最近参照したものとして扱う関数（メモリ上の順のみ更新し、保存先へは書き込まない）
+
+        Args:
+            video_id (str): 動画ID
+
+        Returns:
+            dict: キャッシュエントリ
+        """
+        self.__entries.move_to_end(video_id)
+        return self.__entries[video_id]
+
+    def get(self, video_id: str) -> dict | None:
+        """
+        有効期間内の検索結果を取得する関数
+
+        Args:
+            video_id (str): 動画ID
+
+        Returns:
+            dict | None: 検索結果（存在しない・有効期間切れの場合は None）
+        """
+        with self.__lock:
+            entry = self.__entries.get(video_id)
+            if entry is None or entry["expires_at"] <= time.time():
+                return None
+            return self.__touch(video_id)["item"]
+
+    def get_etag(self, video_id: str) -> str | None:
+        """
+        有効期間に関係なくキャッシュしている検索結果の ETag を取得する関数
+
+        Args:
+            video_id (str): 動画ID
+
+        Returns:
+            str | None: ETag（キャッシュしていない場合は None）
+        """
+        with self.__lock:
+            entry = self.__entries.get(video_id)
+            return entry["etag"] if entry is not None else None
+
+    def revalidate(self, item: dict) -> bool:
+        """
+        取得し直した検索結果の ETag がキャッシュと一致すれば有効期間を延長する関数
+
+        Args:
+            item (dict): videos.list の検索結果（items の要素）
+
+        Returns:
+            bool: ETag が一致して有効期間を延長したかどうか
+        """
+        with self.__lock:
+            video_id = item["id"]
+            if self.get_etag(video_id) != item.get("etag"):
+                return False
+            entry = self.__touch(video_id)
+            now = time.time()
+            entry["expires_at"] = now + self.__ttl(entry["item"])
+            entry["accessed_at"] = now
+            self.__dirty_ids.add(video_id)
+            return True
+
+    def put(self, item: dict) -> None:
+        """
+        検索結果をキャッシュする関数
+
+        Args:
+            item (dict): videos.list の検索結果（items の要素）
+        """
+        with self.__lock:
+            video_id = item["id"]
+            snippet = item.get("snippet", {})
+            now = time.time()
+            self.__entries[video_id] = {
+                "video_id": video_id,
+                "etag": item.get("etag"),
+                "item": {
+                    "id": video_id,
+                    "etag": item.get("etag"),
+                    "snippet": {key: snippet[key] for key in SNIPPET_KEYS if key in snippet},
+                },
+                "expires_at": now + self.__ttl(item),
+                "accessed_at": now,
+            }
+            self.__entries.move_to_end(video_id)
+            self.__dirty_ids.add(video_id)
+            self.__removed_ids.discard(video_id)
+            self.__evict()
+
+    def save(self) -> None:
+        """
+        変更したキャッシュエントリを保存先へ書き込む関数
+        """
+        with self.__lock:
+            if len(self.__dirty_ids) == 0 and len(self.__removed_ids) == 0:
+                return
+            try:
+                self.__store.save(list(self.__entries.values()), list(self.__dirty_ids), list(self.__removed_ids))
+                self.__dirty_ids.clear()
+                self.__removed_ids.clear()
+            except (OSError, pymongo.errors.PyMongoError) as e:
+                # キャッシュの保存に失敗しても収集は継続する
+                logger.warning("動画情報キャッシュの保存に失敗しました。%s", e, exc_info=True)
+
+def create_video_cache(settings: CacheSettings) -> VideoCache | None:
+    """
+    設定に応じた動画情報キャッシュを生成する関数
+
+    Args:
+        settings (CacheSettings): 動画情報キャッシュの設定
+
+    Returns:
+        VideoCache | None: 動画情報キャッシュ（backend が none の場合は None）
+
+    Raises:
+        ValueError: backend の指定が不正な場合
+    """
+    if settings.backend == "none":
+        return None
+    if settings.backend == "file":
+        store = FileVideoCacheStore(settings.path)
+    elif settings.backend == "mongodb":
+        store = MongoVideoCacheStore(settings.max_entries)
+    else:
+        raise ValueError(f"動画情報キャッシュの保存先が不正です。 : {settings.backend}")
+    cache = VideoCache(store, settings.ttl_upcoming, settings.ttl_finished, settings.max_entries)
+    logger.info("動画情報キャッシュを読み込みました。 : %s件（%s）", len(cache), settings.backend)
+    return cache
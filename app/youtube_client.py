@@ -0,0 +1,254 @@
+import json
+import threading
+from logging import getLogger
+from typing import TYPE_CHECKING
+from app.settings import YoutubeSettings
+from app.video_cache import SNIPPET_KEYS
+
+# requests・googleapiclient は読み込みに時間がかかるため、使う段になってから読み込む
+if TYPE_CHECKING:
+    import requests
+
+logger = getLogger(__name__)
+
+# YouTube Data API のクライアントの種類（rest : requests で videos.list のみを呼び出す / discovery : googleapiclient）
+YOUTUBE_CLIENTS = ("rest", "discovery")
+# YouTube Data API のエンドポイント（サービス名とバージョンを埋め込む）
+YOUTUBE_API_URL = "https://youtube.googleapis.com/{service_name}/{version}/videos"
+# videos.list で取得する項目（動画情報の生成と動画情報キャッシュに使うもののみ）
+VIDEOS_LIST_FIELDS = "items(id,etag,snippet({}))".format(",".join(SNIPPET_KEYS))
+# gzip で圧縮した応答を受け取るためのヘッダ（Google の API は User-Agent に gzip を含む場合のみ圧縮する）
+GZIP_HEADERS = {"Accept-Encoding": "gzip", "User-Agent": "holocollect (gzip)"}
+# 時間をおけば成功する見込みのある HTTP のステータスコード
+TRANSIENT_STATUSES = (429, 500, 502, 503, 504)
+# 時間をおけば成功する見込みのあるエラーの理由（403 の場合、短時間の呼び出し回数の超過）
+TRANSIENT_REASONS = ("rateLimitExceeded", "userRateLimitExceeded", "backendError")
+# 1日のクォータを使い切ったことを表すエラーの理由（403 の場合、日付が変わるまで成功しない）
+QUOTA_EXCEEDED_REASONS = ("quotaExceeded", "dailyLimitExceeded")
+
+class YoutubeApiError(Exception):
+    """
+    YouTube Data API がエラーを返した場合の例外クラス
+    """
+
+    def __init__(self, status: int, content: bytes | str):
+        """
+        YoutubeApiErrorクラスのコンストラクタ
+
+        Args:
+            status (int): HTTP のステータスコード
+            content (bytes | str): 応答の本文
+        """
+        super().__init__(f"HTTP エラー {status} が発生しました。{content}")
+        self.status = status
+        self.content = content
+
+    @property
+    def reason(self) -> str | None:
+        """
+        応答の本文からエラーの理由（error.errors[].reason）を返す
+
+        Returns:
+            str | None: エラーの理由（本文が JSON でない場合などは None）
+        """
+        try:
+            errors = json.loads(self.content).get("error", {}).get("errors", [])
+            return errors[0].get("reason") if len(errors) > 0 else None
+        except (ValueError, TypeError, AttributeError):
+            return None
+
+    @property
+    def is_quota_exceeded(self) -> bool:
+        """
+        1日のクォータを使い切ったことによるエラーかどうかを返す
+
+        Returns:
+            bool: クォータを使い切ったかどうか
+        """
+        return self.status == 403 and self.reason in QUOTA_EXCEEDED_REASONS
+
+    @property
+    def is_transient(self) -> bool:
+        """
+        時間をおいて呼び出し直せば成功する見込みのあるエラーかどうかを返す
+
+        Returns:
+            bool: 一時的なエラーかどうか
+        """
+        return self.status in TRANSIENT_STATUSES or (self.status == 403 and self.reason in TRANSIENT_REASONS)
+
+class RestYoutubeClient:
+    """
+    videos.list のみを requests で呼び出す YouTube Data API v3 の軽量なクライアントクラス
+
+    ディスカバリドキュメントを読み込まず、接続を使い回すセッションで gzip に圧縮した応答を受け取る。
+    fields で取得する項目を絞り込むため、応答には動画情報の生成に使う snippet のキーのみが含まれる。
+    （requests のセッションの接続プールはスレッドセーフなため、スレッド間で共有する）
+    """
+
+    def __init__(self, api_key: str, service_name: str, version: str, timeout: int, pool_maxsize: int):
+        """
+        RestYoutubeClientクラスのコンストラクタ
+
+        Args:
+            api_key (str): YouTube Data API の API キー
+            service_name (str): YouTube Data API のサービス名
+            version (str): YouTube Data API のバージョン
+            timeout (int): 問い合わせのタイムアウト（秒）
+            pool_maxsize (int): 使い回す接続の最大数（並行して問い合わせるスレッドの数）
+        """
+        self.__api_key = api_key
+        self.__url = YOUTUBE_API_URL.format(service_name=service_name, version=version)
+        self.__timeout = timeout
+        self.__pool_maxsize = max(pool_maxsize, 1)
+        self.__session = None
+        self.__lock = threading.Lock()
+
+    def __get_session(self) -> "requests.Session":
+        """
+        接続を使い回すセッションを取得する関数（最初に呼び出したときに生成する）
+
+        Returns:
+            requests.Session: セッション
+        """
+        with self.__lock:
+            if self.__session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=self.__pool_maxsize))
+                session.headers.update(GZIP_HEADERS)
+                self.__session = session
+            return self.__session
+
+    def list_videos(self, video_ids: list[str]) -> dict:
+        """
+        videos.list で動画情報を取得する関数
+
+        Args:
+            video_ids (list[str]): 動画IDのリスト（最大50件）
+
+        Returns:
+            dict: videos.list の応答（items の要素は id・etag・snippet のみ）
+
+        Raises:
+            YoutubeApiError: YouTube Data API がエラーを返した場合
+            requests.RequestException: HTTP の通信でエラーが発生した場合
+        """
+        response = self.__get_session().get(
+            self.__url,
+            params={
+                "key": self.__api_key,
+                # 結果として snippet のみを取得
+                "part": "snippet",
+                # 検索条件は id（カンマ区切りで複数指定）
+                "id": ",".join(video_ids),
+                # 指定した件数分を取得
+                "maxResults": len(video_ids),
+                # 使う項目のみを取得
+                "fields": VIDEOS_LIST_FIELDS,
+            },
+            timeout=self.__timeout,
+        )
+        if response.status_code != 200:
+            raise YoutubeApiError(response.status_code, response.content)
+        return response.json()
+
+    def close(self) -> None:
+        """
+        セッションを閉じる関数
+        """
+        with self.__lock:
+            if self.__session is not None:
+                self.__session.close()
+                self.__session = None
+
+class DiscoveryYoutubeClient:
+    """
+    googleapiclient で videos.list を呼び出す YouTube Data API v3 のクライアントクラス
+
+    ディスカバリドキュメントはダウンロードせず、googleapiclient に同梱されたものを読み込む。
+    （googleapiclient のクライアントはスレッドセーフではないため、スレッドごとに生成する）
+    """
+
+    def __init__(self, api_key: str, service_name: str, version: str):
+        """
+        DiscoveryYoutubeClientクラスのコンストラクタ
+
+        Args:
+            api_key (str): YouTube Data API の API キー
+            service_name (str): YouTube Data API のサービス名
+            version (str): YouTube Data API のバージョン
+        """
+        self.__api_key = api_key
+        self.__service_name = service_name
+        self.__version = version
+        self.__local = threading.local()
+
+    def __get_youtube(self):
+        """
+        実行中のスレッド用の googleapiclient のクライアントを取得する関数
+
+        Returns:
+            googleapiclient.discovery.Resource: YouTube Data API v3 のクライアント
+        """
+        youtube = getattr(self.__local, "youtube", None)
+        if youtube is None:
+            from googleapiclient.discovery import build
+            youtube = build(self.__service_name, self.__version, developerKey=self.__api_key, cache_discovery=False, static_discovery=True)
+            self.__local.youtube = youtube
+        return youtube
+
+    def list_videos(self, video_ids: list[str]) -> dict:
+        """
+        videos.list で動画情報を取得する関数
+
+        Args:
+            video_ids (list[str]): 動画IDのリスト（最大50件）
+
+        Returns:
+            dict: videos.list の応答（items の要素は id・etag・snippet のみ）
+
+        Raises:
+            YoutubeApiError: YouTube Data API がエラーを返した場合
+            ConnectionError: HTTP の通信でエラーが発生した場合（httplib2 の例外を requests と同じく OSError として扱う）
+        """
+        import httplib2
+        from googleapiclient.errors import HttpError
+        try:
+            return self.__get_youtube().videos().list(
+                part="snippet",
+                id=",".join(video_ids),
+                maxResults=len(video_ids),
+                fields=VIDEOS_LIST_FIELDS,
+            ).execute()
+        except HttpError as e:
+            raise YoutubeApiError(e.resp.status, e.content) from e
+        except httplib2.HttpLib2Error as e:
+            # 名前解決・接続の失敗など（OSError を継承しないため、呼び出し直せる通信エラーとして変換する）
+            raise ConnectionError(f"{type(e).__name__}: {e}") from e
+
+    def close(self) -> None:
+        """
+        クライアントを閉じる関数（スレッドごとのクライアントは各スレッドの終了時に破棄される）
+        """
+        self.__local = threading.local()
+
+def create_youtube_client(settings: YoutubeSettings) -> RestYoutubeClient | DiscoveryYoutubeClient:
+    """
+    設定に応じた YouTube Data API v3 のクライアントを生成する関数
+
+    Args:
+        settings (YoutubeSettings): YouTube の設定
+
+    Returns:
+        RestYoutubeClient | DiscoveryYoutubeClient: クライアント
+
+    Raises:
+        ValueError: client の指定が不正な場合
+    """
+    if settings.client == "rest":
+        return RestYoutubeClient(settings.api_key, settings.api_service_name, settings.api_version, settings.timeout, settings.max_workers)
+    if settings.client == "discovery":
+        return DiscoveryYoutubeClient(settings.api_key, settings.api_service_name, settings.api_version)
+    raise ValueError(f"YouTube Data API のクライアントの指定が不正です。 : {settings.client}")
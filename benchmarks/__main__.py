@@ -0,0 +1,322 @@
+import os
+import sys
+import gc
+import json
+import time
+import platform
+import gzip
+import argparse
+import subprocess
+import tracemalloc
+from collections.abc import Callable
+from datetime import date, datetime
+
+# ネットワークと .env がなくても動くように、必須の設定と制限を解除する設定を既定値として与える（環境変数で上書き可能）
+BENCHMARK_ENVIRONMENT = {
+    "MONGO_URI": "mongodb://127.0.0.1:27017/holoduledb",
+    "MONGO_DATABASE": "holoduledb",
+    "YOUTUBE_API_KEY": "benchmark",
+    "YOUTUBE_API_SERVICE_NAME": "youtube",
+    "YOUTUBE_API_VERSION": "v3",
+    "YOUTUBE_URL_PATTERN": r"https://www\.youtube\.com/watch",
+    "YOUTUBE_RATE_PER_SECOND": "0",
+    "YOUTUBE_QUOTA_BUDGET": "0",
+    "HOLODULE_URL": "http://127.0.0.1/",
+    "CACHE_BACKEND": "none",
+    "MONGO_ENSURE_INDEXES": "false",
+}
+for name, value in BENCHMARK_ENVIRONMENT.items():
+    os.environ.setdefault(name, value)
+
+import app.collector as collector_module
+from app.collector import Collector
+from app.mongodb import MongoDB
+from app.parser import SCHEDULE_PARSERS, create_schedule_parser, get_block_fingerprint
+from app.settings import get_youtube_settings
+from app.models.schedule import ScheduleModel
+from app.models.schedule_record import ScheduleRecord
+from app.models.schedules import SAVE_MODES, ScheduleCollection
+from app.models.streamers import StreamerCollection
+from benchmarks.holodule_page import generate_holodule_html
+from benchmarks.stand_ins import LocalMongoClient, create_canned_youtube, create_videos_list_response
+
+# 既定のサムネイルの数
+DEFAULT_SIZES = (100, 1000, 5000, 20000)
+# 結果を保存するディレクトリ
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+# 読み込み時間を計測するモジュール（CLI の起動時と、CSV の出力などの短い処理で読み込まれるもの）
+IMPORT_MODULES = ("app.__main__", "app.collector")
+# 読み込み時間の既定の上限（ミリ秒）
+DEFAULT_IMPORT_BUDGET_MS = 500
+
+def get_commit() -> str:
+    """
+    現在のコミットの短いハッシュ値を取得する関数（作業ツリーに変更がある場合は -dirty を付ける）
+
+    Returns:
+        str: コミットのハッシュ値（取得できない場合は unknown）
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return commit + ("-dirty" if status.strip() != "" else "")
+
+def measure(function: Callable[[], object], repeat: int, setup: Callable[[], None] | None = None) -> dict:
+    """
+    処理を繰り返し実行して、最小・平均の処理時間とピークメモリ・保持しているメモリとブロック数を計測する関数
+
+    処理時間は tracemalloc を止めた状態で計測し、メモリは別に1回実行して計測する。
+    保持しているメモリとブロック数は、処理の戻り値を保持したままの増分（生成したオブジェクトの量の目安）とする。
+
+    Args:
+        function (Callable[[], object]): 計測する処理
+        repeat (int): 繰り返し回数
+        setup (Callable[[], None] | None, optional): 毎回の実行前に行う準備（計測に含めない）
+
+    Returns:
+        dict: 計測結果（min_seconds, mean_seconds, peak_bytes, retained_bytes, retained_blocks）
+    """
+    elapsed = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        gc.collect()
+        started_at = time.perf_counter()
+        function()
+        elapsed.append(time.perf_counter() - started_at)
+
+    if setup is not None:
+        setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        blocks_before = sys.getallocatedblocks()
+        value = function()
+        retained_blocks = sys.getallocatedblocks() - blocks_before
+        retained_bytes, peak_bytes = tracemalloc.get_traced_memory()
+        del value
+    finally:
+        tracemalloc.stop()
+    return {
+        "min_seconds": min(elapsed),
+        "mean_seconds": sum(elapsed) / len(elapsed),
+        "peak_bytes": peak_bytes,
+        "retained_bytes": retained_bytes,
+        "retained_blocks": retained_blocks,
+    }
+
+def measure_import_time(module: str, repeat: int) -> dict:
+    """
+    新しいプロセスで -X importtime を指定してモジュールを読み込み、累積の読み込み時間を計測する関数
+
+    Args:
+        module (str): 読み込むモジュールの名前
+        repeat (int): 繰り返し回数（最小の時間を採用する）
+
+    Returns:
+        dict: 計測結果（module, min_ms, slowest: 直接読み込んだモジュールのうち時間がかかった上位5件の累積時間（ミリ秒））
+    """
+    best = None
+    for _ in range(repeat):
+        completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, check=True)
+        # 各行は "import time: 自身の時間 | 累積の時間 | モジュール名" で、読み込んだモジュールが先に出力される（単位はマイクロ秒）
+        # モジュール名の前の空白の数が深さを表すため、対象のモジュールの直前にある1段深い行を直接読み込んだモジュールとする
+        children = {}
+        for line in completed.stderr.splitlines():
+            columns = line.split("|")
+            if len(columns) != 3 or not columns[1].strip().isdigit():
+                continue
+            depth = (len(columns[2]) - len(columns[2].lstrip()) - 1) // 2
+            name = columns[2].strip()
+            ms = int(columns[1]) / 1000
+            if depth == 0 and name != module:
+                children = {}
+            elif depth == 1:
+                children[name] = ms
+            elif name == module:
+                if best is None or ms < best["min_ms"]:
+                    slowest = sorted(children.items(), key=lambda item: item[1], reverse=True)[:5]
+                    best = {"module": module, "min_ms": ms, "slowest": dict(slowest)}
+                break
+    return best
+
+def measure_response_size(count: int) -> dict:
+    """
+    videos.list の応答の大きさを、すべての項目・fields で絞り込んだ項目のそれぞれで gzip の圧縮の有無ごとに計算する関数
+
+    Args:
+        count (int): 1回の問い合わせの動画IDの数
+
+    Returns:
+        dict: 応答の大きさ（バイト）
+    """
+    video_ids = [f"bench{number:06d}" for number in range(count)]
+    sizes = {}
+    for name, fields in (("full", False), ("fields", True)):
+        body = json.dumps(create_videos_list_response(video_ids, fields), ensure_ascii=False).encode("utf-8")
+        sizes[name] = len(body)
+        sizes[f"{name}_gzip"] = len(gzip.compress(body))
+    return sizes
+
+def run_size(size: int, parsers: list[str], repeat: int, per_day: int) -> list[dict]:
+    """
+    指定したサムネイルの数のページで各段を計測する関数
+
+    Args:
+        size (int): サムネイルの数
+        parsers (list[str]): 計測するパーサの名前のリスト
+        repeat (int): 繰り返し回数
+        per_day (int): 1日あたりのサムネイルの数
+
+    Returns:
+        list[dict]: 段ごとの計測結果
+    """
+    streamers = StreamerCollection()
+    html = generate_holodule_html(size, list(StreamerCollection.streamers), per_day)
+    url_pattern = get_youtube_settings().url_pattern
+    results = []
+
+    def add_result(stage: str, items: int, result: dict) -> None:
+        result.update({"size": size, "stage": stage, "items": items, "items_per_second": items / result["min_seconds"] if result["min_seconds"] > 0 else 0.0})
+        results.append(result)
+        print(
+            f"{size:>6} {stage:<24} {items:>6}件 最小 {result['min_seconds'] * 1000:>9.1f}ms {result['items_per_second']:>11.0f}件/秒"
+            f" ピーク {result['peak_bytes'] / 1024 / 1024:>7.1f}MB 保持 {result['retained_bytes'] / 1024 / 1024:>7.1f}MB {result['retained_blocks']:>8}ブロック"
+        )
+
+    # 解析（パーサごと）
+    schedules = None
+    for name in parsers:
+        schedule_parser = create_schedule_parser(name, streamers, url_pattern)
+        schedules = schedule_parser.parse(html)
+        add_result(f"parse[{name}]", len(schedules), measure(lambda: schedule_parser.parse(html), repeat))
+
+    # 前回と変わらないページの確認（ブロックに分けて指紋を求めるのみ、解析・付与・登録は行わない）
+    if "lxml" in parsers:
+        block_parser = create_schedule_parser("lxml", streamers, url_pattern)
+        today = date.today()
+        add_result("fingerprint[lxml]", len(schedules), measure(lambda: [get_block_fingerprint(block, None, today) for block in block_parser.iter_blocks(html)], repeat))
+
+    # 動画情報の付与（videos.list の応答は雛形から生成）
+    collector = Collector()
+    add_result("enrich", len(schedules), measure(lambda: collector.set_video_infos(schedules), repeat))
+    collector.close()
+
+    # ホロジュール情報の生成（検証あり・検証なし・軽量なレコード）
+    records = [ScheduleRecord.from_model(schedule) for schedule in schedules]
+    add_result("build[validate]", len(records), measure(lambda: [ScheduleModel(**record.to_document()) for record in records], repeat))
+    add_result("build[model_construct]", len(records), measure(lambda: [ScheduleModel.model_construct(**record.to_document()) for record in records], repeat))
+    add_result("build[record]", len(records), measure(lambda: [ScheduleRecord(*record) for record in records], repeat))
+
+    # 同じスナップショットの統合（索引で重複を判定する）
+    add_result("merge", len(schedules), measure(lambda: ScheduleCollection(schedules=list(schedules)).merge(schedules), repeat))
+
+    # ドキュメントへの変換
+    add_result("model_dump", len(schedules), measure(lambda: [schedule.model_dump(by_alias=True, exclude=["id"]) for schedule in schedules], repeat))
+    add_result("to_document[record]", len(records), measure(lambda: [record.to_document() for record in records], repeat))
+
+    # MongoDB への登録（保存方法ごとに空のデータベースへ登録、upsert は登録済みで変更なしの場合も計測）
+    def reset_database() -> None:
+        MongoDB._instance = LocalMongoClient()
+
+    def fill_database() -> None:
+        reset_database()
+        schedules.save_to_mongodb("upsert")
+
+    for mode in SAVE_MODES:
+        add_result(f"save[{mode}]", len(schedules), measure(lambda: schedules.save_to_mongodb(mode), repeat, reset_database))
+    add_result("save[upsert,unchanged]", len(schedules), measure(lambda: schedules.save_to_mongodb("upsert"), repeat, fill_database))
+    add_result("save[records,upsert]", len(records), measure(lambda: ScheduleCollection.save_records_to_mongodb(records, "upsert"), repeat, reset_database))
+    return results
+
+def compare_results(results: list[dict], baseline: dict) -> None:
+    """
+    比較対象の結果に対する処理時間の比を表示する関数
+
+    Args:
+        results (list[dict]): 今回の計測結果
+        baseline (dict): 比較対象の保存した結果
+    """
+    baseline_results = {(result["size"], result["stage"]): result for result in baseline["results"]}
+    print(f"\n比較対象 : {baseline['commit']}（{baseline['created_at']}）")
+    for result in results:
+        base = baseline_results.get((result["size"], result["stage"]))
+        if base is None or base["min_seconds"] == 0:
+            continue
+        ratio = result["min_seconds"] / base["min_seconds"]
+        print(f"{result['size']:>6} {result['stage']:<24} {base['min_seconds'] * 1000:>9.1f}ms -> {result['min_seconds'] * 1000:>9.1f}ms（x{ratio:.2f}）")
+
+def main() -> int:
+    """
+    ネットワークを使わずに、解析・動画情報の付与・ドキュメントへの変換・登録の各段を計測する関数
+
+    Returns:
+        int: 終了コード
+    """
+    parser = argparse.ArgumentParser(description="合成したホロジュールのページで各段の処理時間とピークメモリを計測")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="サムネイルの数（複数指定可）")
+    parser.add_argument("--parsers", nargs="+", choices=list(SCHEDULE_PARSERS), default=list(SCHEDULE_PARSERS), help="計測するパーサ")
+    parser.add_argument("--repeat", type=int, default=3, help="計測の繰り返し回数")
+    parser.add_argument("--per-day", type=int, default=50, help="1日あたりのサムネイルの数")
+    parser.add_argument("--compare", help="比較するコミットのハッシュ値（results に保存した結果と比較）")
+    parser.add_argument("--no-save", action="store_true", help="結果を保存しない")
+    parser.add_argument("--import-budget", type=float, default=DEFAULT_IMPORT_BUDGET_MS, help="CLI のモジュールの読み込み時間の上限（ミリ秒、超えた場合は終了コード 1）")
+    args = parser.parse_args()
+
+    # YouTube と MongoDB はネットワークを使わない代わりのものに差し替える
+    collector_module.create_youtube_client = create_canned_youtube
+    MongoDB._instance = LocalMongoClient()
+
+    commit = get_commit()
+    print(f"コミット : {commit} / Python {platform.python_version()}")
+
+    # モジュールの読み込み時間（重いライブラリを使う段になってから読み込んでいるかの確認）
+    import_times = [measure_import_time(module, args.repeat) for module in IMPORT_MODULES]
+    for import_time in import_times:
+        import_time["budget_ms"] = args.import_budget
+        print(f"読み込み時間 : {import_time['module']} {import_time['min_ms']:.1f}ms（上限 {args.import_budget:.0f}ms）")
+        for name, ms in import_time["slowest"].items():
+            print(f"    {name:<40} {ms:>7.1f}ms")
+
+    # videos.list の応答の大きさ（1回の問い合わせの最大件数）
+    response_sizes = measure_response_size(collector_module.VIDEOS_LIST_MAX_RESULTS)
+    print("videos.list の応答 : " + " / ".join(f"{name} {size / 1024:.1f}KB" for name, size in response_sizes.items()))
+
+    results = []
+    for size in args.sizes:
+        results.extend(run_size(size, args.parsers, args.repeat, args.per_day))
+
+    report = {
+        "commit": commit,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "import_times": import_times,
+        "response_sizes": response_sizes,
+        "results": results,
+    }
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        filepath = os.path.join(RESULTS_DIR, f"{commit}.json")
+        with open(filepath, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"結果を保存しました。 : {filepath}")
+
+    if args.compare is not None:
+        filepath = os.path.join(RESULTS_DIR, f"{args.compare}.json")
+        if not os.path.exists(filepath):
+            print(f"比較対象の結果がありません。 : {filepath}")
+            return 1
+        with open(filepath, "r", encoding="utf-8") as f:
+            compare_results(results, json.load(f))
+
+    over_budget = [import_time for import_time in import_times if import_time["min_ms"] > args.import_budget]
+    for import_time in over_budget:
+        print(f"読み込み時間が上限を超えています。 : {import_time['module']} {import_time['min_ms']:.1f}ms > {args.import_budget:.0f}ms")
+    return 1 if len(over_budget) > 0 else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
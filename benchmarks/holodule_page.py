@@ -0,0 +1,60 @@
+import math
+from datetime import date, timedelta
+from html import escape
+
+# 日付の起点（2/29 と年またぎを含まないように 3/1 から 250 日の範囲で繰り返す）
+FIRST_DAY = (3, 1)
+DAY_CYCLE = 250
+
+def generate_holodule_html(thumbnails: int, names: list[str], per_day: int = 50, unknown_every: int = 20, video_id_prefix: str = "bench") -> str:
+    """
+    ホロジュールと同じ構成の HTML を生成する関数（表示中のタブに日付ごとのコンテナを並べる）
+
+    Args:
+        thumbnails (int): YouTube のサムネイルの数
+        names (list[str]): 配信者の名前のリスト（順に割り当てる）
+        per_day (int, optional): 1日（コンテナ）あたりのサムネイルの数
+        unknown_every (int, optional): 配信者が不明なサムネイルを入れる間隔（0 の場合は入れない）
+        video_id_prefix (str, optional): 動画IDの接頭辞（11文字になるように連番で埋める）
+
+    Returns:
+        str: ページソース
+    """
+    start = date(date.today().year, *FIRST_DAY)
+    lines = [
+        '<!DOCTYPE html>',
+        '<html lang="ja"><head><meta charset="utf-8"><title>ホロジュール</title></head><body>',
+        '<div class="holodule" style="margin-top:10px;">',
+        '<div class="tab-content">',
+        '<div class="tab-pane show active" id="all">',
+    ]
+    number = 0
+    for day in range(math.ceil(thumbnails / per_day)):
+        current = start + timedelta(days=day % DAY_CYCLE)
+        lines.append('<div class="container">')
+        lines.append('<div class="row"><div class="col-12"><div class="holodule navbar-text" style="margin:0 auto;">')
+        lines.append(f"&nbsp;&nbsp;&nbsp;&nbsp;{current.month:02d}/{current.day:02d}&nbsp;(木)")
+        lines.append('</div></div></div>')
+        lines.append('<div class="row">')
+        for _ in range(min(per_day, thumbnails - number)):
+            number += 1
+            if unknown_every > 0 and number % unknown_every == 0:
+                name = "不明な配信者"
+            else:
+                name = names[number % len(names)]
+            video_id = f"{video_id_prefix}{number:0{11 - len(video_id_prefix)}d}"
+            lines.append('<div class="col-6 col-sm-6 col-md-4 col-lg-3 col-xl-2">')
+            lines.append(f'<a href="https://www.youtube.com/watch?v={video_id}" class="thumbnail" target="_blank" style="border-style: solid;">')
+            lines.append('<div class="container"><div class="row no-gutters">')
+            lines.append(f'<div class="col-4 col-sm-4 col-md-4 text-left datetime">\n{number % 24:02d}:{number % 12 * 5:02d}\n</div>')
+            lines.append(f'<div class="col text-right name">\n{escape(name)}\n</div>')
+            lines.append('</div></div>')
+            lines.append(f'<img src="https://img.youtube.com/vi/{video_id}/mqdefault.jpg" style="border-radius:8px;">')
+            lines.append('</a></div>')
+        # YouTube 以外のリンク（解析でスキップされる）
+        lines.append('<div class="col-6"><a href="https://twitter.com/hololivetv" class="thumbnail"></a></div>')
+        lines.append('</div></div>')
+    lines.append('</div>')
+    lines.append('<div class="tab-pane" id="en"><div class="container"><a class="thumbnail" href="https://www.youtube.com/watch?v=notselected"></a></div></div>')
+    lines.append('</div></div></body></html>')
+    return "\n".join(lines)
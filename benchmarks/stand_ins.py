@@ -0,0 +1,323 @@
+import copy
+from itertools import count
+from pymongo import ReplaceOne
+from pymongo.results import BulkWriteResult, DeleteResult, InsertManyResult
+from app.video_cache import SNIPPET_KEYS
+
+# videos.list の items の要素の雛形（id と etag は問い合わせた動画IDで置き換える）
+VIDEOS_LIST_ITEM = {
+    "kind": "youtube#video",
+    "etag": "",
+    "id": "",
+    "snippet": {
+        "publishedAt": "2024-01-01T12:00:00Z",
+        "channelId": "UCp6993wxpyDPHUpavwDFqgg",
+        "title": "【ベンチマーク】ホロジュールの配信のタイトル【ホロライブ】",
+        "description": "配信の説明です。\n" * 40,
+        "thumbnails": {
+            "default": {"url": "https://i.ytimg.com/vi/x/default.jpg", "width": 120, "height": 90},
+            "medium": {"url": "https://i.ytimg.com/vi/x/mqdefault.jpg", "width": 320, "height": 180},
+            "high": {"url": "https://i.ytimg.com/vi/x/hqdefault.jpg", "width": 480, "height": 360},
+        },
+        "channelTitle": "SoraCh. ときのそらチャンネル",
+        "tags": ["ホロライブ", "hololive", "ベンチマーク"],
+        "categoryId": "20",
+        "liveBroadcastContent": "upcoming",
+        "localized": {"title": "【ベンチマーク】ホロジュールの配信のタイトル【ホロライブ】", "description": "配信の説明です。"},
+    },
+}
+
+def create_videos_list_response(video_ids: list[str], fields: bool = True) -> dict:
+    """
+    雛形から videos.list の応答を生成する関数
+
+    Args:
+        video_ids (list[str]): 問い合わせた動画IDのリスト
+        fields (bool, optional): fields で項目を絞り込んだ応答とするかどうか（False の場合はすべての項目）
+
+    Returns:
+        dict: videos.list の応答
+    """
+    items = []
+    for video_id in video_ids:
+        item = copy.deepcopy(VIDEOS_LIST_ITEM)
+        item["id"] = video_id
+        item["etag"] = f"etag-{video_id}"
+        if fields:
+            item = {"id": item["id"], "etag": item["etag"], "snippet": {key: item["snippet"][key] for key in SNIPPET_KEYS if key in item["snippet"]}}
+        items.append(item)
+    if fields:
+        return {"items": items}
+    return {"kind": "youtube#videoListResponse", "etag": "etag-list", "items": items, "pageInfo": {"totalResults": len(items), "resultsPerPage": len(items)}}
+
+class CannedYoutube:
+    """
+    YouTube Data API v3 のクライアントの代わりに、ネットワークを使わずに videos.list の応答を返すクラス
+    """
+
+    def __init__(self):
+        """
+        CannedYoutubeクラスのコンストラクタ
+        """
+        self.calls = 0
+
+    def list_videos(self, video_ids: list[str]) -> dict:
+        """
+        videos.list の応答を返す関数（fields で項目を絞り込んだ応答）
+
+        Args:
+            video_ids (list[str]): 動画IDのリスト
+
+        Returns:
+            dict: videos.list の応答
+        """
+        self.calls += 1
+        return create_videos_list_response(video_ids)
+
+    def close(self) -> None:
+        """
+        クライアントを閉じる関数（何もしない）
+        """
+
+def create_canned_youtube(*args, **kwargs) -> CannedYoutube:
+    """
+    app.collector.create_youtube_client の代わりに CannedYoutube を生成する関数
+
+    Returns:
+        CannedYoutube: YouTube Data API v3 のクライアントの代わり
+    """
+    return CannedYoutube()
+
+def normalize_query(query: dict | None) -> dict:
+    """
+    検索条件の $in のリストを集合に変換する関数（一致の判定を件数に比例させないため）
+
+    Args:
+        query (dict | None): 検索条件
+
+    Returns:
+        dict: 変換した検索条件
+    """
+    normalized = {}
+    for field, condition in (query or {}).items():
+        if isinstance(condition, dict) and "$in" in condition:
+            condition = {"$in": set(condition["$in"])}
+        normalized[field] = condition
+    return normalized
+
+def matches(document: dict, query: dict) -> bool:
+    """
+    ドキュメントが検索条件に一致するかどうかを判定する関数（等価と $in のみ対応）
+
+    Args:
+        document (dict): ドキュメント
+        query (dict): 検索条件
+
+    Returns:
+        bool: 一致するかどうか
+    """
+    for field, condition in query.items():
+        value = document.get(field)
+        if isinstance(condition, dict) and "$in" in condition:
+            if value not in condition["$in"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+class LocalCollection:
+    """
+    ホロコレクトが使う MongoDB のコレクションの操作をメモリ上で行うクラス（video_id で索引する）
+    """
+
+    def __init__(self):
+        """
+        LocalCollectionクラスのコンストラクタ
+        """
+        self.__documents: dict[int, dict] = {}
+        self.__video_id_index: dict[str, set[int]] = {}
+        self.__ids = count(1)
+
+    def __candidates(self, query: dict) -> list[int]:
+        """
+        検索条件に一致する可能性のあるドキュメントの _id を返す関数（video_id の索引を使う）
+
+        Args:
+            query (dict): 検索条件
+
+        Returns:
+            list[int]: _id のリスト
+        """
+        condition = query.get("video_id")
+        if isinstance(condition, str):
+            return list(self.__video_id_index.get(condition, ()))
+        if isinstance(condition, dict) and "$in" in condition:
+            return [document_id for video_id in condition["$in"] for document_id in self.__video_id_index.get(video_id, ())]
+        return list(self.__documents)
+
+    def __insert(self, document: dict) -> int:
+        """
+        ドキュメントを追加する関数
+
+        Args:
+            document (dict): ドキュメント
+
+        Returns:
+            int: 追加したドキュメントの _id
+        """
+        document_id = next(self.__ids)
+        self.__documents[document_id] = {**document, "_id": document_id}
+        if document.get("video_id") is not None:
+            self.__video_id_index.setdefault(document["video_id"], set()).add(document_id)
+        return document_id
+
+    def __delete(self, document_id: int) -> None:
+        """
+        ドキュメントを削除する関数
+
+        Args:
+            document_id (int): 削除するドキュメントの _id
+        """
+        document = self.__documents.pop(document_id)
+        if document.get("video_id") is not None:
+            self.__video_id_index[document["video_id"]].discard(document_id)
+
+    def find(self, query: dict | None = None, projection: dict | None = None) -> list[dict]:
+        """
+        検索条件に一致するドキュメントを返す関数
+
+        Args:
+            query (dict | None, optional): 検索条件
+            projection (dict | None, optional): 取得するフィールド（1 を指定したもののみ）
+
+        Returns:
+            list[dict]: ドキュメントのリスト
+        """
+        query = normalize_query(query)
+        documents = [self.__documents[document_id] for document_id in self.__candidates(query) if matches(self.__documents[document_id], query)]
+        if projection is None:
+            return [dict(document) for document in documents]
+        fields = [field for field, value in projection.items() if value]
+        return [{field: document[field] for field in fields if field in document} for document in documents]
+
+    def count_documents(self, query: dict) -> int:
+        """
+        検索条件に一致するドキュメントの数を返す関数
+
+        Args:
+            query (dict): 検索条件
+
+        Returns:
+            int: ドキュメントの数
+        """
+        return len(self.find(query, {"_id": 1}))
+
+    def insert_many(self, documents: list[dict]) -> InsertManyResult:
+        """
+        ドキュメントをまとめて追加する関数
+
+        Args:
+            documents (list[dict]): ドキュメントのリスト
+
+        Returns:
+            InsertManyResult: 追加結果
+        """
+        return InsertManyResult([self.__insert(document) for document in documents], True)
+
+    def delete_many(self, query: dict) -> DeleteResult:
+        """
+        検索条件に一致するドキュメントをまとめて削除する関数
+
+        Args:
+            query (dict): 検索条件
+
+        Returns:
+            DeleteResult: 削除結果
+        """
+        query = normalize_query(query)
+        document_ids = [document_id for document_id in self.__candidates(query) if matches(self.__documents[document_id], query)]
+        for document_id in document_ids:
+            self.__delete(document_id)
+        return DeleteResult({"n": len(document_ids)}, True)
+
+    def bulk_write(self, requests: list[ReplaceOne], ordered: bool = True) -> BulkWriteResult:
+        """
+        ReplaceOne をまとめて実行する関数
+
+        Args:
+            requests (list[ReplaceOne]): 置き換えのリスト
+            ordered (bool, optional): 順に実行するかどうか（メモリ上では常に順に実行する）
+
+        Returns:
+            BulkWriteResult: 実行結果
+        """
+        result = {"nInserted": 0, "nUpserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0, "upserted": []}
+        for index, request in enumerate(requests):
+            query, replacement, upsert = request._filter, request._doc, request._upsert
+            document_ids = [document_id for document_id in self.__candidates(query) if matches(self.__documents[document_id], query)]
+            if len(document_ids) > 0:
+                document_id = document_ids[0]
+                result["nMatched"] += 1
+                if {key: value for key, value in self.__documents[document_id].items() if key != "_id"} != replacement:
+                    self.__delete(document_id)
+                    self.__insert(replacement)
+                    result["nModified"] += 1
+            elif upsert:
+                result["upserted"].append({"index": index, "_id": self.__insert(replacement)})
+                result["nUpserted"] += 1
+        return BulkWriteResult(result, True)
+
+class LocalDatabase:
+    """
+    コレクションを名前で取り出せるメモリ上のデータベースクラス
+    """
+
+    def __init__(self):
+        """
+        LocalDatabaseクラスのコンストラクタ
+        """
+        self.__collections: dict[str, LocalCollection] = {}
+
+    def __getattr__(self, name: str) -> LocalCollection:
+        """
+        指定した名前のコレクションを返す（なければ作成する）
+
+        Args:
+            name (str): コレクションの名前
+
+        Returns:
+            LocalCollection: コレクション
+        """
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self.__collections.setdefault(name, LocalCollection())
+
+class LocalMongoClient:
+    """
+    MongoClient の代わりにメモリ上のデータベースを返すクラス（ベンチマーク用）
+    """
+
+    def __init__(self):
+        """
+        LocalMongoClientクラスのコンストラクタ
+        """
+        self.__databases: dict[str, LocalDatabase] = {}
+
+    def __getattr__(self, name: str) -> LocalDatabase:
+        """
+        指定した名前のデータベースを返す（なければ作成する）
+
+        Args:
+            name (str): データベースの名前
+
+        Returns:
+            LocalDatabase: データベース
+        """
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self.__databases.setdefault(name, LocalDatabase())
+
+    def close(self) -> None:
+        """
+        MongoClient と同じく接続を閉じる関数（何もしない）
+        """
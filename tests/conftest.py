@@ -0,0 +1,81 @@
+import os
+from datetime import date
+import mongomock
+import pytest
+
+# 設定の必須項目と、テストでファイル・MongoDB の実体に書き込まないための設定（app を読み込む前に指定する）
+TEST_ENVIRONMENT = {
+    "MONGO_URI": "mongodb://localhost:27017",
+    "MONGO_DATABASE": "holoduledb",
+    "MONGO_ENSURE_INDEXES": "false",
+    "YOUTUBE_API_KEY": "test",
+    "YOUTUBE_API_SERVICE_NAME": "youtube",
+    "YOUTUBE_API_VERSION": "v3",
+    "YOUTUBE_URL_PATTERN": "https://www.youtube.com/watch",
+    "YOUTUBE_CHECKPOINT_PATH": "",
+    "HOLODULE_URL": "http://localhost/",
+    "CACHE_BACKEND": "none",
+    "EVENTS_PATH": "",
+    "METRICS_JSON_PATH": "",
+    "METRICS_PROMETHEUS_PATH": "",
+}
+for name, value in TEST_ENVIRONMENT.items():
+    os.environ[name] = value
+
+from app.mongodb import MongoDB
+
+@pytest.fixture
+def db():
+    """
+    テストごとに空の mongomock のデータベースを MongoDB の接続として使う
+    """
+    previous = MongoDB._instance
+    MongoDB._instance = mongomock.MongoClient()
+    try:
+        yield MongoDB._instance.holoduledb
+    finally:
+        MongoDB._instance = previous
+
+def build_holodule_page(tabs: dict[str, list[tuple[date, str, str, str]]]) -> str:
+    """
+    ホロジュールのページと同じ構成の HTML を作る関数
+
+    Args:
+        tabs (dict[str, list[tuple[date, str, str, str]]]): タブの id をキーとした (配信日, 時刻, 配信者の名前, 動画ID) のリスト（最初のタブを表示中とする）
+
+    Returns:
+        str: ページソース
+    """
+    panes = []
+    for index, (tab_id, entries) in enumerate(tabs.items()):
+        entries_by_date: dict[date, list[tuple[str, str, str]]] = {}
+        for streaming_date, time_text, name, video_id in entries:
+            entries_by_date.setdefault(streaming_date, []).append((time_text, name, video_id))
+        blocks = []
+        for streaming_date, items in entries_by_date.items():
+            thumbnails = "".join(
+                f'<div class="col-6"><a href="https://www.youtube.com/watch?v={video_id}" class="thumbnail">'
+                f'<div class="container"><div class="row no-gutters">'
+                f'<div class="col-4 col-sm-4 col-md-4 text-left datetime">\n {time_text}\n</div>'
+                f'<div class="col text-right name">\n {name}\n</div>'
+                f'</div></div></a></div>'
+                for time_text, name, video_id in items
+            )
+            blocks.append(
+                f'<div class="container"><div class="row"><div class="col-12">'
+                f'<div class="holodule navbar-text">\n {streaming_date.month}/{streaming_date.day} (月)\n</div></div></div>'
+                f'<div class="row">{thumbnails}</div></div>'
+            )
+        pane_class = "tab-pane show active" if index == 0 else "tab-pane"
+        panes.append(f'<div class="{pane_class}" id="{tab_id}">{"".join(blocks)}</div>')
+    return (
+        '<html><head><title>ホロジュール</title></head><body>'
+        f'<div class="holodule" style="margin-top:10px;"><div class="tab-content">{"".join(panes)}</div></div></body></html>'
+    )
+
+@pytest.fixture
+def holodule_page():
+    """
+    ホロジュールのページと同じ構成の HTML を作る関数
+    """
+    return build_holodule_page
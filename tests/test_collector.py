@@ -0,0 +1,190 @@
+import json
+from datetime import date, datetime
+import pytest
+import app.collector
+from app.collector import Collector, youtube_settings, holodule_settings, mongo_settings
+from app.enrich_checkpoint import EnrichCheckpoint
+from app.parser import LxmlScheduleParser
+from app.settings import LeaseSettings
+from app.models.schedule import ScheduleModel, JST
+from app.models.schedules import ScheduleCollection
+from app.youtube_client import YoutubeApiError
+
+QUOTA_EXCEEDED_CONTENT = json.dumps({"error": {"errors": [{"reason": "quotaExceeded"}]}})
+
+class FakeYoutubeClient:
+    """
+    videos.list の呼び出しを記録して、指定した動画IDの動画情報を返す YouTube Data API のクライアントの代わり
+    """
+
+    def __init__(self, error: YoutubeApiError | None = None):
+        self.calls: list[list[str]] = []
+        self.__error = error
+
+    def list_videos(self, video_ids: list[str]) -> dict:
+        self.calls.append(video_ids)
+        if self.__error is not None:
+            raise self.__error
+        return {"items": [create_item(video_id) for video_id in video_ids]}
+
+    def close(self) -> None:
+        pass
+
+def create_item(video_id: str) -> dict:
+    """
+    videos.list の検索結果（items の要素）を作る
+    """
+    return {
+        "id": video_id,
+        "etag": "etag",
+        "snippet": {"title": f"タイトル {video_id}", "description": "概要", "publishedAt": "2024-01-01T00:00:00Z", "channelId": "channel", "channelTitle": "チャンネル"},
+    }
+
+def create_schedules(count: int) -> ScheduleCollection:
+    """
+    動画IDが異なるテスト用のホロジュール情報を作る
+    """
+    return ScheduleCollection(
+        schedules=[
+            ScheduleModel(code="HL0001", streaming_at=datetime(2024, 1, 1, 20, tzinfo=JST), url=f"https://www.youtube.com/watch?v=video{index:06d}")
+            for index in range(count)
+        ]
+    )
+
+@pytest.fixture
+def collector(monkeypatch, tmp_path):
+    """
+    API の呼び出し間隔を制限せず、チェックポイントを一時ディレクトリに書き込むコレクタ
+    """
+    monkeypatch.setattr(youtube_settings, "max_workers", 1)
+    monkeypatch.setattr(youtube_settings, "rate_per_second", 0)
+    monkeypatch.setattr(youtube_settings, "checkpoint_path", str(tmp_path / "checkpoint.jsonl"))
+    collector = Collector()
+    yield collector
+    collector.close()
+
+def test_quota_error_trips_circuit_breaker(collector, monkeypatch):
+    """
+    クォータを使い切った場合は残りの動画情報を問い合わせずに見送り、未完了とする
+    """
+    client = FakeYoutubeClient(YoutubeApiError(403, QUOTA_EXCEEDED_CONTENT))
+    monkeypatch.setattr(app.collector, "create_youtube_client", lambda settings: client)
+    schedules = create_schedules(60)
+    collector.start_run()
+
+    collector.set_video_infos(schedules)
+
+    assert len(client.calls) == 1
+    assert collector.metrics.get_summary()["counters"]["api_circuit_opened"] == 1
+    assert collector.metrics.get_summary()["counters"]["api_circuit_rejected"] == 1
+    assert collector.is_incomplete
+    assert collector.get_removal_scopes() is None
+    assert all(collector.is_deferred(schedule) for schedule in schedules)
+    assert len(collector.exclude_deferred(schedules)) == 0
+
+def test_resume_from_partial_checkpoint(collector, monkeypatch, tmp_path):
+    """
+    中断した実行のチェックポイントで取得済みの動画は問い合わせず、残りのみ問い合わせる
+    """
+    client = FakeYoutubeClient()
+    monkeypatch.setattr(app.collector, "create_youtube_client", lambda settings: client)
+    EnrichCheckpoint(str(tmp_path / "checkpoint.jsonl"), 3600).append([create_item(f"video{index:06d}") for index in range(2)])
+    schedules = create_schedules(3)
+    collector.start_run()
+
+    collector.set_video_infos(schedules)
+
+    assert client.calls == [["video000002"]]
+    assert collector.metrics.get_summary()["counters"]["checkpoint_hits"] == 2
+    assert [schedule.title for schedule in schedules] == [f"タイトル video{index:06d}" for index in range(3)]
+    assert not collector.is_incomplete
+
+def test_leased_tabs_detect_removed_schedules(db, monkeypatch, holodule_page):
+    """
+    複数のインスタンスでタブを分担する diff でも、担当するタブの範囲と配信者に限って削除を検出する
+    """
+    today = date.today()
+    jp = [(today, "20:00", "ときのそら", "jp000000001"), (today, "21:00", "さくらみこ", "jp000000002"), (today, "22:00", "さくらみこ", "jp000000003")]
+    id = [(today, "20:30", "Risu", "id000000001"), (today, "21:30", "Moona", "id000000002"), (today, "23:00", "Risu", "id000000003")]
+    pages = {"html": holodule_page({"jp": jp, "id": id})}
+    owners = iter(["a", "b"])
+    monkeypatch.setattr(youtube_settings, "max_workers", 1)
+    monkeypatch.setattr(youtube_settings, "rate_per_second", 0)
+    monkeypatch.setattr(holodule_settings, "urls", "http://localhost/#jp,http://localhost/#id")
+    monkeypatch.setattr(mongo_settings, "save_mode", "diff")
+    monkeypatch.setattr(app.collector, "get_lease_settings", lambda: LeaseSettings(enabled=True, owner=next(owners), ttl=60))
+    monkeypatch.setattr(app.collector, "create_youtube_client", lambda settings: FakeYoutubeClient())
+    monkeypatch.setattr(Collector, "_Collector__get_html_by_http", lambda self, url: pages["html"])
+    first = Collector()
+    second = Collector()
+
+    def run(collector: Collector) -> None:
+        collector.get_holodules()
+        collector.save_to_mongodb()
+
+    try:
+        # 1つ目のインスタンスのみが稼働を記録した時点ではすべてのタブを担当し、以降は1つずつ分担する
+        run(first)
+        run(second)
+        assert second.is_standby
+        run(first)
+        run(second)
+        assert db.schedules.count_documents({}) == 6
+
+        # 範囲内のスケジュールと、タブに表示されていた配信者のすべてのスケジュールが消えた
+        pages["html"] = holodule_page({"jp": [jp[0], jp[2]], "id": [id[0], id[2]]})
+        run(first)
+        run(second)
+    finally:
+        first.close()
+        second.close()
+
+    assert sorted(document["video_id"] for document in db.schedules.find()) == ["id000000001", "id000000003", "jp000000001", "jp000000003"]
+
+def test_unchanged_page_skips_parsing_and_saving(db, monkeypatch, holodule_page):
+    """
+    前回と同じブロックのページは解析・登録せず、次回はページソースの記録から解析せずに判定する
+    """
+    today = date.today()
+    entries = [(today, "20:00", "ときのそら", "jp000000001"), (today, "21:00", "さくらみこ", "jp000000002")]
+    html = holodule_page({"jp": entries})
+    pages = iter([html, html.replace("<title>", "<title>更新 "), html.replace("<title>", "<title>更新 ")])
+    youtube_client = FakeYoutubeClient()
+    saved = []
+    split = []
+    save = ScheduleCollection.save_to_mongodb
+    iter_blocks = LxmlScheduleParser.iter_blocks
+    monkeypatch.setattr(youtube_settings, "max_workers", 1)
+    monkeypatch.setattr(youtube_settings, "rate_per_second", 0)
+    monkeypatch.setattr(holodule_settings, "urls", "http://localhost/#jp")
+    monkeypatch.setattr(holodule_settings, "parser", "lxml")
+    monkeypatch.setattr(holodule_settings, "block_max_age", 3600)
+    monkeypatch.setattr(app.collector, "create_youtube_client", lambda settings: youtube_client)
+    monkeypatch.setattr(Collector, "_Collector__get_html_by_http", lambda self, url: next(pages))
+    monkeypatch.setattr(ScheduleCollection, "save_to_mongodb", lambda self, *args: saved.append(len(self)) or save(self, *args))
+    monkeypatch.setattr(LxmlScheduleParser, "iter_blocks", lambda self, *args: split.append(args) or iter_blocks(self, *args))
+    collector = Collector()
+
+    def run() -> dict[str, int]:
+        collector.get_holodules()
+        collector.save_to_mongodb()
+        return collector.metrics.get_summary()["counters"]
+
+    try:
+        run()
+        assert (len(saved), len(split), len(youtube_client.calls)) == (1, 1, 1)
+
+        # ページソースは変わってもブロックが前回と同じ場合は、解析・動画情報の取得・登録をしない
+        counters = run()
+        assert counters.get("blocks_parsed", 0) == 0
+        assert counters["runs_unchanged"] == 1
+        assert (len(saved), len(split), len(youtube_client.calls)) == (1, 2, 1)
+
+        # 変わっていないと判定したページソースを記録しているため、ブロックに分けずに判定する
+        counters = run()
+        assert counters["runs_unchanged"] == 1
+        assert (len(saved), len(split), len(youtube_client.calls)) == (1, 2, 1)
+    finally:
+        collector.close()
+
+    assert sorted(document["video_id"] for document in db.schedules.find()) == ["jp000000001", "jp000000002"]
@@ -0,0 +1,43 @@
+import json
+import os
+import time
+from app.enrich_checkpoint import EnrichCheckpoint
+
+def test_load_skips_partial_line(tmp_path):
+    """
+    追記した動画情報を読み込み、書き込みの途中で中断した行は読み飛ばす
+    """
+    filepath = tmp_path / "checkpoint.jsonl"
+    checkpoint = EnrichCheckpoint(str(filepath), 3600)
+    checkpoint.append([{"id": "video000001"}, {"id": "video000002"}])
+    with open(filepath, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"id": "video000003"})[:10])
+
+    assert list(checkpoint.load()) == ["video000001", "video000002"]
+
+def test_load_removes_expired_file(tmp_path):
+    """
+    最後の書き込みから max_age を過ぎたファイルは使わずに削除する
+    """
+    filepath = tmp_path / "checkpoint.jsonl"
+    checkpoint = EnrichCheckpoint(str(filepath), 3600)
+    checkpoint.append([{"id": "video000001"}])
+    modified_at = time.time() - 3601
+    os.utime(filepath, (modified_at, modified_at))
+
+    assert checkpoint.load() == {}
+    assert not filepath.exists()
+
+def test_clear_removes_file(tmp_path):
+    """
+    実行が完了したらファイルを削除する（ない場合も失敗しない）
+    """
+    filepath = tmp_path / "nested" / "checkpoint.jsonl"
+    checkpoint = EnrichCheckpoint(str(filepath), 3600)
+    checkpoint.append([{"id": "video000001"}])
+
+    checkpoint.clear()
+    checkpoint.clear()
+
+    assert not filepath.exists()
+    assert checkpoint.load() == {}
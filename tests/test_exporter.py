@@ -0,0 +1,193 @@
+import csv
+import gzip
+import json
+import os
+from datetime import date, datetime
+import pytest
+import app.exporter
+from app.exporter import EXPORT_FIELDS, get_export_codes, build_export_query, export_schedules
+
+@pytest.fixture
+def export_db(db):
+    """
+    出力するスケジュールを登録したデータベース
+    """
+    db.schedules.insert_many([
+        create_document("HL0003", datetime(2024, 1, 11, 0, 0)),
+        create_document("HL0001", datetime(2024, 1, 10, 20, 0), tags=["歌枠", "雑談"]),
+        create_document("HLID01", datetime(2024, 1, 10, 20, 0)),
+        create_document("HL0001", datetime(2024, 1, 9, 23, 59)),
+        create_document("HLID02", datetime(2024, 1, 12, 21, 0)),
+    ])
+    return db
+
+def create_document(code: str, streaming_at: datetime, tags: list[str] | None = None) -> dict:
+    """
+    テスト用のスケジュールのドキュメントを作る
+    """
+    video_id = f"{code}{streaming_at:%d%H%M}"[:11]
+    return {
+        "code": code,
+        "video_id": video_id,
+        "streaming_at": streaming_at,
+        "name": code,
+        "title": f"タイトル {video_id}",
+        "url": f"https://www.youtube.com/watch?v={video_id}",
+        "description": "概要, \"引用符\"\n改行",
+        "published_at": None,
+        "channel_id": None,
+        "channel_title": None,
+        "tags": tags,
+    }
+
+def get_keys(rows: list[dict]) -> list[tuple[str, str]]:
+    """
+    出力した行を配信者コードと配信日時（ISO 8601 形式）の組にする
+    """
+    return [(row["code"], row["streaming_at"]) for row in rows]
+
+def read_jsonl(filepath: str, export_format: str) -> list[dict]:
+    """
+    出力した jsonl / jsonl.gz を読み込む
+    """
+    opener = gzip.open if export_format == "jsonl.gz" else open
+    with opener(filepath, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+def test_export_csv(export_db, tmp_path):
+    """
+    CSV は BOM 付きで見出しを出力し、配信日時・配信者コードの順に並べる
+    """
+    filepath = str(tmp_path / "out" / "schedules.csv")
+
+    count = export_schedules(filepath, "csv", build_export_query())
+
+    with open(filepath, newline="", encoding="utf-8") as f:
+        assert f.read(1) == "\ufeff"
+        reader = csv.DictReader(f)
+        assert tuple(reader.fieldnames) == EXPORT_FIELDS
+        rows = list(reader)
+    assert count == 5
+    assert get_keys(rows) == [
+        ("HL0001", "2024-01-09T23:59:00"),
+        ("HL0001", "2024-01-10T20:00:00"),
+        ("HLID01", "2024-01-10T20:00:00"),
+        ("HL0003", "2024-01-11T00:00:00"),
+        ("HLID02", "2024-01-12T21:00:00"),
+    ]
+    assert rows[1]["tags"] == "歌枠,雑談"
+    assert rows[1]["description"] == "概要, \"引用符\"\n改行"
+    assert rows[1]["published_at"] == ""
+
+@pytest.mark.parametrize("export_format", ["jsonl", "jsonl.gz"])
+def test_export_jsonl(export_db, tmp_path, export_format):
+    """
+    jsonl / jsonl.gz は1行1件で出力する項目のみを書き込む
+    """
+    filepath = str(tmp_path / f"schedules.{export_format}")
+
+    count = export_schedules(filepath, export_format, build_export_query())
+
+    rows = read_jsonl(filepath, export_format)
+    assert count == len(rows) == 5
+    assert tuple(rows[1]) == EXPORT_FIELDS
+    assert rows[1]["streaming_at"] == "2024-01-10T20:00:00"
+    assert rows[1]["tags"] == ["歌枠", "雑談"]
+    assert rows[1]["published_at"] is None
+
+@pytest.mark.parametrize(
+    ("since", "until", "codes", "groups", "keys"),
+    [
+        # 開始・終了の日を含む（終了は翌日の 0 時より前）
+        (date(2024, 1, 10), None, [], [], [("HL0001", "2024-01-10T20:00:00"), ("HLID01", "2024-01-10T20:00:00"), ("HL0003", "2024-01-11T00:00:00"), ("HLID02", "2024-01-12T21:00:00")]),
+        (None, date(2024, 1, 10), [], [], [("HL0001", "2024-01-09T23:59:00"), ("HL0001", "2024-01-10T20:00:00"), ("HLID01", "2024-01-10T20:00:00")]),
+        (date(2024, 1, 10), date(2024, 1, 11), [], [], [("HL0001", "2024-01-10T20:00:00"), ("HLID01", "2024-01-10T20:00:00"), ("HL0003", "2024-01-11T00:00:00")]),
+        (None, None, ["HL0001", "HLID02"], [], [("HL0001", "2024-01-09T23:59:00"), ("HL0001", "2024-01-10T20:00:00"), ("HLID02", "2024-01-12T21:00:00")]),
+        (date(2024, 1, 10), date(2024, 1, 11), ["HL0001", "HLID02"], [], [("HL0001", "2024-01-10T20:00:00")]),
+        # グループは配信者コードに変換し、配信者コードと両方を指定した場合は両方を満たすもの
+        (None, None, [], ["hololive_id"], [("HLID01", "2024-01-10T20:00:00"), ("HLID02", "2024-01-12T21:00:00")]),
+        (date(2024, 1, 11), None, ["HL0001", "HLID02"], ["hololive_id"], [("HLID02", "2024-01-12T21:00:00")]),
+    ],
+)
+def test_export_filters(export_db, tmp_path, since, until, codes, groups, keys):
+    """
+    配信日の開始・終了・配信者コード・グループで絞り込む
+    """
+    filepath = str(tmp_path / "schedules.jsonl")
+    query = build_export_query(since, until, get_export_codes(codes, groups))
+
+    count = export_schedules(filepath, "jsonl", query)
+
+    assert count == len(keys)
+    assert get_keys(read_jsonl(filepath, "jsonl")) == keys
+
+@pytest.mark.parametrize("export_format", ["csv", "jsonl", "jsonl.gz"])
+def test_export_empty_result(export_db, tmp_path, export_format):
+    """
+    該当するスケジュールがない場合も（CSV は見出しのみの）ファイルを出力する
+    """
+    filepath = str(tmp_path / f"schedules.{export_format}")
+
+    count = export_schedules(filepath, export_format, build_export_query(codes=["HL0000"]))
+
+    assert count == 0
+    if export_format == "csv":
+        with open(filepath, newline="", encoding="utf_8_sig") as f:
+            assert list(csv.reader(f)) == [list(EXPORT_FIELDS)]
+    else:
+        assert read_jsonl(filepath, export_format) == []
+    assert os.listdir(tmp_path) == [f"schedules.{export_format}"]
+
+def test_export_writes_temp_file_then_replaces(export_db, tmp_path, monkeypatch):
+    """
+    一時ファイルに書き込んでから出力するファイルを置き換える
+    """
+    filepath = str(tmp_path / "schedules.csv")
+    with open(filepath, "w", encoding="utf-8") as f:
+        f.write("前回の出力")
+    replaced = []
+
+    def replace(src: str, dst: str) -> None:
+        # 置き換える時点で一時ファイルに書き込みが済み、出力するファイルは前回のまま
+        with open(dst, encoding="utf-8") as f:
+            assert f.read() == "前回の出力"
+        replaced.append((src, dst, os.path.getsize(src)))
+        original_replace(src, dst)
+
+    original_replace = os.replace
+    monkeypatch.setattr(app.exporter.os, "replace", replace)
+
+    export_schedules(filepath, "csv", build_export_query())
+
+    assert replaced == [(filepath + ".tmp", filepath, os.path.getsize(filepath))]
+    assert not os.path.exists(filepath + ".tmp")
+
+def test_export_keeps_previous_file_on_failure(export_db, tmp_path, monkeypatch):
+    """
+    書き込みに失敗した場合は一時ファイルを削除し、前回の出力を残す
+    """
+    filepath = str(tmp_path / "schedules.jsonl")
+    with open(filepath, "w", encoding="utf-8") as f:
+        f.write("前回の出力")
+
+    def write_documents(f, documents, export_format) -> int:
+        f.write("途中まで")
+        raise OSError("disk full")
+
+    monkeypatch.setattr(app.exporter, "write_documents", write_documents)
+
+    with pytest.raises(OSError):
+        export_schedules(filepath, "jsonl", build_export_query())
+
+    with open(filepath, encoding="utf-8") as f:
+        assert f.read() == "前回の出力"
+    assert not os.path.exists(filepath + ".tmp")
+
+def test_export_rejects_unknown_format(export_db, tmp_path):
+    """
+    出力形式の指定が不正な場合はファイルを作らない
+    """
+    with pytest.raises(ValueError):
+        export_schedules(str(tmp_path / "schedules.xml"), "xml", build_export_query())
+
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,76 @@
+from datetime import timedelta
+import pytest
+from app.leases import LeaseManager, LEASE_COLLECTION, get_utcnow, create_lease_manager
+from app.settings import LeaseSettings
+
+KEYS = ["tab:all", "tab:hololive", "tab:holostars", "tab:innk"]
+
+def test_acquire_claims_all_keys_when_alone(db):
+    """
+    稼働中のインスタンスが1つの場合はすべてのリースを取得する
+    """
+    manager = LeaseManager("a", 60, db=db)
+
+    assert manager.acquire(KEYS) == KEYS
+    assert db[LEASE_COLLECTION].count_documents({"owner": "a"}) == len(KEYS)
+
+def test_acquire_rebalances_between_instances(db):
+    """
+    稼働中のインスタンスが増えた場合は、等分した数を超える分を解放して他のインスタンスに譲る
+    """
+    first = LeaseManager("a", 60, db=db)
+    second = LeaseManager("b", 60, db=db)
+    first.acquire(KEYS)
+
+    # 2つ目のインスタンスが稼働を記録した時点では、すべて保持されているため待機する
+    assert second.acquire(KEYS) == []
+    assert first.acquire(KEYS) == KEYS[:2]
+    assert second.acquire(KEYS) == KEYS[2:]
+
+def test_renew_detects_lease_taken_over(db):
+    """
+    期限が切れて他のインスタンスが引き継いだリースは延長できない
+    """
+    first = LeaseManager("a", 60, db=db)
+    second = LeaseManager("b", 60, db=db)
+    first.acquire(KEYS)
+    assert first.renew()
+
+    # 1つ目のインスタンスの期限が切れた状態にする
+    db[LEASE_COLLECTION].update_many({}, {"$set": {"expires_at": get_utcnow() - timedelta(seconds=1)}})
+
+    assert second.acquire(KEYS) == KEYS
+    assert not first.renew()
+
+def test_acquire_waits_for_unexpired_lease(db):
+    """
+    他のインスタンスが期限内のリースを保持している場合は取得しない
+    """
+    db[LEASE_COLLECTION].insert_one({"_id": "tab:all", "owner": "b", "expires_at": get_utcnow() + timedelta(seconds=60)})
+    manager = LeaseManager("a", 60, db=db)
+
+    assert manager.acquire(["tab:all"]) == []
+    assert db[LEASE_COLLECTION].find_one({"_id": "tab:all"})["owner"] == "b"
+
+def test_release_lets_other_instance_claim(db):
+    """
+    解放したリースと稼働中の記録は消去され、他のインスタンスが期限を待たずに取得できる
+    """
+    first = LeaseManager("a", 60, db=db)
+    second = LeaseManager("b", 60, db=db)
+    first.acquire(KEYS)
+
+    first.release()
+
+    assert first.held == []
+    assert db[LEASE_COLLECTION].count_documents({}) == 0
+    assert second.acquire(KEYS) == KEYS
+
+def test_create_lease_manager():
+    """
+    無効な場合は生成せず、有効期間が不正な場合は例外とする
+    """
+    assert create_lease_manager(LeaseSettings(enabled=False)) is None
+    assert create_lease_manager(LeaseSettings(enabled=True, owner="a", ttl=60)).owner == "a"
+    with pytest.raises(ValueError):
+        create_lease_manager(LeaseSettings(enabled=True, ttl=0))
@@ -0,0 +1,34 @@
+import pymongo
+import pytest
+from app.mongo_indexes import ensure_indexes
+
+def test_ensure_indexes_creates_index_set(db):
+    """
+    定義したインデックスをすべて作成する
+    """
+    results = ensure_indexes(db)
+
+    assert results == {"video_id_code_unique": True, "streaming_at_code": True, "code_unique": True, "cache_video_id_unique": True}
+    assert ensure_indexes(db) == results
+
+def test_ensure_indexes_drops_obsolete_video_id_index(db):
+    """
+    video_id のみで一意とする以前のインデックスは削除する
+    """
+    db.schedules.create_index([("video_id", pymongo.ASCENDING)], name="video_id_unique", unique=True)
+
+    ensure_indexes(db)
+
+    assert "video_id_unique" not in db.schedules.index_information()
+
+def test_unique_index_allows_collab_schedules(db):
+    """
+    同じ動画でも配信者コードが異なれば登録でき、同じ組は重複として拒否する
+    """
+    ensure_indexes(db)
+    db.schedules.insert_many([{"video_id": "collab00001", "code": "HL0001"}, {"video_id": "collab00001", "code": "HL0002"}])
+    # video_id がないスケジュールは一意の対象外
+    db.schedules.insert_many([{"video_id": None, "code": "HL0001"}, {"video_id": None, "code": "HL0001"}])
+
+    with pytest.raises(pymongo.errors.DuplicateKeyError):
+        db.schedules.insert_one({"video_id": "collab00001", "code": "HL0001"})
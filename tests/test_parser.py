@@ -0,0 +1,58 @@
+from datetime import date, timedelta
+import pytest
+from app.models.streamers import StreamerCollection
+from app.parser import LxmlScheduleParser, SoupScheduleParser
+
+URL_PATTERN = r"https://www\.youtube\.com/watch"
+
+@pytest.fixture
+def page(holodule_page):
+    """
+    複数のタブ・日付と、登録しない（YouTube 以外の URL・不明な配信者）サムネイルを含むページ
+    """
+    today = date.today()
+    tomorrow = today + timedelta(days=1)
+    html = holodule_page({
+        "jp": [
+            (today, "20:00", "ときのそら", "jp000000001"),
+            (today, "21:00", "さくらみこ", "jp000000002"),
+            (today, "21:00", "不明な配信者", "jp000000003"),
+            (tomorrow, "0:05", "ときのそら", "jp000000004"),
+        ],
+        "id": [
+            (today, "20:30", "Risu", "id000000001"),
+            (tomorrow, "9:00", "Moona", "id000000002"),
+        ],
+    })
+    return html.replace("https://www.youtube.com/watch?v=jp000000002", "https://www.twitch.tv/jp000000002")
+
+def parse(parser_class: type, html: str, tab_id: str | None) -> list[dict]:
+    """
+    パーサで解析したホロジュール情報を、投稿日時（解析した時刻）を除いた辞書のリストにする
+    """
+    schedule_parser = parser_class(StreamerCollection(), URL_PATTERN)
+    return [schedule.model_dump(exclude={"published_at"}) for schedule in schedule_parser.iter_parse(html, tab_id)]
+
+@pytest.mark.parametrize("tab_id", [None, "jp", "id", "missing"])
+def test_lxml_parser_matches_soup_parser(page, tab_id):
+    """
+    lxml のパーサは BeautifulSoup のパーサ（従来の実装）と同じホロジュール情報を返す
+    """
+    expected = parse(SoupScheduleParser, page, tab_id)
+
+    assert parse(LxmlScheduleParser, page, tab_id) == expected
+    assert len(expected) == {None: 2, "jp": 2, "id": 2, "missing": 0}[tab_id]
+
+def test_lxml_blocks_match_soup_parser(page):
+    """
+    ブロックごとに解析した結果をつなげたものも BeautifulSoup のパーサと同じになる
+    """
+    today = date.today()
+    schedule_parser = LxmlScheduleParser(StreamerCollection(), URL_PATTERN)
+    schedules = []
+    current_date = None
+    for block in schedule_parser.iter_blocks(page, "jp"):
+        block_schedules, current_date = schedule_parser.parse_block(block, current_date, today)
+        schedules.extend(schedule.model_dump(exclude={"published_at"}) for schedule in block_schedules)
+
+    assert schedules == parse(SoupScheduleParser, page, "jp")
@@ -0,0 +1,91 @@
+import asyncio
+from datetime import datetime
+import pytest
+from app.metrics import RunMetrics
+from app.models.schedule import ScheduleModel, JST
+from app.models.schedules import ScheduleCollection, RemovalScope
+from app.models.save_result import SaveResult
+from app.pipeline import CollectorPipeline
+
+class FakeCollector:
+    """
+    パイプラインのテスト用に、解析済みのホロジュール情報を返す Collector の代わり
+    """
+
+    def __init__(self, schedules: list[ScheduleModel], is_standby: bool = False, is_lease_held: bool = True):
+        self.metrics = RunMetrics()
+        self.is_unchanged = False
+        self.is_standby = is_standby
+        self.is_incomplete = False
+        self.is_finished = False
+        self.__schedules = schedules
+        self.__is_lease_held = is_lease_held
+
+    def start_run(self) -> None:
+        self.metrics.reset()
+
+    def iter_parsed_schedules(self):
+        if self.is_standby:
+            return
+        for schedule in self.__schedules:
+            yield schedule, False
+
+    def set_video_infos(self, schedules: ScheduleCollection) -> None:
+        for schedule in schedules:
+            schedule.set_video_info(f"video{schedule.code}", "タイトル", "概要", datetime(2024, 1, 1, tzinfo=JST), "channel", "チャンネル", [])
+
+    def renew_leases(self) -> bool:
+        return self.__is_lease_held
+
+    def exclude_deferred(self, schedules: ScheduleCollection) -> ScheduleCollection:
+        return schedules
+
+    def get_removal_scopes(self) -> list[RemovalScope] | None:
+        return None
+
+    def record_save_result(self, result: SaveResult) -> None:
+        pass
+
+    def finish_save(self) -> None:
+        self.is_finished = True
+
+    def commit_blocks(self) -> None:
+        pass
+
+def create_schedules() -> list[ScheduleModel]:
+    """
+    テスト用のホロジュール情報を作る
+    """
+    return [ScheduleModel(code=f"HL000{index}", streaming_at=datetime(2024, 1, 1, 20 + index, tzinfo=JST)) for index in range(3)]
+
+def run_pipeline(collector: FakeCollector) -> ScheduleCollection:
+    """
+    テスト用の設定でパイプラインを実行する
+    """
+    return asyncio.run(CollectorPipeline(collector, 2, 10, 0.01, 2, "upsert").run())
+
+def test_pipeline_saves_streamers_and_schedules(db):
+    """
+    リースを保持している場合は配信者情報とホロジュール情報を登録する
+    """
+    collector = FakeCollector(create_schedules())
+
+    run_pipeline(collector)
+
+    assert db.streamers.count_documents({}) > 0
+    assert db.schedules.count_documents({}) == 3
+    assert collector.is_finished
+
+@pytest.mark.parametrize(("is_standby", "is_lease_held"), [(True, True), (False, False)])
+def test_pipeline_skips_all_writes_without_lease(db, is_standby, is_lease_held):
+    """
+    担当するタブがない場合とリースを引き継がれた場合は、配信者情報も含めて登録しない
+    """
+    collector = FakeCollector(create_schedules(), is_standby=is_standby, is_lease_held=is_lease_held)
+
+    run_pipeline(collector)
+
+    assert db.streamers.count_documents({}) == 0
+    assert db.schedules.count_documents({}) == 0
+    assert db.sync_states.count_documents({}) == 0
+    assert not collector.is_finished
@@ -0,0 +1,74 @@
+import pytest
+from app.rate_limiter import RetryBackoff, CircuitBreaker
+
+@pytest.mark.parametrize(("attempt", "upper"), [(1, 1.0), (2, 2.0), (3, 4.0), (6, 10.0)])
+def test_retry_backoff_delay_is_bounded(attempt, upper):
+    """
+    待ち時間は 0 から、回数ごとに倍に延ばした上限（max_delay まで）の範囲とする
+    """
+    backoff = RetryBackoff(4, 1.0, 10.0)
+
+    delays = [backoff.get_delay(attempt) for _ in range(100)]
+
+    assert all(0 <= delay <= upper for delay in delays)
+
+def test_retry_backoff_calls_at_least_once():
+    """
+    呼び出しの最大回数は 1 以上とする
+    """
+    assert RetryBackoff(0, 1.0, 10.0).max_attempts == 1
+
+def test_circuit_breaker_rejects_until_cooldown():
+    """
+    開いている間は一定時間が過ぎるまで呼び出させない
+    """
+    breaker = CircuitBreaker(3600)
+    assert breaker.allow()
+
+    breaker.open()
+
+    assert breaker.is_open
+    assert not breaker.allow()
+    # 止める前に始めた呼び出しの結果では再開しない
+    breaker.close()
+    assert breaker.is_open
+
+def test_circuit_breaker_allows_single_trial():
+    """
+    一定時間が過ぎたら1回だけ試しに呼び出させ、成功したら閉じる
+    """
+    breaker = CircuitBreaker(0)
+    breaker.open()
+
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.close()
+
+    assert not breaker.is_open
+    assert breaker.allow()
+
+def test_circuit_breaker_reopens_on_failed_trial():
+    """
+    試しに呼び出して失敗した場合は再び止める
+    """
+    breaker = CircuitBreaker(0)
+    breaker.open()
+    assert breaker.allow()
+
+    breaker.open()
+
+    assert breaker.is_open
+    assert breaker.allow()
+
+def test_circuit_breaker_release_passes_trial():
+    """
+    試しに呼び出す番を譲った場合は、次の呼び出しが試す
+    """
+    breaker = CircuitBreaker(0)
+    breaker.open()
+    assert breaker.allow()
+
+    breaker.release()
+
+    assert breaker.is_open
+    assert breaker.allow()
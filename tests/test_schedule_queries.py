@@ -0,0 +1,147 @@
+from datetime import datetime
+import pytest
+import app.schedule_queries
+from app.models.schedule import ScheduleModel
+from app.models.schedules import ScheduleCollection
+from app.schedule_queries import QueryCache, CACHE_GENERATION_ID, get_upcoming_schedules, get_schedules_between, get_latest_schedules
+
+NOW = datetime(2024, 1, 10, 12, 0)
+
+@pytest.fixture
+def query_db(db, monkeypatch):
+    """
+    配信者情報とスケジュールを登録して、現在の日時を固定し、検索結果のキャッシュを空にしたデータベース
+    """
+    monkeypatch.setattr(app.schedule_queries, "get_now", lambda: NOW)
+    monkeypatch.setattr(app.schedule_queries, "_cache", QueryCache(60, 100))
+    monkeypatch.setattr(app.schedule_queries, "_cache_created", True)
+    db.streamers.insert_many([
+        {"code": "HL0001", "group": "hololive", "affiliations": ["gen0"], "image_name": "sora.jpg"},
+        {"code": "HL0002", "group": "hololive", "affiliations": ["gen0"], "image_name": "roboco.jpg"},
+        {"code": "HLID01", "group": "hololive_id", "affiliations": ["id1"], "image_name": "risu.jpg"},
+    ])
+    db.schedules.insert_many([
+        create_document("HL0001", datetime(2024, 1, 9, 20)),
+        create_document("HL0001", datetime(2024, 1, 10, 20)),
+        create_document("HL0002", datetime(2024, 1, 8, 21)),
+        create_document("HL0002", datetime(2024, 1, 11, 21)),
+        create_document("HLID01", datetime(2024, 1, 10, 22)),
+        create_document("HLID01", datetime(2024, 1, 20, 22)),
+    ])
+    return db
+
+def create_document(code: str, streaming_at: datetime) -> dict:
+    """
+    テスト用のスケジュールのドキュメントを作る
+    """
+    video_id = f"{code}{streaming_at:%m%d%H}"[:11]
+    return {
+        "code": code,
+        "video_id": video_id,
+        "streaming_at": streaming_at,
+        "name": code,
+        "title": f"タイトル {video_id}",
+        "url": f"https://www.youtube.com/watch?v={video_id}",
+        "description": "概要",
+    }
+
+def get_keys(schedules: list[dict]) -> list[tuple[str, datetime]]:
+    """
+    検索結果を配信者コードと配信日時の組にする
+    """
+    return [(schedule["code"], schedule["streaming_at"]) for schedule in schedules]
+
+def test_get_upcoming_schedules(query_db):
+    """
+    現在の日時から指定した日数のスケジュールを配信日時の順に返し、配信者情報を結合する
+    """
+    schedules = get_upcoming_schedules()
+
+    assert get_keys(schedules) == [("HL0001", datetime(2024, 1, 10, 20)), ("HLID01", datetime(2024, 1, 10, 22)), ("HL0002", datetime(2024, 1, 11, 21))]
+    assert schedules[0]["group"] == "hololive"
+    assert schedules[0]["image_name"] == "sora.jpg"
+    assert "description" not in schedules[0]
+
+@pytest.mark.parametrize(
+    ("options", "codes"),
+    [
+        ({"codes": ["HL0002"]}, ["HL0002"]),
+        ({"group": "hololive"}, ["HL0001", "HL0002"]),
+        ({"affiliation": "id1"}, ["HLID01"]),
+        ({"limit": 1}, ["HL0001"]),
+        ({"group": "hololive", "limit": 1}, ["HL0001"]),
+        ({"days": 30}, ["HL0001", "HLID01", "HL0002", "HLID01"]),
+    ],
+)
+def test_get_upcoming_schedules_filters(query_db, options, codes):
+    """
+    配信者コード・グループ・所属・件数・日数で絞り込む
+    """
+    assert [schedule["code"] for schedule in get_upcoming_schedules(**options)] == codes
+
+def test_get_schedules_between(query_db):
+    """
+    配信日時が範囲内（終了は含まない）のスケジュールを配信日時の順に返す
+    """
+    schedules = get_schedules_between(datetime(2024, 1, 8, 21), datetime(2024, 1, 10, 22))
+
+    assert get_keys(schedules) == [("HL0002", datetime(2024, 1, 8, 21)), ("HL0001", datetime(2024, 1, 9, 20)), ("HL0001", datetime(2024, 1, 10, 20))]
+    assert get_keys(get_schedules_between(datetime(2024, 1, 1), datetime(2024, 2, 1), codes=["HLID01"])) == [
+        ("HLID01", datetime(2024, 1, 10, 22)),
+        ("HLID01", datetime(2024, 1, 20, 22)),
+    ]
+
+def test_get_latest_schedules(query_db):
+    """
+    配信者ごとに現在の日時までで最も新しいスケジュールを配信者コードの順に返す
+    """
+    schedules = get_latest_schedules()
+
+    assert get_keys(schedules) == [("HL0001", datetime(2024, 1, 9, 20)), ("HL0002", datetime(2024, 1, 8, 21))]
+    assert [schedule["code"] for schedule in get_latest_schedules(group="hololive_id", days=30)] == []
+
+def test_cached_result_is_reused(query_db):
+    """
+    登録していない間はキャッシュした検索結果を返す
+    """
+    before = get_upcoming_schedules()
+    query_db.schedules.insert_one(create_document("HL0002", datetime(2024, 1, 10, 23)))
+
+    assert get_upcoming_schedules() == before
+
+def test_cache_is_invalidated_by_save(query_db):
+    """
+    ホロジュール情報を登録した場合はキャッシュを破棄する
+    """
+    get_upcoming_schedules()
+
+    ScheduleCollection(schedules=[ScheduleModel(code="HL0002", streaming_at=datetime(2024, 1, 10, 23), name="HL0002")]).save_to_mongodb("upsert")
+
+    assert ("HL0002", datetime(2024, 1, 10, 23)) in get_keys(get_upcoming_schedules())
+
+def test_cache_is_invalidated_by_other_process(query_db):
+    """
+    別のプロセスで登録して世代が増えた場合もキャッシュを破棄する
+    """
+    get_upcoming_schedules()
+    query_db.schedules.insert_one(create_document("HL0002", datetime(2024, 1, 10, 23)))
+
+    # 別のプロセスの登録（このプロセスのキャッシュには触れずに世代のみ増える）
+    query_db.sync_states.update_one({"_id": CACHE_GENERATION_ID}, {"$inc": {"generation": 1}}, upsert=True)
+
+    assert ("HL0002", datetime(2024, 1, 10, 23)) in get_keys(get_upcoming_schedules())
+
+def test_query_cache_discards_result_loaded_before_generation_change():
+    """
+    検索中に世代が変わった場合は、その検索結果を保持しない
+    """
+    cache = QueryCache(60, 10)
+    cache.sync_generation(1)
+
+    def load() -> list[dict]:
+        cache.sync_generation(2)
+        return [{"code": "HL0001"}]
+
+    cache.get_or_load(("key",), load)
+
+    assert len(cache) == 0
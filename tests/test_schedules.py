@@ -0,0 +1,114 @@
+from datetime import datetime
+import pytest
+from app.models.schedule import ScheduleModel, JST
+from app.models.schedules import ScheduleCollection, get_comparable_value
+from app.models.schedule_change import CHANGE_ADDED, CHANGE_RESCHEDULED, CHANGE_CHANGED, CHANGE_REMOVED
+
+def create_schedule(code: str, video_id: str | None, hour: int = 20, title: str = "タイトル") -> ScheduleModel:
+    """
+    テスト用のスケジュールを作る
+    """
+    schedule = ScheduleModel(
+        code=code,
+        streaming_at=datetime(2024, 1, 1, hour, 0, tzinfo=JST),
+        name=code,
+        url=f"https://www.youtube.com/watch?v={video_id}",
+    )
+    if video_id is not None:
+        schedule.set_video_info(video_id, title, "概要", datetime(2024, 1, 1, tzinfo=JST), "channel", "チャンネル", [])
+    return schedule
+
+@pytest.mark.parametrize("mode", ["replace", "upsert", "diff"])
+def test_collab_schedules_sharing_video_id_are_kept(db, mode):
+    """
+    コラボ配信で同じ動画が複数の配信者のスケジュールに含まれる場合、配信者ごとに1件ずつ登録する
+    """
+    schedules = ScheduleCollection(schedules=[create_schedule("HL0001", "collab00001"), create_schedule("HL0002", "collab00001")])
+
+    result = schedules.save_to_mongodb(mode)
+
+    assert result.inserted == 2
+    assert sorted(document["code"] for document in db.schedules.find({"video_id": "collab00001"})) == ["HL0001", "HL0002"]
+
+@pytest.mark.parametrize("mode", ["upsert", "diff"])
+def test_collab_schedules_are_unchanged_on_next_run(db, mode):
+    """
+    同じ内容で登録し直したコラボ配信のスケジュールは変更なしとなる
+    """
+    ScheduleCollection(schedules=[create_schedule("HL0001", "collab00001"), create_schedule("HL0002", "collab00001")]).save_to_mongodb(mode)
+
+    result = ScheduleCollection(schedules=[create_schedule("HL0001", "collab00001"), create_schedule("HL0002", "collab00001")]).save_to_mongodb(mode)
+
+    assert (result.inserted, result.updated, result.unchanged, result.deleted) == (0, 0, 2, 0)
+    assert result.changes == []
+    assert db.schedules.count_documents({}) == 2
+
+def test_upsert_updates_only_changed_collab_schedule(db):
+    """
+    コラボ配信の一方のみ内容が変わった場合は、その配信者のスケジュールのみ置き換える
+    """
+    ScheduleCollection(schedules=[create_schedule("HL0001", "collab00001"), create_schedule("HL0002", "collab00001")]).save_to_mongodb("upsert")
+
+    result = ScheduleCollection(
+        schedules=[create_schedule("HL0001", "collab00001"), create_schedule("HL0002", "collab00001", title="変更後")]
+    ).save_to_mongodb("upsert")
+
+    assert (result.inserted, result.updated, result.unchanged) == (0, 1, 1)
+    assert db.schedules.find_one({"code": "HL0001"})["title"] == "タイトル"
+    assert db.schedules.find_one({"code": "HL0002"})["title"] == "変更後"
+
+def test_diff_classifies_changes(db):
+    """
+    前回のスナップショットとの差分を、追加・配信日時の変更・動画情報の変更・変更なしに分類する
+    """
+    ScheduleCollection(
+        schedules=[create_schedule("HL0001", "video000001", 20), create_schedule("HL0002", "video000002", 21), create_schedule("HL0003", "video000003", 22)]
+    ).save_to_mongodb("diff")
+
+    result = ScheduleCollection(
+        schedules=[
+            create_schedule("HL0001", "video000001", 23),
+            create_schedule("HL0002", "video000002", 21, title="変更後"),
+            create_schedule("HL0003", "video000003", 22),
+            create_schedule("HL0004", "video000004", 22),
+        ]
+    ).save_to_mongodb("diff")
+
+    changes = {change.code: change for change in result.changes}
+    assert (result.inserted, result.updated, result.unchanged, result.deleted) == (1, 2, 1, 0)
+    assert changes["HL0001"].event == CHANGE_RESCHEDULED
+    assert changes["HL0001"].previous_streaming_at == get_comparable_value(datetime(2024, 1, 1, 20, tzinfo=JST))
+    assert "streaming_at" in changes["HL0001"].changed_fields
+    assert changes["HL0002"].event == CHANGE_CHANGED
+    assert changes["HL0002"].changed_fields == ["title"]
+    assert changes["HL0004"].event == CHANGE_ADDED
+    assert "HL0003" not in changes
+    assert db.schedules.count_documents({}) == 4
+
+def test_diff_removes_only_inside_window(db):
+    """
+    今回の配信日時の範囲内で含まれていないスケジュールのみ削除とし、範囲外のものは残す
+    """
+    ScheduleCollection(
+        schedules=[create_schedule("HL0001", "video000001", 18), create_schedule("HL0002", "video000002", 21), create_schedule("HL0003", "video000003", 23)]
+    ).save_to_mongodb("diff")
+
+    result = ScheduleCollection(
+        schedules=[create_schedule("HL0004", "video000004", 20), create_schedule("HL0005", "video000005", 22)]
+    ).save_to_mongodb("diff")
+
+    removed = [change for change in result.changes if change.event == CHANGE_REMOVED]
+    assert result.deleted == 1
+    assert [change.code for change in removed] == ["HL0002"]
+    assert sorted(document["code"] for document in db.schedules.find()) == ["HL0001", "HL0003", "HL0004", "HL0005"]
+
+def test_diff_without_detect_removed_keeps_missing(db):
+    """
+    スナップショット全体ではない場合（detect_removed が False）は削除を検出しない
+    """
+    ScheduleCollection(schedules=[create_schedule("HL0001", "video000001", 20), create_schedule("HL0002", "video000002", 21)]).save_to_mongodb("diff")
+
+    result = ScheduleCollection(schedules=[create_schedule("HL0001", "video000001", 20), create_schedule("HL0003", "video000003", 22)]).save_to_mongodb("diff", False)
+
+    assert (result.inserted, result.unchanged, result.deleted) == (1, 1, 0)
+    assert db.schedules.count_documents({}) == 3
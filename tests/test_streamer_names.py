@@ -0,0 +1,96 @@
+import pytest
+from app.models.streamer import StreamerModel
+from app.models.streamer_names import StreamerNameIndex
+
+STREAMERS = {
+    "ときのそら": StreamerModel(code="HL0001", name="ときのそら", channel_id="UCp6993wxpyDPHUpavwDFqgg", aliases=["Tokino Sora"]),
+    "Raora": StreamerModel(code="HL0002", name="Raora Panthera", channel_id="UCl69AEx4MdqMZH7Jtsm7Tig"),
+    "Kiara": StreamerModel(code="HL0003", name="Takanashi Kiara", channel_id="UCHsx4Hqa-1ORjQTh9TYDhww"),
+    "Kaela": StreamerModel(code="HL0004", name="Kaela Kovalskia", channel_id="UCZLZ8Jjx_RN2CXloOmgTHVg"),
+    "かなた": StreamerModel(code="HL0005", name="天音かなた", channel_id="UCZlDXzGoo7d44bwdNObFacg", aliases=["Kanata"]),
+    "奏": StreamerModel(code="HL0006", name="音乃瀬奏", channel_id="UCWQtYtq9EOB4-I5P-3fh8lA", aliases=["Kanade"]),
+}
+
+@pytest.fixture
+def index() -> StreamerNameIndex:
+    """
+    テスト用の配信者の索引
+    """
+    return StreamerNameIndex(STREAMERS)
+
+@pytest.mark.parametrize(
+    ("name", "code"),
+    [
+        # 表示どおり（短縮名・名前・チャンネルID・別名）
+        ("ときのそら", "HL0001"),
+        ("Raora Panthera", "HL0002"),
+        ("UCHsx4Hqa-1ORjQTh9TYDhww", "HL0003"),
+        ("Tokino Sora", "HL0001"),
+        # 正規化（全角・大文字小文字・区切り文字）
+        ("ＴＯＫＩＮＯ　ＳＯＲＡ", "HL0001"),
+        ("takanashi-kiara", "HL0003"),
+        ("@Kaela.Kovalskia", "HL0004"),
+    ],
+)
+def test_resolve_confirmed(index, name, code):
+    """
+    表示どおり・正規化して一致する名前は解決し、解決できなかった名前には数えない
+    """
+    assert index.resolve(name).code == code
+    assert index.unresolved == {}
+
+@pytest.mark.parametrize(
+    ("name", "code"),
+    [
+        # 表示された名前で始まる別名が1人に限られる（前方一致）
+        ("Raora Pan", "HL0002"),
+        ("Takanashi Ki", "HL0003"),
+        ("Kae", "HL0004"),
+        # 類似度が下限以上（あいまい検索）
+        ("Takanashi Kiar", "HL0003"),
+        ("Kaela Kovalskla", "HL0004"),
+    ],
+)
+def test_resolve_guessed_counts_as_unresolved(index, name, code):
+    """
+    前方一致・あいまい検索で推定した名前は解決するが、解決できなかった名前としても数える
+    """
+    assert index.resolve(name).code == code
+    assert index.resolve(name).code == code
+    assert index.unresolved == {name: 2}
+    assert index.fallbacks == {name: code}
+
+@pytest.mark.parametrize(
+    "name",
+    [
+        # 別名で始まる新しい配信者の名前（逆向きの前方一致は使わない）
+        "Raora Panthera Junior",
+        "Kaela Kovalskia Twin",
+        # 表示された名前で始まる別名が複数の配信者にある
+        "Kana",
+        # 短すぎる・似ていない名前
+        "Ra",
+        "天音",
+        "Unknown Talent",
+        "",
+    ],
+)
+def test_resolve_rejected(index, name):
+    """
+    推定できない名前は解決せず、解決できなかった名前として数える
+    """
+    assert index.resolve(name) is None
+    assert index.unresolved == {name: 1}
+    assert index.fallbacks == {}
+
+def test_reset_clears_resolution_state(index):
+    """
+    reset で解決できなかった名前と推定した名前を消去する
+    """
+    index.resolve("Raora Pan")
+    index.resolve("Unknown Talent")
+
+    index.reset()
+
+    assert index.unresolved == {}
+    assert index.fallbacks == {}
@@ -0,0 +1,68 @@
+import pytest
+from app.models.streamers import StreamerCollection
+
+def test_save_skips_unchanged_roster(db):
+    """
+    前回登録した配信者情報と同じ場合は登録しない
+    """
+    first = StreamerCollection().save_to_mongodb()
+
+    result = StreamerCollection().save_to_mongodb()
+
+    assert first.inserted == len(StreamerCollection.streamers)
+    assert (result.inserted, result.updated, result.unchanged) == (0, 0, len(StreamerCollection.streamers))
+
+def test_save_reads_sync_state_once_when_unchanged(db, monkeypatch):
+    """
+    前回と同じ場合は sync_states の1回の読み込みのみで、配信者情報のコレクションには触れない
+    """
+    StreamerCollection().save_to_mongodb()
+    calls = []
+    depth = [0]
+
+    def record(name: str, method):
+        # mongomock の内部で呼び出すもの（find_one から find など）は数えない
+        def recorded(self, *args, **kwargs):
+            if depth[0] == 0:
+                calls.append((self.name, name))
+            depth[0] += 1
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                depth[0] -= 1
+        return recorded
+
+    collection_type = type(db.streamers)
+    for name in ("find", "find_one", "count_documents", "estimated_document_count", "bulk_write", "replace_one"):
+        monkeypatch.setattr(collection_type, name, record(name, getattr(collection_type, name)))
+
+    StreamerCollection().save_to_mongodb()
+
+    assert calls == [("sync_states", "find_one")]
+
+@pytest.mark.parametrize(
+    "sync_state",
+    [
+        # 記録がない（sync_states を削除した・以前の形式）
+        None,
+        {"content_hash": "old"},
+        # ハッシュ値は同じでも登録した配信者コードが異なる
+        {"codes": ["HL0000"]},
+    ],
+)
+def test_save_rewrites_when_sync_state_differs(db, sync_state):
+    """
+    前回の記録がない・ハッシュ値か配信者コードの一覧が異なる場合は登録し直す
+    """
+    StreamerCollection().save_to_mongodb()
+    db.streamers.drop()
+    if sync_state is None:
+        db.sync_states.delete_one({"_id": "streamers"})
+    else:
+        db.sync_states.update_one({"_id": "streamers"}, {"$set": sync_state})
+
+    result = StreamerCollection().save_to_mongodb()
+
+    assert result.inserted == len(StreamerCollection.streamers)
+    assert db.streamers.count_documents({}) == len(StreamerCollection.streamers)
+    assert db.sync_states.find_one({"_id": "streamers"})["codes"] == sorted(StreamerCollection.streamers[name].code for name in StreamerCollection.streamers)
@@ -0,0 +1,117 @@
+import pytest
+from app.video_cache import VideoCache, FileVideoCacheStore, MongoVideoCacheStore
+
+class RecordingStore:
+    """
+    書き込んだ内容を記録するキャッシュの保存先
+    """
+
+    def __init__(self, entries: list[dict] | None = None):
+        self.entries = entries or []
+        self.saves: list[tuple[list[str], list[str]]] = []
+
+    def load(self) -> list[dict]:
+        return self.entries
+
+    def save(self, entries: list[dict], updated_ids: list[str], removed_ids: list[str]) -> None:
+        self.entries = entries
+        self.saves.append((sorted(updated_ids), sorted(removed_ids)))
+
+def create_item(video_id: str, etag: str = "etag", live_broadcast_content: str = "none") -> dict:
+    """
+    videos.list の検索結果（items の要素）を作る
+    """
+    return {"id": video_id, "etag": etag, "snippet": {"title": f"タイトル {video_id}", "liveBroadcastContent": live_broadcast_content}}
+
+def test_ttl_depends_on_live_broadcast_content():
+    """
+    配信予定・配信中の動画と配信済みの動画で有効期間を分ける
+    """
+    cache = VideoCache(RecordingStore(), 0, 3600, 10)
+    cache.put(create_item("upcoming001", live_broadcast_content="upcoming"))
+    cache.put(create_item("finished001"))
+
+    assert cache.get("upcoming001") is None
+    assert cache.get("finished001")["snippet"]["title"] == "タイトル finished001"
+    # 有効期間が切れても ETag は残す
+    assert cache.get_etag("upcoming001") == "etag"
+
+def test_evicts_least_recently_used():
+    """
+    最大件数を超えた場合は参照が古いものから破棄する
+    """
+    store = RecordingStore()
+    cache = VideoCache(store, 3600, 3600, 2)
+    cache.put(create_item("video000001"))
+    cache.put(create_item("video000002"))
+    cache.get("video000001")
+
+    cache.put(create_item("video000003"))
+    cache.save()
+
+    assert cache.get("video000002") is None
+    assert cache.get("video000001") is not None
+    assert store.saves == [(["video000001", "video000003"], ["video000002"])]
+
+def test_hits_are_not_written():
+    """
+    参照しただけのエントリは保存先へ書き込まない
+    """
+    store = RecordingStore()
+    cache = VideoCache(store, 3600, 3600, 10)
+    cache.put(create_item("video000001"))
+    cache.save()
+
+    assert cache.get("video000001") is not None
+    cache.save()
+
+    assert len(store.saves) == 1
+
+@pytest.mark.parametrize(("etag", "is_revalidated"), [("etag", True), ("changed", False)])
+def test_revalidate_extends_matching_etag(etag, is_revalidated):
+    """
+    取得し直した検索結果の ETag が一致する場合のみ有効期間を延長して書き込む
+    """
+    store = RecordingStore()
+    cache = VideoCache(store, 0, 0, 10)
+    cache.put(create_item("video000001"))
+    cache.save()
+    cache = VideoCache(store, 3600, 3600, 10)
+
+    assert cache.revalidate(create_item("video000001", etag)) == is_revalidated
+    cache.save()
+
+    assert (cache.get("video000001") is not None) == is_revalidated
+    assert len(store.saves) == (2 if is_revalidated else 1)
+
+def test_file_store_round_trip(tmp_path):
+    """
+    ファイルに保存したキャッシュを読み込み直せる（参照の順も保つ）
+    """
+    store = FileVideoCacheStore(str(tmp_path / "cache" / "video_cache.json"))
+    cache = VideoCache(store, 3600, 3600, 2)
+    cache.put(create_item("video000001"))
+    cache.put(create_item("video000002"))
+    cache.get("video000001")
+    cache.save()
+
+    cache = VideoCache(store, 3600, 3600, 2)
+    cache.put(create_item("video000003"))
+
+    assert cache.get("video000001") is not None
+    assert cache.get("video000002") is None
+
+def test_mongo_store_round_trip(db):
+    """
+    MongoDB に保存したキャッシュを読み込み直せて、破棄したものは削除する
+    """
+    cache = VideoCache(MongoVideoCacheStore(10), 3600, 3600, 2)
+    cache.put(create_item("video000001"))
+    cache.put(create_item("video000002"))
+    cache.put(create_item("video000003"))
+    cache.save()
+
+    cache = VideoCache(MongoVideoCacheStore(10), 3600, 3600, 2)
+
+    assert sorted(document["video_id"] for document in db.video_cache.find()) == ["video000002", "video000003"]
+    assert cache.get("video000003")["snippet"]["title"] == "タイトル video000003"
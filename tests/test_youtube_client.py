@@ -0,0 +1,83 @@
+import json
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+from app.youtube_client import YoutubeApiError, DiscoveryYoutubeClient
+
+class FakeRequest:
+    """
+    execute で指定した例外を送出する googleapiclient のリクエストの代わり
+    """
+
+    def __init__(self, error: Exception):
+        self.__error = error
+
+    def execute(self) -> dict:
+        raise self.__error
+
+class FakeResource:
+    """
+    videos().list() で FakeRequest を返す googleapiclient のクライアントの代わり
+    """
+
+    def __init__(self, error: Exception):
+        self.__error = error
+
+    def videos(self) -> "FakeResource":
+        return self
+
+    def list(self, **kwargs) -> FakeRequest:
+        return FakeRequest(self.__error)
+
+def create_error_content(reason: str) -> str:
+    """
+    YouTube Data API のエラーの応答の本文を作る
+    """
+    return json.dumps({"error": {"errors": [{"reason": reason}]}})
+
+@pytest.mark.parametrize(
+    ("status", "content", "is_quota_exceeded", "is_transient"),
+    [
+        (403, create_error_content("quotaExceeded"), True, False),
+        (403, create_error_content("rateLimitExceeded"), False, True),
+        (403, create_error_content("forbidden"), False, False),
+        (503, "Service Unavailable", False, True),
+        (400, create_error_content("badRequest"), False, False),
+    ],
+)
+def test_youtube_api_error_classification(status, content, is_quota_exceeded, is_transient):
+    """
+    ステータスコードとエラーの理由から、クォータの超過と一時的なエラーを判定する
+    """
+    error = YoutubeApiError(status, content)
+
+    assert error.is_quota_exceeded == is_quota_exceeded
+    assert error.is_transient == is_transient
+
+@pytest.mark.parametrize("error", [httplib2.ServerNotFoundError("Unable to find the server"), httplib2.RedirectLimit("Redirected more times than redirection_limit allows.", {}, "")])
+def test_discovery_client_converts_transport_errors(monkeypatch, error):
+    """
+    httplib2 の通信エラーは呼び出し直せる OSError に変換する
+    """
+    client = DiscoveryYoutubeClient("key", "youtube", "v3")
+    monkeypatch.setattr(client, "_DiscoveryYoutubeClient__get_youtube", lambda: FakeResource(error))
+
+    with pytest.raises(ConnectionError) as raised:
+        client.list_videos(["video000001"])
+
+    assert isinstance(raised.value, OSError)
+    assert raised.value.__cause__ is error
+
+def test_discovery_client_converts_http_errors(monkeypatch):
+    """
+    YouTube Data API がエラーを返した場合は YoutubeApiError に変換する
+    """
+    error = HttpError(httplib2.Response({"status": 403}), create_error_content("quotaExceeded").encode("utf-8"))
+    client = DiscoveryYoutubeClient("key", "youtube", "v3")
+    monkeypatch.setattr(client, "_DiscoveryYoutubeClient__get_youtube", lambda: FakeResource(error))
+
+    with pytest.raises(YoutubeApiError) as raised:
+        client.list_videos(["video000001"])
+
+    assert raised.value.status == 403
+    assert raised.value.is_quota_exceeded